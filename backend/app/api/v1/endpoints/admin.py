@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional
+
+from app.core.profiling import profile_store, token_matches
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+
+def require_profiling_token(
+    x_profile_token: Optional[str] = Header(None),
+) -> None:
+    """Only callers with PROFILING_TOKEN may read profiles."""
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Not authorized.")
+
+
+router = APIRouter(dependencies=[Depends(require_profiling_token)])
+
+
+@router.get("/profiles", response_model=List[Dict[str, str]])
+async def list_profiles():
+    """
+    List saved request profiles, newest first.
+
+    A request is profiled when it sends the profiling token in
+    X-Profile-Token (or is picked by PROFILING_SAMPLE_RATE); its response
+    carries the profile's id in X-Profile-Id.
+    """
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """
+    Download a profile in the collapsed stack format.
+
+    Render it with flamegraph.pl, inferno-flamegraph or speedscope.
+    """
+    collapsed = profile_store.read(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
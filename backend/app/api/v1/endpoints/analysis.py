@@ -0,0 +1,34 @@
+from typing import Any
+
+from app.core.database import get_session
+from app.schemas.analysis import AnalysisResult, Insights
+from app.schemas.diabetes import DiabetesRecordFilter
+from app.services.analysis import AnalysisService
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter()
+
+
+@router.get("/analyze", response_model=AnalysisResult)
+async def analyze(
+    *,
+    db: AsyncSession = Depends(get_session),
+    filters: DiabetesRecordFilter = Depends(),
+) -> Any:
+    """
+    Analyze the (filtered) records: statistics, anomalies and recommendations.
+    """
+    return await AnalysisService(db).run_analysis(filters)
+
+
+@router.get("/insights", response_model=Insights)
+async def get_insights(
+    *,
+    db: AsyncSession = Depends(get_session),
+    filters: DiabetesRecordFilter = Depends(),
+) -> Any:
+    """
+    Get diabetes rates by age group and BMI category, with recommendations.
+    """
+    return await AnalysisService(db).get_insights(filters)
@@ -0,0 +1,97 @@
+from typing import Any, List, Optional
+
+from app.core.database import get_session, get_session_factory
+from app.core.query_tracer import query_budget
+from app.core.serialization import NDJSON_MEDIA_TYPE, stream_json_array, stream_ndjson
+from app.schemas.diabetes import DiabetesRecord as DiabetesRecordSchema
+from app.schemas.diabetes import DiabetesRecordFilter, ExportFormat
+from app.services.records import RecordListService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+router = APIRouter()
+
+
+def _projection(fields: Optional[str]) -> Optional[List[str]]:
+    return [name.strip() for name in fields.split(",")] if fields else None
+
+
+@router.get("", response_model=List[DiabetesRecordSchema])
+@query_budget(1)
+async def list_diabetes_records(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    filters: DiabetesRecordFilter = Depends(),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the previous page's X-Next-Cursor"
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated columns to return (id, created_at always)"
+    ),
+) -> Any:
+    """
+    List diabetes records, newest first, with filters and keyset pagination.
+
+    The next page is fetched by passing the X-Next-Cursor response header back
+    as `cursor`; the header is absent on the last page.
+    """
+    try:
+        rows, next_cursor = await RecordListService(db).list_records(
+            filters, cursor=cursor, limit=limit, fields=_projection(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {}
+    if next_cursor:
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        headers = {"X-Next-Cursor": next_cursor, "Link": f'<{next_url}>; rel="next"'}
+    # Rows come typed from the database, so they skip response_model validation
+    return ORJSONResponse(rows, headers=headers)
+
+
+@router.get("/export", response_model=List[DiabetesRecordSchema])
+async def export_diabetes_records(
+    *,
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    filters: DiabetesRecordFilter = Depends(),
+    format: ExportFormat = Query(ExportFormat.JSON),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated columns to return (id, created_at always)"
+    ),
+) -> Any:
+    """
+    Export every matching diabetes record, oldest first.
+
+    The body is streamed as one JSON array or as newline-delimited JSON,
+    encoded straight from the database a chunk of rows at a time, so memory
+    stays flat however many records match. Each chunk is read in its own
+    short transaction, so records committed during the export may be included.
+    """
+    try:
+        columns = RecordListService.resolve_fields(_projection(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == ExportFormat.NDJSON:
+        encode, media_type = stream_ndjson, NDJSON_MEDIA_TYPE
+    else:
+        encode, media_type = stream_json_array, "application/json"
+
+    async def body():
+        # Request dependencies are closed before the body streams, so the
+        # export reads through a session of its own
+        async with session_factory() as db:
+            chunks = RecordListService(db).stream_rows(filters, columns)
+            async for chunk in encode(columns, chunks):
+                yield chunk
+
+    filename = f"diabetes_records.{format.value}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,69 +1,223 @@
-from typing import Any
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict
 
-from app.core.database import get_session
-from app.models.diabetes import DataSource, DiabetesRecord
+from app.core.config import get_settings
+from app.core.database import get_session, get_session_factory
+from app.core.idempotency import IdempotentRoute, idempotent
+from app.core.query_tracer import query_budget
+from app.models.health import HealthAssessment
+from app.models.job import JobStatus
 from app.models.user import User
+from app.schemas.diabetes import BulkIngestResult
 from app.schemas.diabetes import DiabetesRecord as DiabetesRecordSchema
-from app.schemas.diabetes import DiabetesRecordCreate
-from app.services.health import HealthService
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from sqlalchemy.orm import Session
+from app.schemas.diabetes import DiabetesRecordCreate, DiabetesRecordCreated
+from app.schemas.health import HealthAssessment as HealthAssessmentSchema
+from app.services.assessment_status import AssessmentStatusService, final_assessment
+from app.services.ingest import BulkIngestService, iter_lines
+from app.services.intake import IntakeService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-router = APIRouter()
+settings = get_settings()
 
+router = APIRouter(route_class=IdempotentRoute)
 
-async def assess_health_background(db: Session, user_id: int, record_id: int) -> None:
-    """Background task to assess health after creating a diabetes record."""
-    try:
-        health_service = HealthService(db)
-        await health_service.assess_health(user_id, record_id)
-    except Exception as e:
-        # Log the error but don't raise it since this is a background task
-        print(f"Error in health assessment background task: {str(e)}")
+# Streamed upload formats accepted by the bulk endpoint
+BULK_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
 
 
-@router.post("/", response_model=DiabetesRecordSchema)
+@router.post("/", response_model=DiabetesRecordCreated)
+@idempotent
+@query_budget(8)
 async def create_diabetes_record(
     *,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
     record_in: DiabetesRecordCreate,
+    score: bool = Query(
+        False, description="Return the risk score now; recommendations follow"
+    ),
 ) -> Any:
     """
-    Create new diabetes record for a user and start health assessment in background.
+    Create new diabetes record for a user and queue its health assessment.
+
+    With `score`, the record is also scored by the preloaded model and the
+    assessment returned pending enrichment; the queued job adds the
+    recommendations and sends the notification. Without a loaded model the
+    assessment is left to the job entirely. Features that are anomalous
+    relative to the population are flagged.
     """
     # Check if user exists
-    user = db.query(User).filter(User.id == record_in.user_id).first()
+    user = await db.get(User, record_in.user_id)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="User not found.",
         )
 
-    # Create new diabetes record
-    record = DiabetesRecord(
-        user_id=record_in.user_id,
-        pregnancies=record_in.pregnancies,
-        glucose=record_in.glucose,
-        blood_pressure=record_in.blood_pressure,
-        skin_thickness=record_in.skin_thickness,
-        insulin=record_in.insulin,
-        bmi=record_in.bmi,
-        diabetes_pedigree=record_in.diabetes_pedigree,
-        age=record_in.age,
-        outcome=record_in.outcome,
-        source=DataSource.USER_ENTRY,  # Always set as user_entry for API-created records
-    )
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-
-    # Start health assessment in background
-    background_tasks.add_task(
-        assess_health_background,
-        db=db,
-        user_id=record_in.user_id,
-        record_id=record.id,
+    record, assessment = await IntakeService(db).create_record(
+        record_in.user_id, record_in, score=score
     )
+    await db.commit()
+    await db.refresh(record)
+
+    return {
+        **DiabetesRecordSchema.model_validate(record).model_dump(),
+        "assessment": assessment,
+    }
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkIngestResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def bulk_create_diabetes_records(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    enqueue_assessments: bool = False,
+) -> Any:
+    """
+    Stream many diabetes records as CSV (with a header row) or NDJSON.
+
+    Rows are validated and loaded with COPY in fixed-size chunks, so memory use
+    does not grow with the upload. Invalid rows are reported and skipped.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    upload_format = BULK_CONTENT_TYPES.get(content_type.lower())
+    if upload_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Upload records as text/csv or application/x-ndjson.",
+        )
+
+    service = BulkIngestService(db, enqueue_assessments=enqueue_assessments)
+    lines = iter_lines(request.stream())
+    if upload_format == "csv":
+        return await service.ingest_csv(lines)
+    return await service.ingest_ndjson(lines)
+
+
+@router.get(
+    "/{record_id}/assessment",
+    response_model=HealthAssessmentSchema,
+    responses={
+        202: {"description": "Assessment still queued or running"},
+        409: {"description": "Assessment failed"},
+    },
+)
+async def get_record_assessment(
+    *,
+    db: AsyncSession = Depends(get_session),
+    record_id: int,
+    wait: int = Query(
+        0,
+        ge=0,
+        le=settings.ASSESSMENT_WAIT_MAX_SECONDS,
+        description="Seconds to wait for a queued assessment to finish",
+    ),
+) -> Any:
+    """
+    Get the health assessment of a diabetes record, optionally waiting for it.
+
+    With `wait`, the request is held until the queued assessment finishes or
+    the wait runs out, instead of the client polling. A 202 with the job's
+    status means it is not done yet; ask again.
+    """
+    assessment, job = await AssessmentStatusService(db).wait(record_id, wait)
+    if final_assessment(assessment, job) is not None:
+        return assessment
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No assessment found for this record",
+        )
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Assessment failed after {job.attempts} attempts",
+        )
+    return JSONResponse({"status": job.status.value}, status_code=202)
+
+
+def _event(name: str, data: Dict[str, Any]) -> str:
+    """One server-sent event."""
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
 
-    return record
+
+def _assessment_event(name: str, assessment: HealthAssessment) -> str:
+    schema = HealthAssessmentSchema.model_validate(assessment, from_attributes=True)
+    return _event(name, schema.model_dump(mode="json"))
+
+
+@router.get("/{record_id}/assessment/events")
+async def stream_record_assessment(
+    *,
+    db: AsyncSession = Depends(get_session),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    record_id: int,
+) -> Any:
+    """
+    Stream the progress of a diabetes record's health assessment as server-sent events.
+
+    A `status` event is sent at once and then every few seconds while the job
+    is queued or running (after a `scored` event with the risk score, if the
+    record was scored on creation), followed by a final `assessment` or
+    `failed` event. Long waits end the stream; EventSource clients reconnect.
+    """
+    assessment, job = await AssessmentStatusService(db).lookup(record_id)
+    if assessment is None and job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No assessment found for this record",
+        )
+
+    async def events() -> AsyncIterator[str]:
+        # Request dependencies are closed before the body streams, so the
+        # events are read through a session of their own
+        async with session_factory() as stream_db:
+            service = AssessmentStatusService(stream_db)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + settings.ASSESSMENT_EVENTS_MAX_SECONDS
+            timeout, scored = 0.0, False
+            while True:
+                assessment, job = await service.wait(record_id, timeout)
+                if final_assessment(assessment, job) is not None:
+                    yield _assessment_event("assessment", assessment)
+                    return
+                if job is None or job.status in (JobStatus.DONE, JobStatus.FAILED):
+                    yield _event("failed", {"attempts": job.attempts if job else 0})
+                    return
+                if assessment is not None and not scored:
+                    # Scored on creation, recommendations still to come
+                    yield _assessment_event("scored", assessment)
+                    scored = True
+                yield _event("status", {"status": job.status.value})
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                # Reread the job on the next wait
+                await stream_db.rollback()
+                timeout = min(remaining, settings.ASSESSMENT_EVENTS_KEEPALIVE_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
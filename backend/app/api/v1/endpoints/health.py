@@ -1,27 +1,31 @@
 from typing import Any
 
+from app.core.cache import CachedRoute, cache_response
 from app.core.database import get_session
+from app.core.query_tracer import query_budget
+from app.models.health import HealthAssessment
 from app.schemas.health import HealthAssessment as HealthAssessmentSchema
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/{assessment_id}", response_model=HealthAssessmentSchema)
-def get_health_assessment(
+@cache_response("health_assessments:{assessment_id}")
+@query_budget(1)
+async def get_health_assessment(
     *,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
     assessment_id: int,
 ) -> Any:
     """
     Get a specific health assessment by ID.
-    """
-    from app.models.health import HealthAssessment
 
-    assessment = (
-        db.query(HealthAssessment).filter(HealthAssessment.id == assessment_id).first()
-    )
+    Responses are cached and carry an ETag; send it in If-None-Match to get
+    a 304 while the assessment is unchanged.
+    """
+    assessment = await db.get(HealthAssessment, assessment_id)
     if not assessment:
         raise HTTPException(
             status_code=404,
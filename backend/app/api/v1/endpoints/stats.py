@@ -0,0 +1,95 @@
+from typing import Any, List, Optional
+
+from app.core.cache import etag_matches
+from app.core.database import get_session
+from app.core.query_tracer import query_budget
+from app.models.anomaly import AnomalyFlag
+from app.models.diabetes import DataSource
+from app.schemas.stats import AnomalyFlag as AnomalyFlagSchema
+from app.schemas.stats import StatsDistributions, StatsQuantiles, StatsSummary
+from app.services.histogram import distribution_cache
+from app.services.sketch import DEFAULT_QUANTILES, QuantileSketchService
+from app.services.stats import RecordStatsService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=StatsSummary)
+@query_budget(1)
+async def get_stats_summary(
+    *,
+    db: AsyncSession = Depends(get_session),
+    source: Optional[DataSource] = None,
+) -> Any:
+    """
+    Get record counts, positive rate and per-feature mean/variance.
+    """
+    return await RecordStatsService(db).summary(source)
+
+
+@router.get("/quantiles", response_model=StatsQuantiles)
+async def get_stats_quantiles(
+    *,
+    db: AsyncSession = Depends(get_session),
+    source: Optional[DataSource] = None,
+    q: List[float] = Query(DEFAULT_QUANTILES, description="Fractions in [0, 1]"),
+) -> Any:
+    """
+    Get approximate per-feature quantiles from the stored KLL sketches.
+
+    Values are exact at 0 and 1 (min and max); in between the rank error is
+    bounded by rank_error. Records created in the last few minutes are not
+    included yet.
+    """
+    if any(not 0 <= fraction <= 1 for fraction in q):
+        raise HTTPException(status_code=422, detail="Quantiles must be in [0, 1].")
+    return await QuantileSketchService(db).quantiles(source, q)
+
+
+@router.get(
+    "/distributions",
+    response_model=StatsDistributions,
+    responses={304: {"description": "Distributions unchanged since the ETag"}},
+)
+async def get_stats_distributions(
+    *,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_session),
+) -> Any:
+    """
+    Get binned histograms of every feature, split by outcome.
+
+    Built from precomputed bucket counts. Send the ETag back in If-None-Match
+    to get a 304, answered without touching the database, while they are
+    unchanged.
+    """
+    if distribution_cache.payload is None:
+        await distribution_cache.load(db)
+    headers = {"ETag": distribution_cache.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), distribution_cache.etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return distribution_cache.payload
+
+
+@router.get("/anomalies", response_model=List[AnomalyFlagSchema])
+async def list_anomaly_flags(
+    *,
+    db: AsyncSession = Depends(get_session),
+    record_id: Optional[int] = None,
+    before_id: Optional[int] = Query(None, description="Page below this flag id"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """
+    List the anomalies flagged when records were created, newest first.
+    """
+    query = select(AnomalyFlag).order_by(AnomalyFlag.id.desc()).limit(limit)
+    if record_id is not None:
+        query = query.where(AnomalyFlag.diabetes_record_id == record_id)
+    if before_id is not None:
+        query = query.where(AnomalyFlag.id < before_id)
+    return (await db.scalars(query)).all()
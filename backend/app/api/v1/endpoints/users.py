@@ -1,18 +1,30 @@
 from typing import Any
 
 from app.core.database import get_session
+from app.core.idempotency import IdempotentRoute, idempotent
+from app.core.query_tracer import query_budget
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy.orm import Session
+from app.schemas.diabetes import DiabetesRecord as DiabetesRecordSchema
+from app.schemas.user import (
+    OnboardingRequest,
+    OnboardingResponse,
+    UserCreate,
+    UserResponse,
+)
+from app.services.intake import IntakeService
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute)
 
 
 @router.post("/", response_model=UserResponse)
-def create_user(
+@idempotent
+@query_budget(5)
+async def create_user(
     *,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
     user_in: UserCreate,
     response: Response,
 ) -> Any:
@@ -20,7 +32,8 @@ def create_user(
     Create new user.
     """
     # Check if user with this email already exists
-    user = db.query(User).filter(User.email == user_in.email).first()
+    result = await db.execute(select(User).where(User.email == user_in.email))
+    user = result.scalar_one_or_none()
     if user:
         # Set 409 status code
         response.status_code = 409
@@ -34,8 +47,42 @@ def create_user(
         email=user_in.email,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     # Return user
     return UserResponse(**user.__dict__)
+
+
+@router.post("/onboard", response_model=OnboardingResponse)
+@idempotent
+@query_budget(8)
+async def onboard_user(
+    *,
+    db: AsyncSession = Depends(get_session),
+    onboarding_in: OnboardingRequest,
+    score: bool = Query(
+        False, description="Return the risk score now; recommendations follow"
+    ),
+) -> Any:
+    """
+    Sign a user up with their first diabetes record in one request.
+
+    The user is created, or found by email if they already exist, the record
+    is added and its health assessment queued, all in one transaction.
+    """
+    service = IntakeService(db)
+    user, created = await service.upsert_user(onboarding_in.user)
+    record, assessment = await service.create_record(
+        user.id, onboarding_in.record, score=score
+    )
+    await db.commit()
+
+    return {
+        "user": user,
+        "user_created": created,
+        "record": {
+            **DiabetesRecordSchema.model_validate(record).model_dump(),
+            "assessment": assessment,
+        },
+    }
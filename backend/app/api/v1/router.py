@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 
-from .endpoints import diabetes, health, users
+from .endpoints import admin, analysis, data, diabetes, health, stats, users
 
 api_router = APIRouter()
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(diabetes.router, prefix="/diabetes", tags=["diabetes"])
 api_router.include_router(health.router, prefix="/health", tags=["health"])
+api_router.include_router(data.router, prefix="/data", tags=["data"])
+api_router.include_router(analysis.router, tags=["analysis"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,244 @@
+"""In-process response cache for read endpoints.
+
+Endpoints opt in with ``@cache_response("table", ...)`` on a router built
+with ``route_class=CachedRoute``. Successful GET responses are kept for a
+TTL and carry a strong ETag (a hash of the body), so a matching
+``If-None-Match`` gets a 304.
+
+Entries are dropped when what they read is written. Each entry is tagged
+with the tables it read, or with single rows as ``"table:{path_param}"``.
+Triggers on each cached table (see ``invalidation_triggers``) send a NOTIFY,
+delivered on commit, with the written row as ``table:id``, or just the
+table on TRUNCATE. Every API process listening on the channel drops the
+entries tagged with that row or that whole table.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict, defaultdict
+from typing import TYPE_CHECKING, Callable, DefaultDict, List, Optional, Set
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from .config import get_settings
+
+if TYPE_CHECKING:
+    from .listener import PgListener
+
+settings = get_settings()
+
+CACHE_INVALIDATION_CHANNEL = "response_cache_invalidation"
+
+# The table is passed in rather than read from TG_TABLE_NAME, which is the
+# partition's name when a partitioned table's row trigger fires
+CACHE_INVALIDATION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_response_cache() RETURNS trigger AS $$
+BEGIN
+    IF TG_LEVEL = 'STATEMENT' THEN
+        PERFORM pg_notify('{CACHE_INVALIDATION_CHANNEL}', TG_ARGV[0]);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('{CACHE_INVALIDATION_CHANNEL}', TG_ARGV[0] || ':' || OLD.id);
+    ELSE
+        PERFORM pg_notify('{CACHE_INVALIDATION_CHANNEL}', TG_ARGV[0] || ':' || NEW.id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def invalidation_triggers(table: str) -> List[str]:
+    """DDL announcing every write to a table whose reads are cached."""
+    return [
+        f"""
+        CREATE OR REPLACE TRIGGER {table}_response_cache
+        AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION notify_response_cache('{table}')
+        """,
+        f"""
+        CREATE OR REPLACE TRIGGER {table}_response_cache_truncate
+        AFTER TRUNCATE ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_response_cache('{table}')
+        """,
+    ]
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an If-None-Match header covers the ETag (weak comparison)."""
+    if not if_none_match or not etag:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class CacheEntry:
+    """A rendered response body and its validator."""
+
+    def __init__(self, body: bytes, media_type: Optional[str], expires_at: float):
+        self.body = body
+        self.media_type = media_type
+        self.expires_at = expires_at
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        # What the response read, as tables or "table:id" rows
+        self.tags: Set[str] = set()
+
+
+class ResponseCache:
+    """LRU map of request URL to cached response, indexed by what it read."""
+
+    def __init__(self, max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._keys_by_tag: DefaultDict[str, Set[str]] = defaultdict(set)
+        # Bumped on every invalidation of a table or any of its rows, so a
+        # response rendered while its table was being written is not stored.
+        # Kept per table rather than per row so it does not grow with the table.
+        self.generations: DefaultDict[str, int] = defaultdict(int)
+        # Delivers the invalidations; set by the app at start-up. Nothing is
+        # stored while it is disconnected, as writes would go unnoticed.
+        self.listener: Optional["PgListener"] = None
+
+    def generation(self, tag: str) -> int:
+        """Version of a tag's table, which changes whenever it is written."""
+        return self.generations[tag.partition(":")[0]]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """The live entry for a key, if any."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._forget(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry, tags: Set[str]) -> None:
+        """Store an entry that depends on the given tables or rows."""
+        if self.listener is not None and not self.listener.connected:
+            return
+        self._forget(key)
+        entry.tags = set(tags)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._keys_by_tag[tag].add(key)
+        while len(self._entries) > self.max_entries:
+            self._forget(next(iter(self._entries)))
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def invalidate(self, tag: str) -> None:
+        """Drop the entries that read a row ("table:id") or any of a table."""
+        table, sep, _ = tag.partition(":")
+        if sep:
+            # Entries that read the whole table read this row too
+            tags = [tag, table]
+        else:
+            tags = [table] + [t for t in self._keys_by_tag if t.startswith(f"{table}:")]
+        self.generations[table] += 1
+        for dropped in tags:
+            for key in list(self._keys_by_tag.get(dropped, ())):
+                self._forget(key)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        for table in list(self.generations):
+            self.generations[table] += 1
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def on_notify(self, payload: str) -> None:
+        """PgListener callback; an empty payload means notifications were missed."""
+        if payload:
+            self.invalidate(payload)
+        else:
+            self.clear()
+
+
+# Shared by the requests of this process
+response_cache = ResponseCache()
+
+
+class CachePolicy:
+    """How an endpoint's responses are cached."""
+
+    def __init__(self, tables: Set[str], ttl: int, max_age: int):
+        self.tables = tables
+        self.ttl = ttl
+        self.max_age = max_age
+
+    @property
+    def cache_control(self) -> str:
+        # Without a max-age, clients revalidate every time (a cheap 304)
+        return f"private, max-age={self.max_age}" if self.max_age else "no-cache"
+
+
+def cache_response(
+    *tables: str,
+    ttl: int = settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_age: int = 0,
+) -> Callable:
+    """Cache a GET endpoint's responses until the TTL or a write to tables.
+
+    A table given as ``"table:{param}"`` depends only on the row whose id is
+    that path parameter. Each table needs its invalidation_triggers.
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.cache_policy = CachePolicy(set(tables), ttl, max_age)
+        return endpoint
+
+    return decorator
+
+
+class CachedRoute(APIRoute):
+    """Route that serves endpoints marked with cache_response from the cache."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        policy: Optional[CachePolicy] = getattr(self.endpoint, "cache_policy", None)
+        if policy is None or self.methods != {"GET"}:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            key = request.url.path
+            if request.url.query:
+                key += f"?{request.url.query}"
+
+            entry = response_cache.get(key)
+            if entry is None:
+                tags = {tag.format(**request.path_params) for tag in policy.tables}
+                generations = {tag: response_cache.generation(tag) for tag in tags}
+                response = await handler(request)
+                # Errors and streamed responses are passed through uncached
+                if response.status_code != 200 or not hasattr(response, "body"):
+                    return response
+                entry = CacheEntry(
+                    response.body,
+                    response.media_type,
+                    time.monotonic() + policy.ttl,
+                )
+                unchanged = all(
+                    response_cache.generation(tag) == generation
+                    for tag, generation in generations.items()
+                )
+                if unchanged:
+                    response_cache.set(key, entry, tags)
+
+            headers = {"ETag": entry.etag, "Cache-Control": policy.cache_control}
+            if etag_matches(request.headers.get("if-none-match"), entry.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(entry.body, media_type=entry.media_type, headers=headers)
+
+        return cached_handler
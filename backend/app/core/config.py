@@ -14,6 +14,9 @@ class Settings(BaseSettings):
     # API settings
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Diabetes Risk Assesment"
+    ENABLE_SCHEDULER: bool = True  # run periodic jobs in the API process
+    RESPONSE_CACHE_TTL_SECONDS: int = 300  # cached GET responses expire after
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000  # per process, least recently used go
 
     # Database settings
     POSTGRES_USER: str = "postgres"
@@ -22,23 +25,88 @@ class Settings(BaseSettings):
     DB_HOST: str = "db"
     DB_PORT: str = "5432"
 
+    # Database pool settings
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 disables the timeout
+    PARTITION_MONTHS_AHEAD: int = 3  # monthly partitions created in advance
+
+    # Assessment job queue settings
+    JOB_WORKER_CONCURRENCY: int = 4  # jobs run concurrently per worker process
+    JOB_POLL_INTERVAL_SECONDS: float = 5.0  # fallback when no NOTIFY arrives
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = (
+        300  # running jobs older than this are retried
+    )
+    # Kept below the visibility timeout so a job is not retried while it runs
+    JOB_RUN_TIMEOUT_SECONDS: int = 240
+    JOB_METRICS_PORT: int = 9100  # 0 disables the worker metrics server
+    RISK_MODEL_PRELOAD: bool = True  # train at startup to score records on create
+    ASSESSMENT_WAIT_MAX_SECONDS: int = 60  # longest a long-poll request is held
+    ASSESSMENT_EVENTS_MAX_SECONDS: int = 300  # event streams close after this
+    ASSESSMENT_EVENTS_KEEPALIVE_SECONDS: int = 15  # status event sent this often
+
+    # Bulk ingest settings
+    BULK_INGEST_CHUNK_SIZE: int = 1000  # rows validated and copied per batch
+    BULK_INGEST_MAX_REPORTED_ERRORS: int = 1000
+
+    # Idempotency settings
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24  # responses replayed for retries this long
+    IDEMPOTENCY_PURGE_INTERVAL_MINUTES: int = 60
+    IDEMPOTENCY_LOCK_TIMEOUT_MS: int = 1000  # a duplicate waits this long, then 409
+
+    # Query tracing settings
+    QUERY_TRACING: bool = False  # record each request's and job's statements
+    QUERY_TRACE_ENFORCE_BUDGETS: bool = False  # fail over-budget requests (tests)
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5  # same statement this often is flagged
+
+    # Profiling settings
+    PROFILING_TOKEN: str = ""  # requests sending it in X-Profile-Token are profiled
+    PROFILING_SAMPLE_RATE: float = 0.0  # fraction of all requests profiled
+    PROFILING_INTERVAL_MS: float = 5.0  # stack sampling period
+    PROFILING_MAX_SECONDS: float = 60.0  # sampling stops after, e.g. for streams
+    PROFILING_DIR: str = "/tmp/profiles"  # shared by the worker processes
+    PROFILING_MAX_FILES: int = 200  # oldest profiles are deleted beyond this
+
+    # Export settings
+    EXPORT_CHUNK_SIZE: int = 5000  # rows fetched and encoded per streamed chunk
+
     # Analysis settings
     ANALYSIS_INTERVAL_MINUTES: int = 10000
     ALERT_THRESHOLD: float = 0.3  # 30% threshold for alerts
+    ANALYSIS_WATERMARK_LAG_SECONDS: int = 300  # longest a transaction takes to insert
+    ANALYSIS_ZSCORE_THRESHOLD: float = 3.0  # |z| above this is an anomaly
+    ANALYSIS_IQR_MULTIPLIER: float = 1.5  # Tukey fences: Q1/Q3 -+ k * IQR
+    ANALYSIS_MAX_ANOMALIES: int = 20  # most extreme anomalies listed per feature
+    ANOMALY_MIN_OBSERVATIONS: int = 30  # values seen before a feature is judged
+    ANOMALY_DETECTOR_REFRESH_MINUTES: int = 60  # reseed from the database
+    QUANTILE_SKETCH_K: int = 200  # KLL accuracy; ~1.65% rank error at 200
+    QUANTILE_SKETCH_REFRESH_SECONDS: int = 60  # fold new records into the sketches
+    HISTOGRAM_REFRESH_SECONDS: int = 60  # fold new records into the histograms
+    # Full recount of record_stats; blocks record writes while it runs, 0 disables
+    RECORD_STATS_RECONCILE_INTERVAL_SECONDS: int = 86400
 
     # Notification settings
     ENABLE_NOTIFICATIONS: bool = True
     NOTIFICATION_CHANNEL: str = "email"  # or "slack"
+    ALERT_EMAILS: List[str] = []  # recipients of dataset analysis alerts
 
     # Email settings
     EMAIL_USER: str = ""  # Gmail address
     EMAIL_PASSWORD: str = ""  # Gmail app password
     EMAIL_HOST: str = "smtp.gmail.com"  # SMTP server host
     EMAIL_PORT: int = 587  # SMTP server port
+    EMAIL_STARTTLS: bool = True  # upgrade the SMTP connection to TLS before login
 
     # LLM settings
     HUGGINGFACE_API_KEY: str = ""  # Hugging Face API key
-    LLM_RATE_LIMIT: int = 5  # requests per minute
+    LLM_RATE_LIMIT: int = 5  # requests per minute, 0 for no limit
+    LLM_BASE_URL: str = (
+        ""  # OpenAI-compatible endpoint instead of the Hugging Face provider
+    )
 
     # Kaggle settings
     KAGGLE_USERNAME: str = "test_username"
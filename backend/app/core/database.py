@@ -1,32 +1,92 @@
-from typing import Generator
+from typing import AsyncGenerator, Callable
 
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import declarative_base, sessionmaker
 
 from .config import get_settings
+from .instrumentation import instrument_queries
+from .pool import instrument_pool
 
 settings = get_settings()
 
-# Create database URL
+# Create database URLs
 DATABASE_URL = (
     f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
     f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.POSTGRES_DB}"
 )
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+# Pool settings shared by both engines
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
 
-# Create engine
-engine = create_engine(DATABASE_URL)
+# Create sync engine (CLI scripts, dataset loading and test setup)
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={
+        "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    },
+    **POOL_OPTIONS,
+)
 
-# Create session factory
+# Create sync session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engine (API endpoints and services)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    },
+    **POOL_OPTIONS,
+)
+
+# Pool and statement metrics for both engines
+instrument_pool(engine, "sync")
+instrument_pool(async_engine.sync_engine, "async")
+instrument_queries(engine, "sync")
+instrument_queries(async_engine.sync_engine, "async")
+
+# Create async session factory
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 # Create declarative base
 Base = declarative_base()
 
 
-def get_session() -> Generator[Session, None, None]:
-    """Get database session."""
-    db = SessionLocal()
-    try:
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session.
+
+    A request whose route already opened one (see app.core.idempotency) gets
+    that session, so its work shares the route's transaction.
+    """
+    db = getattr(request.state, "db", None)
+    if db is not None:
         yield db
-    finally:
-        db.close()
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_session_factory() -> async_sessionmaker:
+    """Get the session factory, for streamed responses that outlive the request."""
+    return AsyncSessionLocal
+
+
+def get_connection_factory() -> Callable[[], AsyncConnection]:
+    """Get the connection factory, for routes that manage their own transaction."""
+    return async_engine.connect
@@ -8,7 +8,6 @@ from .config import get_settings
 settings = get_settings()
 
 load_dotenv("../.env")
-import kaggle
 
 # Dataset configuration
 DATASET_CONFIG = {
@@ -30,6 +29,13 @@ DATASET_CONFIG = {
 }
 
 
+def kaggle_api():
+    """The Kaggle API client; importing kaggle authenticates, so only on use."""
+    import kaggle
+
+    return kaggle.api
+
+
 class DatasetManager:
     """Manages dataset operations."""
 
@@ -39,7 +45,7 @@ class DatasetManager:
 
     def setup_kaggle(self, username: str, key: str) -> None:
         """Setup Kaggle credentials."""
-        kaggle.api.authenticate()
+        kaggle_api().authenticate()
 
     def download_dataset(self, dataset_name: str) -> Optional[Path]:
         """Download dataset from Kaggle."""
@@ -53,7 +59,7 @@ class DatasetManager:
             return dataset_path
 
         try:
-            kaggle.api.dataset_download_file(
+            kaggle_api().dataset_download_file(
                 config["kaggle_dataset"], config["filename"], path=str(self.data_dir)
             )
             return dataset_path
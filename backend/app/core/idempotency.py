@@ -0,0 +1,210 @@
+"""Idempotency-Key support for write endpoints.
+
+Endpoints opt in with ``@idempotent`` on a router built with
+``route_class=IdempotentRoute``. A request carrying an ``Idempotency-Key``
+header runs in one transaction on one connection: the key is claimed by
+inserting it into ``idempotency_keys``, the endpoint runs in a session
+joined to that transaction (its commits only release savepoints), and its
+response is stored with the key. All three commit together, so a retry
+either replays the response or finds no trace of the first attempt.
+
+A concurrent request with the same key waits on the key's unique index for
+up to IDEMPOTENCY_LOCK_TIMEOUT_MS and then gets a 409; once the first one
+commits, retries within IDEMPOTENCY_KEY_TTL_HOURS get its response back
+without the endpoint running again. Reusing a key for a different request
+is a 422.
+
+Only responses the endpoint returns are stored: when it raises (an
+HTTPException included) or fails with a 5xx, its work and the claim are
+rolled back and the key can be retried.
+"""
+
+import hashlib
+import logging
+from datetime import timedelta
+from typing import Callable, Optional, Tuple
+
+from app.models.idempotency import IdempotencyKey
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import get_settings
+from .database import AsyncSessionLocal, get_connection_factory
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+INVALID_KEY = f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters."
+IN_PROGRESS = "A request with this Idempotency-Key is in progress."
+KEY_REUSED = "Idempotency-Key was used for a different request."
+# SQLSTATE of a lock wait cut short by lock_timeout
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def idempotent(endpoint: Callable) -> Callable:
+    """Replay a write endpoint's first response to requests reusing its key."""
+    endpoint.idempotent = True
+    return endpoint
+
+
+def request_fingerprint(method: str, url: str, body: bytes) -> str:
+    """Hash of what a key was used for, to catch a key reused for another request."""
+    digest = hashlib.sha256(f"{method} {url}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _expired_before():
+    return func.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+async def _respond(
+    handler: Callable, request: Request, db: AsyncSession, key: str, fingerprint: str
+) -> Tuple[Response, bool]:
+    """The response to a keyed request, and whether to commit its transaction."""
+    # Only the wait for a concurrent request with the same key is cut short
+    await db.execute(
+        text(f"SET LOCAL lock_timeout = {settings.IDEMPOTENCY_LOCK_TIMEOUT_MS}")
+    )
+    # Claims a new key, or one whose stored response has expired
+    claim = (
+        insert(IdempotencyKey)
+        .values(key=key, fingerprint=fingerprint)
+        .on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": fingerprint,
+                "status_code": None,
+                "body": None,
+                "created_at": func.now(),
+            },
+            where=IdempotencyKey.created_at < _expired_before(),
+        )
+        .returning(IdempotencyKey.key)
+    )
+    try:
+        # Waits while another request holds the key
+        claimed = await db.scalar(claim)
+    except DBAPIError as e:
+        if getattr(e.orig, "sqlstate", None) != LOCK_NOT_AVAILABLE:
+            raise
+        return JSONResponse({"detail": IN_PROGRESS}, status_code=409), False
+    await db.execute(text("SET LOCAL lock_timeout = DEFAULT"))
+
+    if claimed is None:
+        stored = (
+            await db.execute(
+                select(
+                    IdempotencyKey.fingerprint,
+                    IdempotencyKey.status_code,
+                    IdempotencyKey.body,
+                ).where(IdempotencyKey.key == key)
+            )
+        ).one_or_none()
+        if stored is None or stored.status_code is None:
+            return JSONResponse({"detail": IN_PROGRESS}, status_code=409), False
+        if stored.fingerprint != fingerprint:
+            return JSONResponse({"detail": KEY_REUSED}, status_code=422), False
+        replay = Response(
+            stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+        return replay, False
+
+    response = await handler(request)
+    if response.status_code >= 500:
+        return response, False
+    body: Optional[bytes] = getattr(response, "body", None)
+    if body is None:
+        # A streamed response cannot be stored; keep the work, release the key
+        await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+        return response, True
+
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(status_code=response.status_code, body=body)
+    )
+    return response, True
+
+
+class IdempotentRoute(APIRoute):
+    """Route that stores and replays the responses of endpoints marked idempotent."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "idempotent", False):
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+            if key is None:
+                return await handler(request)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return JSONResponse({"detail": INVALID_KEY}, status_code=400)
+
+            url = request.url.path
+            if request.url.query:
+                url += f"?{request.url.query}"
+            # The body is cached on the request, so the endpoint reads it again
+            fingerprint = request_fingerprint(request.method, url, await request.body())
+
+            # Not a dependency, so overrides (the tests' connection) are looked up by hand
+            connect = request.app.dependency_overrides.get(
+                get_connection_factory, get_connection_factory
+            )()
+            async with connect() as connection:
+                # A savepoint when the connection is already in a transaction (the tests')
+                if connection.in_transaction():
+                    transaction = await connection.begin_nested()
+                else:
+                    transaction = await connection.begin()
+                # The endpoint's commits only release savepoints of this transaction
+                db = AsyncSession(
+                    bind=connection,
+                    autoflush=False,
+                    expire_on_commit=False,
+                    join_transaction_mode="create_savepoint",
+                )
+                # get_session hands this session to the endpoint
+                request.state.db = db
+                commit = False
+                try:
+                    response, commit = await _respond(
+                        handler, request, db, key, fingerprint
+                    )
+                    return response
+                finally:
+                    del request.state.db
+                    if commit:
+                        await db.commit()
+                        await transaction.commit()
+                    else:
+                        # Closing the session first rolls its savepoint back
+                        await db.close()
+                        await transaction.rollback()
+                    await db.close()
+
+        return idempotent_handler
+
+
+async def purge_idempotency_keys() -> int:
+    """Scheduler entry point: delete keys whose responses have expired."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.created_at < _expired_before())
+        )
+        await db.commit()
+    if result.rowcount:
+        logger.info("Purged %d expired idempotency keys", result.rowcount)
+    return result.rowcount
@@ -0,0 +1,87 @@
+"""Request and query metrics collected in process.
+
+``RequestMetricsMiddleware`` times every request per route template (not
+per URL, so ids do not multiply the series) and counts requests in
+progress. ``instrument_queries`` times every statement an engine executes,
+and passes it to the running request's or job's query trace, if any.
+Both only touch prometheus_client's in-process counters, which are
+aggregated across worker processes by ``render_metrics``.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import DB_QUERY_DURATION, HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS
+from .query_tracer import record_query
+
+# Statement types recorded separately; the rest are counted as OTHER
+STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording request latency and requests in progress."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Route template of each endpoint, built on the first request
+        self._routes: Optional[Dict[Callable, str]] = None
+
+    def _route(self, scope: Scope) -> str:
+        """The template of the route that handled the request."""
+        if self._routes is None:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        # Set by the router once a route matched
+        endpoint = scope.get("endpoint")
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(method, self._route(scope), status).observe(
+                time.perf_counter() - started
+            )
+
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in STATEMENT_TYPES else "OTHER"
+
+
+def instrument_queries(engine: Engine, label: str) -> None:
+    """Time every statement the engine executes, labelled by engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany) -> None:
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany) -> None:
+        seconds = time.perf_counter() - context.query_started
+        DB_QUERY_DURATION.labels(label, _statement_type(statement)).observe(seconds)
+        record_query(statement, parameters, seconds)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, DefaultDict, List, Optional
+
+import asyncpg
+
+from .database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+NotificationCallback = Callable[[str], None]
+
+
+class PgListener:
+    """Dispatches Postgres LISTEN/NOTIFY payloads from one dedicated connection."""
+
+    def __init__(self, dsn: str = DATABASE_URL, reconnect_delay: float = 1.0):
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self._callbacks: DefaultDict[str, List[NotificationCallback]] = defaultdict(
+            list
+        )
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional["asyncio.Task[None]"] = None
+        self._closed = False
+
+    @property
+    def connected(self) -> bool:
+        """Whether notifications are currently being received."""
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def listen(self, channel: str, callback: NotificationCallback) -> None:
+        """Register a callback for a channel (starts listening if connected)."""
+        self._callbacks[channel].append(callback)
+        if self.connected and len(self._callbacks[channel]) == 1:
+            await self._connection.add_listener(channel, self._dispatch)
+
+    async def start(self) -> None:
+        """Open the connection and LISTEN on all registered channels."""
+        self._closed = False
+        self._connection = await asyncpg.connect(self.dsn)
+        self._connection.add_termination_listener(self._on_terminated)
+        for channel in self._callbacks:
+            await self._connection.add_listener(channel, self._dispatch)
+
+    async def stop(self) -> None:
+        """Close the connection."""
+        self._closed = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        if self._connection and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        for callback in self._callbacks.get(channel, []):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Notification callback failed for %s", channel)
+
+    def _on_terminated(self, connection) -> None:
+        if not self._closed:
+            logger.warning("LISTEN connection lost, reconnecting")
+            # Notifications stop now, not when the reconnect succeeds
+            for channel in list(self._callbacks):
+                self._dispatch(connection, 0, channel, "")
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.reconnect_delay
+        while not self._closed:
+            try:
+                await self.start()
+                # Anything sent while disconnected was missed
+                for channel in list(self._callbacks):
+                    self._dispatch(self._connection, 0, channel, "")
+                return
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("LISTEN reconnect failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
@@ -0,0 +1,109 @@
+import os
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Database pool metrics
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of the pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW_TOTAL = Counter(
+    "db_pool_overflow",
+    "Connections opened beyond pool_size",
+    ["engine"],
+)
+DB_POOL_TIMEOUTS_TOTAL = Counter(
+    "db_pool_timeouts",
+    "Checkouts that gave up after pool_timeout",
+    ["engine"],
+)
+
+# Assessment job queue metrics
+JOB_QUEUE_DEPTH = Gauge(
+    "assessment_job_queue_depth",
+    "Assessment jobs per status",
+    ["status"],
+    multiprocess_mode="mostrecent",
+)
+JOB_OLDEST_PENDING_AGE = Gauge(
+    "assessment_job_oldest_pending_age_seconds",
+    "Age of the oldest runnable pending assessment job",
+    multiprocess_mode="mostrecent",
+)
+JOB_LATENCY = Histogram(
+    "assessment_job_latency_seconds",
+    "Time from enqueue to completion of an assessment job",
+    ["status"],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+JOB_RUN_DURATION = Histogram(
+    "assessment_job_run_duration_seconds",
+    "Time a worker spent running an assessment job",
+    ["status"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+# HTTP request metrics
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, body included, per route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Database query metrics
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time to execute a statement, per engine and statement type",
+    ["engine", "statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+# Health assessment metrics
+ASSESSMENT_STAGE_DURATION = Histogram(
+    "assessment_stage_duration_seconds",
+    "Time spent in each stage of assessing a record's health",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+
+def render_metrics() -> bytes:
+    """The metrics in the text exposition format.
+
+    With PROMETHEUS_MULTIPROC_DIR set (several worker processes behind one
+    port), every process writes its samples there and they are aggregated
+    here, whichever process serves the scrape.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def mark_process_dead() -> None:
+    """Drop this process's live gauges from the aggregate when it exits."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
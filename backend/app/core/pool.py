@@ -0,0 +1,51 @@
+import functools
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from .metrics import (
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_CONNECTIONS_IN_USE,
+    DB_POOL_OVERFLOW_TOTAL,
+    DB_POOL_TIMEOUTS_TOTAL,
+)
+
+
+def instrument_pool(engine: Engine, label: str) -> None:
+    """Record checkout wait time, connections in use and overflow events.
+
+    Uses the pool events, which SQLAlchemy carries over to the new pool when
+    the engine is disposed, and times the engine's ``raw_connection`` (which
+    is ``pool.connect()``) for the wait.
+    """
+    connect = engine.raw_connection
+
+    @functools.wraps(connect)
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS_TOTAL.labels(label).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(label).observe(time.perf_counter() - start)
+
+    engine.raw_connection = timed_connect
+
+    @event.listens_for(engine, "connect")
+    def _connected(dbapi_connection, connection_record) -> None:
+        pool = engine.pool
+        # A connection opened while the overflow count is positive is beyond pool_size
+        if isinstance(pool, QueuePool) and pool.overflow() > 0:
+            DB_POOL_OVERFLOW_TOTAL.labels(label).inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checked_out(dbapi_connection, connection_record, connection_proxy) -> None:
+        DB_POOL_CONNECTIONS_IN_USE.labels(label).inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checked_in(dbapi_connection, connection_record) -> None:
+        DB_POOL_CONNECTIONS_IN_USE.labels(label).dec()
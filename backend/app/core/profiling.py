@@ -0,0 +1,244 @@
+"""On-demand sampling profiles of individual requests.
+
+A request is profiled when it sends PROFILING_TOKEN in ``X-Profile-Token``,
+or at random for PROFILING_SAMPLE_RATE of requests. While it runs, a
+sampler thread records the stack of every thread each PROFILING_INTERVAL_MS:
+the event loop, and the threads running its ``asyncio.to_thread`` work,
+which a deterministic profiler of the loop thread would not see.
+
+Health assessments run in the job worker, not in the request. A job queued
+by a profiled request carries the request's profile id, and the worker
+profiles the job the same way. It saves the job's profile as
+``<profile id>-job<job id>`` in the same PROFILING_DIR, so that directory
+must be shared with the worker for the admin endpoints to serve it.
+
+The loop is shared, so other requests' work in the same period shows up
+too; only one request per process is profiled at a time. Profiles are
+written in the collapsed stack format (one ``frame;frame;frame count``
+line per stack) that flamegraph.pl, speedscope and inferno read, and are
+served by the admin endpoints with the response's ``X-Profile-Id``. The
+admin endpoints themselves are never profiled.
+
+When no request is profiled the middleware costs a header lookup.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import AsyncIterator, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_SUFFIX = ".folded"
+# A request's profile id, or a job's linked to it (see linked_profile_id)
+PROFILE_ID = re.compile(r"^[0-9]+-[0-9a-f]{8}(-job[0-9]+)?$")
+# The admin endpoints take the profiling token too; reading profiles must
+# not save (and evict) profiles of its own
+UNPROFILED_PATH_PREFIX = f"{settings.API_V1_STR}/admin/"
+# File paths in frame labels are shortened to what follows these
+PATH_MARKERS = ("site-packages/", "backend/", os.path.dirname(os.__file__) + "/")
+
+
+def linked_profile_id(profile_id: str, job_id: int) -> str:
+    """Id of the profile of a job queued by the profiled request."""
+    return f"{profile_id}-job{job_id}"
+
+
+def token_matches(token: Optional[str]) -> bool:
+    """Whether a request presented the profiling token (never, if unset)."""
+    if not settings.PROFILING_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token, settings.PROFILING_TOKEN)
+
+
+class StackSampler:
+    """Thread counting the stacks of the process's other threads."""
+
+    def __init__(self, interval: float, max_seconds: float):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self._labels: Dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            # sklearn/... rather than the whole path
+            for marker in PATH_MARKERS:
+                if marker in filename:
+                    filename = filename.split(marker, 1)[1]
+                    break
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._thread.ident:
+                continue
+            stack: List[str] = []
+            current: Optional[FrameType] = frame
+            while current is not None:
+                stack.append(self._label(current.f_code))
+                current = current.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            self._sample()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """The samples in the collapsed stack format."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+class ProfileStore:
+    """Profiles saved as files, so any worker process can serve them."""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def new_id(self) -> str:
+        return f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """The profile's file, if it is a valid id of a saved profile."""
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}{PROFILE_SUFFIX}"
+        return path if path.exists() else None
+
+    def read(self, profile_id: str) -> Optional[str]:
+        """A saved profile's collapsed stacks, without the request line."""
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        _, _, collapsed = path.read_text().partition("\n")
+        return collapsed
+
+    def save(self, profile_id: str, header: str, collapsed: str) -> None:
+        """Write a profile, deleting the oldest beyond max_files."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{profile_id}{PROFILE_SUFFIX}"
+        path.write_text(f"# {header}\n{collapsed}")
+        profiles = self.list()
+        while len(profiles) > self.max_files:
+            oldest = profiles.pop()
+            (self.directory / f"{oldest['id']}{PROFILE_SUFFIX}").unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, str]]:
+        """Saved profiles, newest first, with the request each one profiled."""
+        if not self.directory.exists():
+            return []
+        profiles = []
+        for path in self.directory.glob(f"*{PROFILE_SUFFIX}"):
+            with path.open() as file:
+                header = file.readline().removeprefix("# ").strip()
+            profiles.append({"id": path.stem, "request": header})
+        # Ids start with the creation time
+        return sorted(profiles, key=lambda p: int(p["id"].split("-")[0]), reverse=True)
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+
+# Id of the profile being taken of the running request, for the jobs it queues
+current_profile_id: ContextVar[Optional[str]] = ContextVar(
+    "current_profile_id", default=None
+)
+
+
+@asynccontextmanager
+async def sampling(profile_id: str, label: str) -> AsyncIterator[None]:
+    """Sample every thread's stack while the block runs, then save the profile."""
+    sampler = StackSampler(
+        settings.PROFILING_INTERVAL_MS / 1000, settings.PROFILING_MAX_SECONDS
+    )
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        header = f"{label} {time.perf_counter() - started:.3f}s pid={os.getpid()}"
+        try:
+            await asyncio.to_thread(
+                profile_store.save, profile_id, header, sampler.collapsed()
+            )
+        except OSError:
+            logger.exception("Could not save profile %s", profile_id)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that ask for it, or a random sample."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # One profile at a time; the sampler sees every thread anyway
+        self._busy = False
+
+    def _wanted(self, scope: Scope) -> bool:
+        if scope["path"].startswith(UNPROFILED_PATH_PREFIX):
+            return False
+        if settings.PROFILING_TOKEN:
+            token = Headers(scope=scope).get(PROFILE_TOKEN_HEADER)
+            if token_matches(token):
+                return True
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._busy or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        profile_id = profile_store.new_id()
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        query = scope.get("query_string", b"").decode("latin-1")
+        label = f"{scope['method']} {scope['path']}{'?' + query if query else ''}"
+        token = current_profile_id.set(profile_id)
+        try:
+            async with sampling(profile_id, label):
+                await self.app(scope, receive, send_with_id)
+        finally:
+            current_profile_id.reset(token)
+            self._busy = False
@@ -0,0 +1,170 @@
+"""Tracing of the SQL statements each request or job executes.
+
+With QUERY_TRACING on, ``QueryTraceMiddleware`` records every statement a
+request runs, with its duration, and the worker does the same per job
+(``trace_queries``). A trace flags:
+
+- identical statements (same SQL, same parameters) run more than once,
+  which a request should have remembered rather than re-read;
+- one statement run QUERY_N_PLUS_ONE_THRESHOLD or more times with
+  different parameters, the shape of an N+1 loop;
+- more statements than the endpoint's budget, declared with
+  ``@query_budget(n)``.
+
+Problems are logged; with QUERY_TRACE_ENFORCE_BUDGETS (as in the tests)
+a request over its budget raises QueryBudgetExceeded instead.
+
+Statements are collected by the cursor event hook in ``instrumentation``,
+so an idle tracer costs a context variable lookup per statement.
+"""
+
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Transaction control and transaction-scoped settings, which are not the
+# work a budget is about
+UNTRACED_PREFIXES = (
+    "SAVEPOINT",
+    "RELEASE SAVEPOINT",
+    "ROLLBACK TO SAVEPOINT",
+    "SET LOCAL",
+)
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more statements than its endpoint's budget."""
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare how many statements an endpoint may run per request."""
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries
+        return endpoint
+
+    return decorator
+
+
+class TracedQuery:
+    """A statement run while tracing, and how long it took."""
+
+    def __init__(self, statement: str, parameters: str, seconds: float):
+        self.statement = statement
+        self.parameters = parameters
+        self.seconds = seconds
+
+
+class QueryTrace:
+    """The statements run by one request or job."""
+
+    def __init__(self, name: str, budget: Optional[int] = None):
+        self.name = name
+        self.budget = budget
+        self.queries: List[TracedQuery] = []
+
+    def record(self, statement: str, parameters: Any, seconds: float) -> None:
+        if statement.lstrip().upper().startswith(UNTRACED_PREFIXES):
+            return
+        self.queries.append(TracedQuery(statement, repr(parameters), seconds))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def seconds(self) -> float:
+        return sum(query.seconds for query in self.queries)
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Statements run more than once with the same parameters, and how often."""
+        counts = Counter((query.statement, query.parameters) for query in self.queries)
+        return [(statement, n) for (statement, _), n in counts.items() if n > 1]
+
+    def n_plus_one(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run at least threshold times, and how often."""
+        counts = Counter(query.statement for query in self.queries)
+        return [(statement, n) for statement, n in counts.items() if n >= threshold]
+
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def problems(self) -> List[str]:
+        """Descriptions of what the trace flags, if anything."""
+        problems = []
+        if self.over_budget():
+            problems.append(f"{self.count} statements, budget {self.budget}")
+        for statement, n in self.repeated():
+            problems.append(f"identical statement run {n} times: {_short(statement)}")
+        for statement, n in self.n_plus_one(settings.QUERY_N_PLUS_ONE_THRESHOLD):
+            problems.append(f"possible N+1, run {n} times: {_short(statement)}")
+        return problems
+
+    def report(self) -> None:
+        """Log the trace, as a warning if it flags anything."""
+        problems = self.problems()
+        summary = f"{self.name}: {self.count} statements in {self.seconds * 1000:.1f}ms"
+        if problems:
+            logger.warning("%s; %s", summary, "; ".join(problems))
+        else:
+            logger.debug(summary)
+
+
+def _short(statement: str, length: int = 120) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= length else statement[:length] + "..."
+
+
+_current_trace: ContextVar[Optional[QueryTrace]] = ContextVar(
+    "current_query_trace", default=None
+)
+
+
+def record_query(statement: str, parameters: Any, seconds: float) -> None:
+    """Add a statement to the trace of the running request or job, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(statement, parameters, seconds)
+
+
+@contextmanager
+def trace_queries(name: str, budget: Optional[int] = None) -> Iterator[QueryTrace]:
+    """Trace the statements run inside the block (and the tasks it starts)."""
+    trace = QueryTrace(name, budget)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+class QueryTraceMiddleware:
+    """ASGI middleware tracing each request's statements when QUERY_TRACING is on."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.QUERY_TRACING:
+            await self.app(scope, receive, send)
+            return
+
+        with trace_queries(f"{scope['method']} {scope['path']}") as trace:
+            await self.app(scope, receive, send)
+        # Set by the router once a route matched
+        trace.budget = getattr(scope.get("endpoint"), "query_budget", None)
+        trace.report()
+        if settings.QUERY_TRACE_ENFORCE_BUDGETS and trace.over_budget():
+            raise QueryBudgetExceeded(
+                f"{trace.name} ran {trace.count} statements, budget {trace.budget}:\n"
+                + "\n".join(_short(query.statement) for query in trace.queries)
+            )
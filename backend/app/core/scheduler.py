@@ -0,0 +1,56 @@
+from app.services.analysis_runner import run_scheduled_analysis
+from app.services.anomaly import refresh_anomaly_detector
+from app.services.histogram import refresh_histograms
+from app.services.sketch import refresh_quantile_sketches
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from .config import get_settings
+from .idempotency import purge_idempotency_keys
+
+settings = get_settings()
+
+
+def create_scheduler() -> AsyncIOScheduler:
+    """Build the scheduler for the periodic jobs run by the API process."""
+    scheduler = AsyncIOScheduler(timezone="UTC")
+    # Every API process schedules the job; the runner's advisory lock and
+    # watermark make sure each record is analyzed once
+    scheduler.add_job(
+        run_scheduled_analysis,
+        IntervalTrigger(minutes=settings.ANALYSIS_INTERVAL_MINUTES),
+        id="incremental_analysis",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        refresh_quantile_sketches,
+        IntervalTrigger(seconds=settings.QUANTILE_SKETCH_REFRESH_SECONDS),
+        id="quantile_sketch_refresh",
+        max_instances=1,
+        coalesce=True,
+    )
+    # Also reloads this process's cached distributions when they changed
+    scheduler.add_job(
+        refresh_histograms,
+        IntervalTrigger(seconds=settings.HISTOGRAM_REFRESH_SECONDS),
+        id="histogram_refresh",
+        max_instances=1,
+        coalesce=True,
+    )
+    # The detector is per process, so each process refreshes its own
+    scheduler.add_job(
+        refresh_anomaly_detector,
+        IntervalTrigger(minutes=settings.ANOMALY_DETECTOR_REFRESH_MINUTES),
+        id="anomaly_detector_refresh",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        purge_idempotency_keys,
+        IntervalTrigger(minutes=settings.IDEMPOTENCY_PURGE_INTERVAL_MINUTES),
+        id="idempotency_key_purge",
+        max_instances=1,
+        coalesce=True,
+    )
+    return scheduler
@@ -0,0 +1,137 @@
+"""Start-up work done before an API process reports ready.
+
+The lifespan handler runs ``warm_up.run`` in the background so the process
+starts serving (and answering ``/health``) at once, while ``/ready`` stays
+503 until every step has finished. A deploy that waits for ``/ready``
+sends no traffic to a cold process: the pool has its connections, the
+model is trained, the caches are filled and the SMTP server has answered.
+
+Steps are either required (the process is never ready if they failed) or
+best effort (a failure is logged and the work is left to the first request
+that needs it, as before).
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from app.services.anomaly import anomaly_detector
+from app.services.health import risk_model
+from app.services.histogram import distribution_cache
+from app.services.llm import llm_service
+from app.services.notification import NotificationService
+from sqlalchemy import text
+
+from .config import get_settings
+from .database import AsyncSessionLocal, async_engine
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Readiness waits for every step, so an unreachable SMTP server is given up
+# on quickly
+SMTP_CHECK_TIMEOUT_SECONDS = 5
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+async def prime_pool() -> None:
+    """Open the pool's connections now rather than on the first requests."""
+    async with AsyncExitStack() as stack:
+        # Held together, so each is a separate connection left in the pool
+        connections = [
+            await stack.enter_async_context(async_engine.connect())
+            for _ in range(settings.DB_POOL_SIZE)
+        ]
+        for connection in connections:
+            await connection.execute(text("SELECT 1"))
+
+
+async def load_risk_model() -> None:
+    """Train the model used to score records on create."""
+    async with AsyncSessionLocal() as db:
+        await risk_model.load(db)
+
+
+async def load_caches() -> None:
+    """Fill the distributions cache and seed the anomaly detector."""
+    async with AsyncSessionLocal() as db:
+        await distribution_cache.load(db)
+        await anomaly_detector.seed(db)
+
+
+async def load_clients() -> None:
+    """Build the LLM client, which is otherwise built on first use."""
+    # Imports huggingface_hub, so off the event loop
+    await asyncio.to_thread(getattr, llm_service, "client")
+
+
+async def check_smtp() -> None:
+    """Reach the SMTP server now, so a bad EMAIL_HOST shows up at start-up.
+
+    Emails open a connection of their own each, so this only resolves the
+    host and checks it answers.
+    """
+    await NotificationService().check_connection(SMTP_CHECK_TIMEOUT_SECONDS)
+
+
+class WarmUp:
+    """Progress of this process's start-up steps."""
+
+    def __init__(self):
+        """Initialize with nothing run yet."""
+        self.status: Dict[str, str] = {}
+        self.required: Dict[str, bool] = {}
+        self.seconds: Dict[str, float] = {}
+
+    @property
+    def complete(self) -> bool:
+        """Whether every step has run and none that is required failed."""
+        if not self.status:
+            return False
+        return all(
+            status == DONE or (status == FAILED and not self.required[name])
+            for name, status in self.status.items()
+        )
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[None]]) -> None:
+        started = time.perf_counter()
+        try:
+            await step()
+            self.status[name] = DONE
+        except Exception:
+            self.status[name] = FAILED
+            logger.exception("Warm-up step %s failed", name)
+        finally:
+            self.seconds[name] = round(time.perf_counter() - started, 3)
+
+    async def run(self, steps: List[Tuple[str, Callable, bool]]) -> None:
+        """Run (name, step, required) steps concurrently."""
+        for name, _, required in steps:
+            self.status[name] = PENDING
+            self.required[name] = required
+        await asyncio.gather(*(self._run_step(name, step) for name, step, _ in steps))
+        logger.info("Warm-up finished: %s", self.status)
+
+
+def warm_up_steps() -> List[Tuple[str, Callable, bool]]:
+    """The steps run at start-up, as (name, step, required)."""
+    steps = [
+        ("database", prime_pool, True),
+        ("caches", load_caches, False),
+        ("clients", load_clients, False),
+    ]
+    if settings.ENABLE_NOTIFICATIONS:
+        steps.append(("smtp", check_smtp, False))
+    if settings.RISK_MODEL_PRELOAD:
+        # Until it is trained records are not scored on create
+        steps.append(("risk_model", load_risk_model, False))
+    return steps
+
+
+# Shared by the requests of this process
+warm_up = WarmUp()
@@ -1,6 +1,20 @@
+from app.models.analysis import Base as AnalysisBase
+from app.models.anomaly import Base as AnomalyBase
 from app.models.diabetes import Base as DiabetesBase
 from app.models.health import Base as HealthBase
+from app.models.idempotency import Base as IdempotencyBase
+from app.models.job import Base as JobBase
+from app.models.stats import Base as StatsBase
 from app.models.user import Base as UserBase
 
 # Combine all metadata
-metadata = [DiabetesBase.metadata, HealthBase.metadata, UserBase.metadata]
+metadata = [
+    AnalysisBase.metadata,
+    AnomalyBase.metadata,
+    DiabetesBase.metadata,
+    HealthBase.metadata,
+    IdempotencyBase.metadata,
+    JobBase.metadata,
+    StatsBase.metadata,
+    UserBase.metadata,
+]
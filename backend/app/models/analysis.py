@@ -0,0 +1,39 @@
+from app.core.database import Base
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, Integer, Numeric
+from sqlalchemy.sql import func
+
+
+class AnalysisRun(Base):
+    """One scheduled, incremental analysis pass.
+
+    Each run covers the records after the previous run's watermark and
+    carries the running totals forward, so the latest row is the merged
+    analysis of everything up to its watermark.
+    """
+
+    __tablename__ = "analysis_runs"
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    # Highest diabetes_records.id included in this run
+    watermark = Column(Integer, nullable=False)
+
+    # This run's window
+    records = Column(Integer, nullable=False)
+    positive_cases = Column(Integer, nullable=False)
+    anomalies = Column(JSON, nullable=False, comment="Outliers per feature")
+
+    # Running totals up to the watermark
+    total_records = Column(Integer, nullable=False)
+    total_positive_cases = Column(Integer, nullable=False)
+    total_glucose = Column(Numeric, nullable=False)
+    total_bmi = Column(Numeric, nullable=False)
+    total_age = Column(Numeric, nullable=False)
+    positive_rate = Column(Float, nullable=False, comment="Fraction, 0-1")
+
+    threshold_crossed = Column(Boolean, nullable=False, default=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,31 @@
+from app.core.database import Base
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+
+class AnomalyFlag(Base):
+    """A record feature flagged as anomalous when the record was created."""
+
+    __tablename__ = "anomaly_flags"
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    diabetes_record_id = Column(
+        Integer, ForeignKey("diabetes_records.id"), nullable=False
+    )
+    feature = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
+
+    # What the value was judged against at write time
+    zscore = Column(Float, nullable=True, comment="Null when the feature is constant")
+    lower_fence = Column(Float, nullable=False)
+    upper_fence = Column(Float, nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_anomaly_flags_diabetes_record_id", "diabetes_record_id"),
+    )
@@ -1,10 +1,32 @@
 import enum
 
 from app.core.database import Base
-from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    text,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
+# Model input features, in training column order
+FEATURE_COLUMNS = [
+    "pregnancies",
+    "glucose",
+    "blood_pressure",
+    "skin_thickness",
+    "insulin",
+    "bmi",
+    "diabetes_pedigree",
+    "age",
+]
+
 
 class DataSource(str, enum.Enum):
     """Source of the diabetes record data."""
@@ -54,13 +76,13 @@ class DiabetesRecord(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     user = relationship("User", back_populates="diabetes_records")
 
-    health_assessment_id = Column(
-        Integer, ForeignKey("health_assessments.id"), nullable=True
-    )
+    # health_assessments is partitioned and its id alone is not unique there,
+    # so this link is not enforced with a foreign key
+    health_assessment_id = Column(Integer, nullable=True)
     health_assessment = relationship(
         "HealthAssessment",
         back_populates="diabetes_records",
-        foreign_keys=[health_assessment_id],
+        primaryjoin="foreign(DiabetesRecord.health_assessment_id) == HealthAssessment.id",
     )
     # One-to-many relationship: a diabetes record can have multiple health assessments
     health_assessments = relationship(
@@ -68,3 +90,19 @@ class DiabetesRecord(Base):
         back_populates="diabetes_record",
         foreign_keys="HealthAssessment.diabetes_record_id",
     )
+
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), optionally scoped by source/user
+        Index("ix_diabetes_records_created_at_id", "created_at", "id"),
+        Index("ix_diabetes_records_source_created_at_id", "source", "created_at", "id"),
+        Index(
+            "ix_diabetes_records_user_id_created_at_id", "user_id", "created_at", "id"
+        ),
+        # Model training reads every dataset row: answer it from the index alone
+        Index(
+            "ix_diabetes_records_dataset",
+            "id",
+            postgresql_include=FEATURE_COLUMNS + ["outcome"],
+            postgresql_where=text("source = 'DATASET'"),
+        ),
+    )
@@ -1,22 +1,53 @@
+import enum
 from datetime import datetime
 
+from app.core.cache import CACHE_INVALIDATION_FUNCTION, invalidation_triggers
 from app.core.database import Base
-from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    DDL,
+    JSON,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+)
 from sqlalchemy.orm import relationship
 
 
+class AssessmentStatus(str, enum.Enum):
+    """How far a health assessment has got."""
+
+    # Scored; recommendations and the notification are still to come
+    PENDING_ENRICHMENT = "pending_enrichment"
+    COMPLETE = "complete"
+
+
 class HealthAssessment(Base):
     __tablename__ = "health_assessments"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     diabetes_record_id = Column(
         Integer, ForeignKey("diabetes_records.id"), nullable=False
     )
     risk_score = Column(Float, nullable=False)
     risk_level = Column(String, nullable=False)
-    recommendations = Column(JSON, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    recommendations = Column(JSON, nullable=True)
+    status = Column(
+        Enum(AssessmentStatus),
+        nullable=False,
+        default=AssessmentStatus.COMPLETE,
+        server_default=AssessmentStatus.COMPLETE.name,
+    )
+    # Partition key, so it must be part of the table's primary key
+    created_at = Column(
+        DateTime, primary_key=True, default=datetime.utcnow, nullable=False
+    )
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -30,5 +61,37 @@ class HealthAssessment(Base):
     diabetes_records = relationship(
         "DiabetesRecord",
         back_populates="health_assessment",
-        foreign_keys="DiabetesRecord.health_assessment_id",
+        primaryjoin="HealthAssessment.id == foreign(DiabetesRecord.health_assessment_id)",
+    )
+
+    __table_args__ = (
+        Index("ix_health_assessments_user_id_created_at", "user_id", "created_at"),
+        Index("ix_health_assessments_diabetes_record_id", "diabetes_record_id"),
+        # Monthly range partitions, see app/services/partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # ids are still unique (one sequence), so the ORM identity stays id alone
+    __mapper_args__ = {"primary_key": [id]}
+
+
+# Tables created from metadata (tests, fresh installs) need somewhere to put rows
+# before the monthly partitions exist
+event.listen(
+    HealthAssessment.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE health_assessments_default "
+        "PARTITION OF health_assessments DEFAULT"
+    ),
+)
+
+# Assessment responses are cached by the API; drop them when their row is written
+for statement in [
+    CACHE_INVALIDATION_FUNCTION,
+    *invalidation_triggers("health_assessments"),
+]:
+    event.listen(
+        HealthAssessment.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
     )
@@ -0,0 +1,26 @@
+from app.core.database import Base
+from sqlalchemy import Column, DateTime, Index, LargeBinary, SmallInteger, String
+from sqlalchemy.sql import func
+
+
+class IdempotencyKey(Base):
+    """Model for the stored first response to a request with an Idempotency-Key."""
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    # sha256 of the method, URL and body the key was first used with
+    fingerprint = Column(String(64), nullable=False)
+    # Null while the first request is still running
+    status_code = Column(SmallInteger, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # Expired keys are purged by age
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
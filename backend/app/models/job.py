@@ -0,0 +1,76 @@
+import enum
+
+from app.core.database import Base
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
+from sqlalchemy.sql import func
+
+
+class JobStatus(str, enum.Enum):
+    """Lifecycle state of a queued job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class AssessmentJob(Base):
+    """Model for queued health assessment jobs."""
+
+    __tablename__ = "assessment_jobs"
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    diabetes_record_id = Column(
+        Integer, ForeignKey("diabetes_records.id"), nullable=False
+    )
+
+    status = Column(
+        Enum(JobStatus),
+        nullable=False,
+        default=JobStatus.PENDING,
+        server_default=JobStatus.PENDING.name,
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+    locked_by = Column(String, nullable=True)
+    # X-Profile-Id of the profiled request that queued the job, if any
+    profile_id = Column(String(64), nullable=True)
+
+    run_after = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Claim query only ever scans runnable jobs
+        Index(
+            "ix_assessment_jobs_pending",
+            "run_after",
+            "id",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "ix_assessment_jobs_running",
+            "started_at",
+            postgresql_where=text("status = 'RUNNING'"),
+        ),
+    )
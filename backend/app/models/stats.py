@@ -0,0 +1,180 @@
+from app.core.database import Base
+from app.models.diabetes import FEATURE_COLUMNS, DataSource
+from sqlalchemy import (
+    DDL,
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    Integer,
+    Numeric,
+    SmallInteger,
+    String,
+    event,
+)
+from sqlalchemy.sql import func
+
+# Pseudo-feature whose count is the number of records
+RECORDS_FEATURE = "*"
+# Tracked per source: every model feature, plus outcome as 0/1 so its sum is
+# the number of positive cases
+STATS_FEATURES = FEATURE_COLUMNS + ["outcome"]
+# Concurrent writers update different shards instead of queueing on one row
+RECORD_STATS_SHARDS = 16
+# Fixed histogram bins per feature as (low, high, bins); values below low or
+# at/above high land in the underflow (0) and overflow (bins + 1) buckets
+HISTOGRAM_BINS = {
+    "pregnancies": (0, 20, 20),
+    "glucose": (0, 300, 30),
+    "blood_pressure": (0, 150, 30),
+    "skin_thickness": (0, 100, 20),
+    "insulin": (0, 900, 30),
+    "bmi": (0, 70, 28),
+    "diabetes_pedigree": (0, 2.5, 25),
+    "age": (20, 100, 16),
+}
+# Histograms are split by outcome; records without one are "unknown"
+HISTOGRAM_OUTCOMES = ["positive", "negative", "unknown"]
+
+
+class RecordStats(Base):
+    """Running aggregates of diabetes_records, kept current by triggers."""
+
+    __tablename__ = "record_stats"
+
+    source = Column(Enum(DataSource), primary_key=True)
+    feature = Column(String, primary_key=True)
+    shard = Column(SmallInteger, primary_key=True)
+
+    # Non-null values seen, their sum and sum of squares (exact, no drift)
+    count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    sum = Column(Numeric, nullable=False, default=0, server_default="0")
+    sum_squares = Column(Numeric, nullable=False, default=0, server_default="0")
+
+
+class QuantileSketch(Base):
+    """KLL quantile sketch of one feature for one record source."""
+
+    __tablename__ = "quantile_sketches"
+
+    source = Column(Enum(DataSource), primary_key=True)
+    feature = Column(String, primary_key=True)
+
+    count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    sketch = Column(JSON, nullable=False, comment="KllSketch.to_dict()")
+    # Highest diabetes_records.id folded into the sketch
+    watermark = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class HistogramBucket(Base):
+    """Record count in one histogram bin of a feature, per outcome."""
+
+    __tablename__ = "histogram_buckets"
+
+    feature = Column(String, primary_key=True)
+    outcome = Column(String, primary_key=True)
+    bucket = Column(SmallInteger, primary_key=True, comment="width_bucket() result")
+
+    count = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+class StatsWatermark(Base):
+    """Highest diabetes_records.id folded into an incrementally built statistic."""
+
+    __tablename__ = "stats_watermarks"
+
+    name = Column(String, primary_key=True)
+    watermark = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+def _feature_values(alias: str) -> str:
+    """Unpivot a transition table row into (feature, value) pairs."""
+    pairs = [f"('{RECORDS_FEATURE}', 1::numeric)"]
+    for feature in FEATURE_COLUMNS:
+        pairs.append(f"('{feature}', {alias}.{feature}::numeric)")
+    pairs.append(f"('outcome', {alias}.outcome::int::numeric)")
+    return ", ".join(pairs)
+
+
+def _apply_delta(transition_table: str, sign: str) -> str:
+    return f"""
+        INSERT INTO record_stats (source, feature, shard, count, sum, sum_squares)
+        SELECT r.source, f.feature, pg_backend_pid() % {RECORD_STATS_SHARDS},
+               {sign}count(f.value), {sign}coalesce(sum(f.value), 0),
+               {sign}coalesce(sum(f.value * f.value), 0)
+        FROM {transition_table} r
+        CROSS JOIN LATERAL (VALUES {_feature_values("r")}) AS f(feature, value)
+        GROUP BY r.source, f.feature
+        -- Lock rows in a fixed order so concurrent statements cannot deadlock
+        ORDER BY r.source, f.feature
+        ON CONFLICT (source, feature, shard) DO UPDATE SET
+            count = record_stats.count + excluded.count,
+            sum = record_stats.sum + excluded.sum,
+            sum_squares = record_stats.sum_squares + excluded.sum_squares;
+    """
+
+
+RECORD_STATS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION record_stats_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM record_stats;
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {_apply_delta("old_rows", "-")}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {_apply_delta("new_rows", "")}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Transition tables allow only one event per trigger
+RECORD_STATS_TRIGGERS = [
+    """
+    CREATE OR REPLACE TRIGGER record_stats_insert AFTER INSERT ON diabetes_records
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_stats_apply()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER record_stats_update AFTER UPDATE ON diabetes_records
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_stats_apply()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER record_stats_delete AFTER DELETE ON diabetes_records
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_stats_apply()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER record_stats_truncate AFTER TRUNCATE ON diabetes_records
+    FOR EACH STATEMENT EXECUTE FUNCTION record_stats_apply()
+    """,
+]
+
+# Tables created from metadata (tests, fresh installs) get the triggers too;
+# after the whole metadata so diabetes_records exists. DDL %-formats its text.
+for statement in [RECORD_STATS_FUNCTION] + RECORD_STATS_TRIGGERS:
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(statement.replace("%", "%%")).execute_if(dialect="postgresql"),
+    )
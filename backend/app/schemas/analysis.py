@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class FeatureStatistics(BaseModel):
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    min: Optional[float] = None
+    p25: Optional[float] = None
+    median: Optional[float] = None
+    p75: Optional[float] = None
+    max: Optional[float] = None
+    iqr_outliers: int = Field(0, description="Values outside the IQR fences")
+    zscore_outliers: int = Field(0, description="Values beyond the z-score threshold")
+
+
+class Anomaly(BaseModel):
+    record_id: int
+    value: float
+    deviation: Optional[float] = Field(
+        None, description="Standard deviations from the mean"
+    )
+
+
+class AnalysisResult(BaseModel):
+    total_records: int
+    positive_cases: int
+    positive_rate: float = Field(..., description="Percentage of positive outcomes")
+    average_glucose: float
+    average_bmi: float
+    average_age: float
+    statistics: Dict[str, FeatureStatistics]
+    anomalies: Dict[str, List[Anomaly]] = Field(
+        ..., description="Most extreme anomalies per feature"
+    )
+    risk_assessment: str
+    recommendations: List[str]
+    preventive_measures: List[str]
+
+
+class GroupRate(BaseModel):
+    count: int
+    diabetes_rate: float = Field(..., description="Percentage of positive outcomes")
+
+
+class AgeGroup(GroupRate):
+    age_range: str
+
+
+class BmiCategory(GroupRate):
+    category: str
+
+
+class Insights(BaseModel):
+    age_groups: List[AgeGroup]
+    bmi_categories: List[BmiCategory]
+    bmi_risk: str
+    risk_assessment: str
+    recommendations: List[str]
+    preventive_measures: List[str]
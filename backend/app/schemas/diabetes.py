@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 
 from app.models.diabetes import DataSource
+from app.schemas.health import HealthAssessment
 from pydantic import BaseModel, Field
 
 
@@ -25,6 +27,65 @@ class DiabetesRecordCreate(DiabetesRecordBase):
     user_id: int = Field(gt=0, description="ID of the user who owns this record")
 
 
+class DiabetesRecordFilter(BaseModel):
+    """Query filters for listing diabetes records (ranges are inclusive)."""
+
+    source: Optional[DataSource] = None
+    user_id: Optional[int] = None
+    outcome: Optional[bool] = None
+    pregnancies_min: Optional[int] = None
+    pregnancies_max: Optional[int] = None
+    glucose_min: Optional[int] = None
+    glucose_max: Optional[int] = None
+    blood_pressure_min: Optional[int] = None
+    blood_pressure_max: Optional[int] = None
+    skin_thickness_min: Optional[int] = None
+    skin_thickness_max: Optional[int] = None
+    insulin_min: Optional[int] = None
+    insulin_max: Optional[int] = None
+    bmi_min: Optional[float] = None
+    bmi_max: Optional[float] = None
+    diabetes_pedigree_min: Optional[float] = None
+    diabetes_pedigree_max: Optional[float] = None
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
+
+
+class ExportFormat(str, Enum):
+    """Encoding of a diabetes record export."""
+
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+class DiabetesRecordBulkRow(DiabetesRecordBase):
+    """Schema for one row of a bulk diabetes record upload."""
+
+    user_id: Optional[int] = Field(
+        None, gt=0, description="ID of the user who owns this record, if any"
+    )
+
+
+class BulkRowError(BaseModel):
+    """Validation or load error for one uploaded row."""
+
+    row: int = Field(description="1-based data row number in the upload")
+    errors: List[str]
+
+
+class BulkIngestResult(BaseModel):
+    """Summary of a bulk diabetes record upload."""
+
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    assessments_enqueued: int = 0
+    errors: List[BulkRowError] = []
+    errors_truncated: bool = Field(
+        False, description="Whether more errors occurred than are listed"
+    )
+
+
 class DiabetesRecordUpdate(BaseModel):
     """Schema for updating a diabetes record."""
 
@@ -58,3 +119,13 @@ class DiabetesRecord(DiabetesRecordInDB):
     """Schema for diabetes record data returned to the client."""
 
     pass
+
+
+class DiabetesRecordCreated(DiabetesRecord):
+    """Schema for a newly created diabetes record."""
+
+    assessment: Optional[HealthAssessment] = Field(
+        None,
+        description="Risk score computed on creation, when requested; "
+        "recommendations follow asynchronously",
+    )
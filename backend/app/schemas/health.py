@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
+from app.models.health import AssessmentStatus
 from pydantic import BaseModel, Field
 
 
@@ -13,8 +14,8 @@ class RecommendationDetails(BaseModel):
 class HealthAssessmentBase(BaseModel):
     risk_score: float = Field(..., description="Calculated risk score (0-1)")
     risk_level: str = Field(..., description="Risk level (low/medium/high)")
-    recommendations: RecommendationDetails = Field(
-        ..., description="Details of health recommendations"
+    recommendations: Optional[RecommendationDetails] = Field(
+        None, description="Details of health recommendations, once enriched"
     )
 
 
@@ -25,6 +26,9 @@ class HealthAssessmentCreate(HealthAssessmentBase):
 
 class HealthAssessmentInDB(HealthAssessmentBase):
     id: int
+    status: AssessmentStatus = Field(
+        ..., description="pending_enrichment until recommendations are added"
+    )
     user_id: int
     diabetes_record_id: int
     created_at: datetime
@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.models.diabetes import DataSource
+from pydantic import BaseModel, Field
+
+
+class FeatureMoments(BaseModel):
+    count: int = Field(..., description="Non-null values")
+    mean: Optional[float] = None
+    variance: Optional[float] = None
+    std: Optional[float] = None
+
+
+class StatsSummary(BaseModel):
+    source: Optional[DataSource] = None
+    total_records: int
+    positive_cases: int
+    positive_rate: float = Field(..., description="Percentage of positive outcomes")
+    features: Dict[str, FeatureMoments]
+
+
+class FeatureQuantiles(BaseModel):
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    quantiles: Dict[float, Optional[float]]
+
+
+class StatsQuantiles(BaseModel):
+    source: Optional[DataSource] = None
+    watermark: int = Field(..., description="Highest record id in the sketches")
+    rank_error: float = Field(
+        ...,
+        description=(
+            "Normalized rank error (99% confidence): the value returned for "
+            "quantile q has a true rank within q -+ rank_error"
+        ),
+    )
+    features: Dict[str, FeatureQuantiles]
+
+
+class HistogramBin(BaseModel):
+    low: Optional[float] = Field(None, description="Inclusive; none for underflow")
+    high: Optional[float] = Field(None, description="Exclusive; none for overflow")
+    counts: Dict[str, int] = Field(..., description="Records per outcome")
+
+
+class StatsDistributions(BaseModel):
+    watermark: int = Field(..., description="Highest record id in the counts")
+    features: Dict[str, List[HistogramBin]]
+
+
+class AnomalyFlag(BaseModel):
+    id: int
+    diabetes_record_id: int
+    feature: str
+    value: float
+    zscore: Optional[float] = None
+    lower_fence: float
+    upper_fence: float
+    created_at: datetime
+
+    class Config:
+        """Pydantic config."""
+
+        from_attributes = True
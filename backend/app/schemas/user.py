@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr
+from app.schemas.diabetes import DiabetesRecordBase, DiabetesRecordCreated
+from pydantic import BaseModel, EmailStr, Field
 
 
 class UserBase(BaseModel):
@@ -43,3 +44,20 @@ class UserResponse(UserInDB):
     """Schema for user data returned to the client."""
 
     pass
+
+
+class OnboardingRequest(BaseModel):
+    """Schema for signing a user up with their first diabetes record."""
+
+    user: UserCreate
+    record: DiabetesRecordBase
+
+
+class OnboardingResponse(BaseModel):
+    """Schema for the user and record created by onboarding."""
+
+    user: UserResponse
+    user_created: bool = Field(
+        description="False when a user with this email already existed"
+    )
+    record: DiabetesRecordCreated
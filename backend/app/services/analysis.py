@@ -0,0 +1,330 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.models.diabetes import FEATURE_COLUMNS, DiabetesRecord
+from app.schemas.diabetes import DiabetesRecordFilter
+from app.services import llm
+from app.services.records import RecordListService
+from app.services.stats import RecordStatsService
+from sqlalchemy import (
+    Float,
+    Integer,
+    String,
+    Subquery,
+    case,
+    cast,
+    column,
+    func,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PERCENTILES = [0.25, 0.5, 0.75]
+
+BMI_CATEGORIES = [
+    ("underweight", 18.5),
+    ("normal", 25.0),
+    ("overweight", 30.0),
+    ("obese", None),
+]
+
+
+def _float(value: Any) -> Optional[float]:
+    """Convert a numeric aggregate (possibly Decimal or NULL) to float."""
+    return None if value is None else float(value)
+
+
+class AnalysisService:
+    """Dataset-wide statistics and anomalies, computed inside Postgres."""
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the service."""
+        self.db = db
+
+    def _records(self, filters: Optional[DiabetesRecordFilter]) -> Subquery:
+        """The (filtered) records every aggregate runs over."""
+        query = select(
+            DiabetesRecord.id,
+            DiabetesRecord.outcome,
+            *(getattr(DiabetesRecord, feature) for feature in FEATURE_COLUMNS),
+        )
+        if filters is not None:
+            query = RecordListService.apply_filters(query, filters)
+        return query.subquery("records")
+
+    async def get_filtered_data(
+        self, filters: Optional[DiabetesRecordFilter] = None, limit: int = 1000
+    ) -> List[DiabetesRecord]:
+        """Get the newest records matching the filters."""
+        query = select(DiabetesRecord)
+        if filters is not None:
+            query = RecordListService.apply_filters(query, filters)
+        query = query.order_by(
+            DiabetesRecord.created_at.desc(), DiabetesRecord.id.desc()
+        ).limit(limit)
+        return list((await self.db.execute(query)).scalars().all())
+
+    async def _summary(self, records: Subquery) -> Dict[str, Any]:
+        """First pass: counts, moments and percentiles in one aggregate scan."""
+        columns = [
+            func.count().label("total_records"),
+            func.count().filter(records.c.outcome.is_(True)).label("positive_cases"),
+        ]
+        for feature in FEATURE_COLUMNS:
+            value = records.c[feature]
+            columns += [
+                func.avg(value).label(f"{feature}_mean"),
+                func.stddev_pop(value).label(f"{feature}_std"),
+                func.min(value).label(f"{feature}_min"),
+                func.max(value).label(f"{feature}_max"),
+                func.percentile_cont(array(PERCENTILES))
+                .within_group(value)
+                .label(f"{feature}_percentiles"),
+            ]
+        row = (await self.db.execute(select(*columns))).one()._mapping
+
+        statistics = {}
+        for feature in FEATURE_COLUMNS:
+            p25, median, p75 = row[f"{feature}_percentiles"] or (None, None, None)
+            statistics[feature] = {
+                "mean": _float(row[f"{feature}_mean"]),
+                "std": _float(row[f"{feature}_std"]),
+                "min": _float(row[f"{feature}_min"]),
+                "p25": p25,
+                "median": median,
+                "p75": p75,
+                "max": _float(row[f"{feature}_max"]),
+                "iqr_outliers": 0,
+                "zscore_outliers": 0,
+            }
+
+        total = row["total_records"]
+        positives = row["positive_cases"]
+        return {
+            "total_records": total,
+            "positive_cases": positives,
+            "positive_rate": positives / total * 100 if total else 0.0,
+            "average_glucose": statistics["glucose"]["mean"] or 0.0,
+            "average_bmi": statistics["bmi"]["mean"] or 0.0,
+            "average_age": statistics["age"]["mean"] or 0.0,
+            "statistics": statistics,
+        }
+
+    async def _anomalies(
+        self, records: Subquery, statistics: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Second pass: count and rank IQR/z-score outliers for every feature.
+
+        The features are unpivoted so one scan covers all of them; only the
+        most extreme anomalies per feature leave the database.
+        """
+        anomalies: Dict[str, List[Dict[str, Any]]] = {f: [] for f in FEATURE_COLUMNS}
+        fences = []
+        for feature, stats in statistics.items():
+            if stats["p25"] is None:
+                continue
+            spread = (stats["p75"] - stats["p25"]) * settings.ANALYSIS_IQR_MULTIPLIER
+            fences.append(
+                (
+                    feature,
+                    stats["mean"],
+                    stats["std"] or None,
+                    stats["p25"] - spread,
+                    stats["p75"] + spread,
+                )
+            )
+        if not fences:
+            return anomalies
+
+        bounds = values(
+            column("feature", String),
+            column("mean", Float),
+            column("std", Float),
+            column("low", Float),
+            column("high", Float),
+            name="bounds",
+        ).data(fences)
+        unpivoted = (
+            func.unnest(
+                array([literal(feature) for feature in FEATURE_COLUMNS]),
+                array([cast(records.c[f], Float) for f in FEATURE_COLUMNS]),
+            )
+            .table_valued("feature", "value")
+            .render_derived(name="features")
+            .lateral()
+        )
+
+        value = unpivoted.c.value
+        deviation = (value - bounds.c.mean) / bounds.c.std
+        is_iqr_outlier = or_(value < bounds.c.low, value > bounds.c.high)
+        is_zscore_outlier = func.abs(deviation) > settings.ANALYSIS_ZSCORE_THRESHOLD
+        by_feature = {"partition_by": unpivoted.c.feature}
+        flagged = (
+            select(
+                unpivoted.c.feature,
+                records.c.id.label("record_id"),
+                value.label("value"),
+                deviation.label("deviation"),
+                func.count()
+                .filter(is_iqr_outlier)
+                .over(**by_feature)
+                .label("iqr_outliers"),
+                func.count()
+                .filter(is_zscore_outlier)
+                .over(**by_feature)
+                .label("zscore_outliers"),
+                func.row_number()
+                .over(order_by=func.abs(value - bounds.c.mean).desc(), **by_feature)
+                .label("rank"),
+            )
+            .select_from(records)
+            .join(unpivoted, true())
+            .join(bounds, bounds.c.feature == unpivoted.c.feature)
+            .where(or_(is_iqr_outlier, is_zscore_outlier))
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(flagged)
+            .where(flagged.c.rank <= settings.ANALYSIS_MAX_ANOMALIES)
+            .order_by(flagged.c.feature, flagged.c.rank)
+        )
+
+        for row in result.mappings():
+            stats = statistics[row["feature"]]
+            stats["iqr_outliers"] = row["iqr_outliers"]
+            stats["zscore_outliers"] = row["zscore_outliers"]
+            anomalies[row["feature"]].append(
+                {
+                    "record_id": row["record_id"],
+                    "value": row["value"],
+                    "deviation": row["deviation"],
+                }
+            )
+        return anomalies
+
+    async def recommendations(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Ask the LLM for recommendations on the summary metrics."""
+        try:
+            # The LLM client blocks (HTTP call and rate limiting)
+            return await asyncio.to_thread(
+                llm.get_llm_recommendations,
+                summary["total_records"],
+                summary["positive_cases"],
+                summary["positive_rate"],
+                summary["average_glucose"],
+                summary["average_bmi"],
+                summary["average_age"],
+            )
+        except Exception as e:
+            logger.error(f"LLM recommendations failed: {e}")
+            return {
+                "risk_assessment": "Unable to generate risk assessment at this time.",
+                "recommendations": [],
+                "preventive_measures": [],
+            }
+
+    async def run_analysis(
+        self, filters: Optional[DiabetesRecordFilter] = None
+    ) -> Dict[str, Any]:
+        """Run the dataset analysis: statistics, anomalies and recommendations."""
+        records = self._records(filters)
+        analysis = await self._summary(records)
+        analysis["anomalies"] = await self._anomalies(records, analysis["statistics"])
+        analysis.update(await self.recommendations(analysis))
+        return analysis
+
+    async def get_insights(
+        self, filters: Optional[DiabetesRecordFilter] = None
+    ) -> Dict[str, Any]:
+        """Diabetes rates by age group and BMI category, with recommendations."""
+        records = self._records(filters)
+
+        decade = cast(func.floor(records.c.age / 10) * 10, Integer)
+        bmi = records.c.bmi
+        category = case(
+            *(
+                (bmi < upper, name)
+                for name, upper in BMI_CATEGORIES
+                if upper is not None
+            ),
+            else_=BMI_CATEGORIES[-1][0],
+        )
+        # Both groupings in a single scan
+        result = await self.db.execute(
+            select(
+                decade.label("decade"),
+                category.label("category"),
+                func.grouping(decade).label("by_category"),
+                func.count().label("count"),
+                (func.avg(cast(records.c.outcome, Integer)) * 100).label("rate"),
+            ).group_by(func.grouping_sets(tuple_(decade), tuple_(category)))
+        )
+
+        age_groups: List[Dict[str, Any]] = []
+        bmi_rates: Dict[str, Dict[str, Any]] = {}
+        for row in result.mappings():
+            group = {"count": row["count"], "diabetes_rate": _float(row["rate"]) or 0.0}
+            if row["by_category"]:
+                bmi_rates[row["category"]] = {"category": row["category"], **group}
+            elif row["decade"] is not None:
+                age_range = f"{row['decade']}-{row['decade'] + 9}"
+                age_groups.append({"age_range": age_range, **group})
+        age_groups.sort(key=lambda group: int(group["age_range"].split("-")[0]))
+
+        insights: Dict[str, Any] = {
+            "age_groups": age_groups,
+            "bmi_categories": [
+                bmi_rates[name] for name, _ in BMI_CATEGORIES if name in bmi_rates
+            ],
+            "bmi_risk": self._bmi_risk(bmi_rates),
+        }
+        summary = await self._headline(records, filters)
+        insights.update(await self.recommendations(summary))
+        return insights
+
+    async def _headline(
+        self, records: Subquery, filters: Optional[DiabetesRecordFilter]
+    ) -> Dict[str, Any]:
+        """Counts and averages for the LLM prompt."""
+        active = filters.model_dump(exclude_none=True) if filters else {}
+        if set(active) - {"source"}:
+            return await self._summary(records)
+
+        # Whole dataset (or one source): read the trigger-maintained totals
+        # instead of scanning the records
+        stats = await RecordStatsService(self.db).summary(active.get("source"))
+        return {
+            "total_records": stats["total_records"],
+            "positive_cases": stats["positive_cases"],
+            "positive_rate": stats["positive_rate"],
+            "average_glucose": stats["features"]["glucose"]["mean"] or 0.0,
+            "average_bmi": stats["features"]["bmi"]["mean"] or 0.0,
+            "average_age": stats["features"]["age"]["mean"] or 0.0,
+        }
+
+    @staticmethod
+    def _bmi_risk(bmi_rates: Dict[str, Dict[str, Any]]) -> str:
+        """Summarize how diabetes rates change with BMI."""
+        if "obese" not in bmi_rates or "normal" not in bmi_rates:
+            return "Not enough data across BMI categories to assess BMI risk."
+        obese = bmi_rates["obese"]["diabetes_rate"]
+        normal = bmi_rates["normal"]["diabetes_rate"]
+        if normal and obese > normal:
+            comparison = f"{obese / normal:.1f}x the rate"
+        else:
+            comparison = "no higher than the rate"
+        return (
+            f"Obese individuals (BMI 30+) have a {obese:.1f}% diabetes rate, "
+            f"{comparison} of those with a normal BMI ({normal:.1f}%)."
+        )
@@ -0,0 +1,184 @@
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models.analysis import AnalysisRun
+from app.models.diabetes import FEATURE_COLUMNS, DiabetesRecord
+from app.services.analysis import AnalysisService
+from app.services.notification import NotificationService
+from app.services.records import settled_watermark
+from app.services.stats import RecordStatsService
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock held by whichever process is running the analysis
+ANALYSIS_LOCK_KEY = 48_201
+
+
+class AnalysisRunner:
+    """Incremental analysis over the records added since the last run."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        lag_seconds: int = settings.ANALYSIS_WATERMARK_LAG_SECONDS,
+    ):
+        """Initialize the runner."""
+        self.db = db
+        self.lag_seconds = lag_seconds
+
+    async def _acquire_leadership(self) -> bool:
+        """Only one process runs the analysis; the lock ends with the transaction."""
+        return bool(
+            await self.db.scalar(
+                select(func.pg_try_advisory_xact_lock(ANALYSIS_LOCK_KEY))
+            )
+        )
+
+    async def _window(self, watermark: int) -> Dict[str, Any]:
+        """Aggregate the settled records after the watermark in one pass."""
+        # Outliers are judged against the whole dataset's running moments
+        moments = (await RecordStatsService(self.db).summary())["features"]
+        outliers = {}
+        for feature in FEATURE_COLUMNS:
+            mean, std = moments[feature]["mean"], moments[feature]["std"]
+            if std:
+                deviation = func.abs(getattr(DiabetesRecord, feature) - mean) / std
+                outliers[feature] = (
+                    func.count()
+                    .filter(deviation > settings.ANALYSIS_ZSCORE_THRESHOLD)
+                    .label(f"{feature}_outliers")
+                )
+
+        upto = await settled_watermark(self.db, watermark, self.lag_seconds)
+        row = (
+            (
+                await self.db.execute(
+                    select(
+                        func.count().label("records"),
+                        func.count()
+                        .filter(DiabetesRecord.outcome.is_(True))
+                        .label("positive_cases"),
+                        func.max(DiabetesRecord.id).label("watermark"),
+                        func.coalesce(func.sum(DiabetesRecord.glucose), 0).label(
+                            "glucose"
+                        ),
+                        func.coalesce(func.sum(DiabetesRecord.bmi), 0).label("bmi"),
+                        func.coalesce(func.sum(DiabetesRecord.age), 0).label("age"),
+                        *outliers.values(),
+                    ).where(
+                        DiabetesRecord.id > watermark,
+                        DiabetesRecord.id <= upto,
+                    )
+                )
+            )
+            .one()
+            ._mapping
+        )
+        return {
+            **row,
+            "anomalies": {feature: row[f"{feature}_outliers"] for feature in outliers},
+        }
+
+    async def run(self) -> Optional[AnalysisRun]:
+        """Analyze new records and store the merged run.
+
+        Returns None when another process holds the lock or nothing is new.
+        The caller commits.
+        """
+        if not await self._acquire_leadership():
+            logger.info("Analysis already running elsewhere, skipping")
+            return None
+
+        previous = await self.db.scalar(
+            select(AnalysisRun).order_by(AnalysisRun.id.desc()).limit(1)
+        )
+        window = await self._window(previous.watermark if previous else 0)
+        if not window["records"]:
+            return None
+
+        total_records = window["records"]
+        total_positive_cases = window["positive_cases"]
+        totals = {
+            feature: Decimal(str(window[feature]))
+            for feature in ("glucose", "bmi", "age")
+        }
+        if previous:
+            total_records += previous.total_records
+            total_positive_cases += previous.total_positive_cases
+            totals["glucose"] += previous.total_glucose
+            totals["bmi"] += previous.total_bmi
+            totals["age"] += previous.total_age
+
+        positive_rate = total_positive_cases / total_records
+        previous_rate = previous.positive_rate if previous else 0.0
+        run = AnalysisRun(
+            watermark=window["watermark"],
+            records=window["records"],
+            positive_cases=window["positive_cases"],
+            anomalies=window["anomalies"],
+            total_records=total_records,
+            total_positive_cases=total_positive_cases,
+            total_glucose=totals["glucose"],
+            total_bmi=totals["bmi"],
+            total_age=totals["age"],
+            positive_rate=positive_rate,
+            # Alert on the crossing, not on every run above the threshold
+            threshold_crossed=previous_rate <= settings.ALERT_THRESHOLD < positive_rate,
+        )
+        self.db.add(run)
+        await self.db.flush()
+        return run
+
+    async def notify(self, run: AnalysisRun) -> None:
+        """Email the alert recipients about a threshold crossing."""
+        if not settings.ENABLE_NOTIFICATIONS or not settings.ALERT_EMAILS:
+            return
+
+        summary = {
+            "total_records": run.total_records,
+            "positive_cases": run.total_positive_cases,
+            "positive_rate": run.positive_rate * 100,
+            "average_glucose": float(run.total_glucose / run.total_records),
+            "average_bmi": float(run.total_bmi / run.total_records),
+            "average_age": float(run.total_age / run.total_records),
+        }
+        recommendations = await AnalysisService(self.db).recommendations(summary)
+        message = (
+            f"The diabetes positive rate is now {run.positive_rate:.1%}, above the "
+            f"{settings.ALERT_THRESHOLD:.0%} alert threshold "
+            f"({run.records} new records analyzed)."
+        )
+        data = {
+            **recommendations,
+            "dashboard_url": "http://localhost:80/dashboard",
+        }
+        notification_service = NotificationService()
+        for email in settings.ALERT_EMAILS:
+            await notification_service.send_email(
+                email, "Diabetes dataset alert", message, data
+            )
+
+
+async def run_scheduled_analysis() -> Optional[AnalysisRun]:
+    """Scheduler entry point: run, commit, then alert on a threshold crossing."""
+    async with AsyncSessionLocal() as db:
+        runner = AnalysisRunner(db)
+        run = await runner.run()
+        await db.commit()
+        if run is None:
+            return None
+        logger.info(
+            "Analysis run %s: %d new records, positive rate %.3f",
+            run.id,
+            run.records,
+            run.positive_rate,
+        )
+        if run.threshold_crossed:
+            await runner.notify(run)
+        return run
@@ -0,0 +1,306 @@
+import logging
+import math
+from bisect import bisect_right, insort
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models.anomaly import AnomalyFlag
+from app.models.diabetes import FEATURE_COLUMNS, DiabetesRecord
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Tukey fences are built from the quartiles
+QUARTILES = [0.25, 0.75]
+# Session.info key of the values a session's detectors learn once it commits
+PENDING_VALUES = "anomaly_detector_pending"
+
+
+class RunningMoments:
+    """Welford's online mean and variance."""
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        """Start from count values with this mean and sum of squared deviations."""
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, value: float) -> None:
+        """Add one value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation of the values seen."""
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+
+class P2Quantile:
+    """Online estimate of one quantile with the P-square algorithm.
+
+    Five markers track the minimum, the quantile, the maximum and two points
+    halfway between; each update moves them in O(1) time and memory
+    (Jain & Chlamtac, 1985).
+    """
+
+    def __init__(self, p: float):
+        """Estimate the p-quantile, 0 < p < 1."""
+        self.p = p
+        # Quantile each marker tracks
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+        # Marker heights; the sorted first values until there are five
+        self.heights: List[float] = []
+        # Actual and desired 1-based marker positions, set once initialized
+        self.positions: List[int] = []
+        self.desired: List[float] = []
+
+    @staticmethod
+    def marker_quantiles(p: float) -> List[float]:
+        """Quantiles of the three inner markers for the p-quantile."""
+        return [p / 2, p, (1 + p) / 2]
+
+    @classmethod
+    def from_quantiles(
+        cls, p: float, heights: Sequence[float], count: int
+    ) -> "P2Quantile":
+        """Resume from count values given their min, marker quantiles and max."""
+        estimator = cls(p)
+        if count < len(estimator.increments):
+            return estimator
+
+        estimator.heights = [float(height) for height in heights]
+        estimator.desired = [1 + (count - 1) * q for q in estimator.increments]
+        # Marker positions must be distinct integers from 1 to count
+        positions = [round(desired) for desired in estimator.desired]
+        for i in range(1, len(positions)):
+            positions[i] = max(positions[i], positions[i - 1] + 1)
+        positions[-1] = count
+        for i in range(len(positions) - 2, -1, -1):
+            positions[i] = min(positions[i], positions[i + 1] - 1)
+        estimator.positions = positions
+        return estimator
+
+    @property
+    def value(self) -> Optional[float]:
+        """Current estimate, or None before any value is seen."""
+        if self.positions:
+            return self.heights[2]
+        if not self.heights:
+            return None
+        return self.heights[min(int(self.p * len(self.heights)), len(self.heights) - 1)]
+
+    def update(self, value: float) -> None:
+        """Add one value."""
+        heights, positions = self.heights, self.positions
+        if not positions:
+            insort(heights, value)
+            if len(heights) == len(self.increments):
+                self.positions = [1, 2, 3, 4, 5]
+                self.desired = [1 + 4 * q for q in self.increments]
+            return
+
+        # Cell the value falls in, stretching the extremes if needed
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect_right(heights, value) - 1
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move inner markers that drifted a full position from where they belong
+        for i in (1, 2, 3):
+            drift = self.desired[i] - positions[i]
+            if (drift >= 1 and positions[i + 1] - positions[i] > 1) or (
+                drift <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if drift > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        positions[i + step] - positions[i]
+                    )
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        """Piecewise-parabolic prediction of marker i moved by step."""
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+
+class FeatureDetector:
+    """Running moments and quartiles of one feature."""
+
+    def __init__(
+        self,
+        moments: Optional[RunningMoments] = None,
+        quartiles: Optional[List[P2Quantile]] = None,
+    ):
+        """Initialize the detector, empty unless seeded."""
+        self.moments = moments or RunningMoments()
+        self.quartiles = quartiles or [P2Quantile(p) for p in QUARTILES]
+
+    def check(self, value: float) -> Optional[Dict[str, Any]]:
+        """Judge a value against those seen so far; None if it is not anomalous."""
+        if self.moments.count < settings.ANOMALY_MIN_OBSERVATIONS:
+            return None
+
+        std = self.moments.std
+        zscore = (value - self.moments.mean) / std if std else None
+        q1, q3 = (quartile.value for quartile in self.quartiles)
+        spread = (q3 - q1) * settings.ANALYSIS_IQR_MULTIPLIER
+        lower_fence, upper_fence = q1 - spread, q3 + spread
+
+        is_zscore_outlier = (
+            zscore is not None and abs(zscore) > settings.ANALYSIS_ZSCORE_THRESHOLD
+        )
+        if not is_zscore_outlier and lower_fence <= value <= upper_fence:
+            return None
+        return {
+            "value": value,
+            "zscore": zscore,
+            "lower_fence": lower_fence,
+            "upper_fence": upper_fence,
+        }
+
+    def update(self, value: float) -> None:
+        """Learn one value."""
+        self.moments.update(value)
+        for quartile in self.quartiles:
+            quartile.update(value)
+
+
+class AnomalyDetector:
+    """Per-feature online detectors that judge each new record in O(1).
+
+    The detectors live in the process and learn from the records it
+    creates once they are committed; a periodic reseed folds in records
+    written elsewhere (other processes, bulk loads).
+    """
+
+    def __init__(self):
+        """Initialize the detector; nothing is flagged until it is seeded."""
+        self.features: Dict[str, FeatureDetector] = {}
+        self._seeded = False
+
+    async def seed(self, db: AsyncSession) -> None:
+        """Rebuild every feature's detector from the stored records in one scan."""
+        markers = {p: P2Quantile.marker_quantiles(p) for p in QUARTILES}
+        levels = sorted({q for quantiles in markers.values() for q in quantiles})
+
+        columns = []
+        for feature in FEATURE_COLUMNS:
+            value = getattr(DiabetesRecord, feature)
+            columns += [
+                func.count(value).label(f"{feature}_count"),
+                func.avg(value).label(f"{feature}_mean"),
+                func.var_pop(value).label(f"{feature}_variance"),
+                func.min(value).label(f"{feature}_min"),
+                func.max(value).label(f"{feature}_max"),
+                func.percentile_cont(array(levels))
+                .within_group(value)
+                .label(f"{feature}_quantiles"),
+            ]
+        row = (await db.execute(select(*columns))).one()._mapping
+
+        features = {}
+        for feature in FEATURE_COLUMNS:
+            count = row[f"{feature}_count"]
+            if not count:
+                features[feature] = FeatureDetector()
+                continue
+            moments = RunningMoments(
+                count,
+                float(row[f"{feature}_mean"]),
+                float(row[f"{feature}_variance"]) * count,
+            )
+            at = dict(zip(levels, row[f"{feature}_quantiles"]))
+            quartiles = [
+                P2Quantile.from_quantiles(
+                    p,
+                    [row[f"{feature}_min"]]
+                    + [at[q] for q in markers[p]]
+                    + [row[f"{feature}_max"]],
+                    count,
+                )
+                for p in QUARTILES
+            ]
+            features[feature] = FeatureDetector(moments, quartiles)
+
+        # Swapped in whole, so a record is never judged by half-seeded state
+        self.features = features
+        self._seeded = True
+
+    async def inspect(
+        self, db: AsyncSession, record: DiabetesRecord
+    ) -> List[AnomalyFlag]:
+        """Flag the record's anomalous features.
+
+        Until the detector is seeded (at start-up, then periodically) nothing
+        is flagged. The flags are added to the session; the caller commits,
+        and the detector learns the record's values only once it does.
+        """
+        if not self._seeded:
+            return []
+
+        flags = []
+        values = {}
+        for feature, detector in self.features.items():
+            value = getattr(record, feature)
+            if value is None:
+                continue
+            values[feature] = float(value)
+            flag = detector.check(values[feature])
+            if flag:
+                flags.append(
+                    AnomalyFlag(diabetes_record_id=record.id, feature=feature, **flag)
+                )
+        db.add_all(flags)
+        db.info.setdefault(PENDING_VALUES, []).append((self, values))
+        return flags
+
+    def learn(self, values: Dict[str, float]) -> None:
+        """Add a committed record's values to the feature detectors."""
+        for feature, value in values.items():
+            detector = self.features.get(feature)
+            if detector is not None:
+                detector.update(value)
+
+
+@event.listens_for(Session, "after_commit")
+def _learn_committed(session: Session) -> None:
+    for detector, values in session.info.pop(PENDING_VALUES, []):
+        detector.learn(values)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    session.info.pop(PENDING_VALUES, None)
+
+
+# Shared by the requests of this process
+anomaly_detector = AnomalyDetector()
+
+
+async def refresh_anomaly_detector() -> None:
+    """Scheduler entry point: reseed the process's detector from the database."""
+    async with AsyncSessionLocal() as db:
+        await anomaly_detector.seed(db)
+    logger.info("Anomaly detector reseeded")
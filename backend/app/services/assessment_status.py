@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import DefaultDict, Iterator, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.models.health import AssessmentStatus, HealthAssessment
+from app.models.job import AssessmentJob, JobStatus
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class AssessmentWaiters:
+    """Requests in this process waiting for a record's assessment.
+
+    Workers NOTIFY the record id when its job finishes; the process's
+    listener passes it to on_notify, which wakes that record's waiters.
+    """
+
+    def __init__(self):
+        """Initialize with nobody waiting."""
+        self._events: DefaultDict[int, Set[asyncio.Event]] = defaultdict(set)
+
+    @contextmanager
+    def waiting(self, record_id: int) -> Iterator[asyncio.Event]:
+        """An event set whenever the record's job may have finished."""
+        event = asyncio.Event()
+        self._events[record_id].add(event)
+        try:
+            yield event
+        finally:
+            self._events[record_id].discard(event)
+            if not self._events[record_id]:
+                del self._events[record_id]
+
+    def on_notify(self, payload: str) -> None:
+        """PgListener callback; an empty payload means notifications were missed."""
+        if not payload:
+            waiting = [event for events in self._events.values() for event in events]
+        else:
+            try:
+                waiting = list(self._events.get(int(payload), ()))
+            except ValueError:
+                logger.warning("Ignoring assessment notification %r", payload)
+                return
+        for event in waiting:
+            event.set()
+
+
+# Shared by the requests of this process
+assessment_waiters = AssessmentWaiters()
+
+
+def final_assessment(
+    assessment: Optional[HealthAssessment], job: Optional[AssessmentJob]
+) -> Optional[HealthAssessment]:
+    """The assessment if nothing more will be added to it, else None."""
+    if assessment is None:
+        return None
+    if assessment.status == AssessmentStatus.COMPLETE:
+        return assessment
+    # Scored on creation; only a job still to run would enrich it, and a
+    # failed job leaves the score the client was already given
+    if job is None or job.status in (JobStatus.DONE, JobStatus.FAILED):
+        return assessment
+    return None
+
+
+class AssessmentStatusService:
+    """Where a diabetes record's health assessment is up to."""
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the service."""
+        self.db = db
+
+    async def lookup(
+        self, record_id: int
+    ) -> Tuple[Optional[HealthAssessment], Optional[AssessmentJob]]:
+        """The record's latest assessment and latest assessment job, if any."""
+        assessment = await self.db.scalar(
+            select(HealthAssessment)
+            .where(HealthAssessment.diabetes_record_id == record_id)
+            .order_by(HealthAssessment.created_at.desc(), HealthAssessment.id.desc())
+            .limit(1)
+        )
+        job = await self.db.scalar(
+            select(AssessmentJob)
+            .where(AssessmentJob.diabetes_record_id == record_id)
+            .order_by(AssessmentJob.id.desc())
+            .limit(1)
+        )
+        return assessment, job
+
+    async def wait(
+        self, record_id: int, timeout: float
+    ) -> Tuple[Optional[HealthAssessment], Optional[AssessmentJob]]:
+        """Look up the record's assessment, waiting up to timeout seconds for it.
+
+        Returns as soon as the assessment is final (see final_assessment), its
+        job has failed, or there is no job to wait for. The database is read
+        again only when a worker announces the record's job finished (or,
+        should a notification be lost, every JOB_POLL_INTERVAL_SECONDS), and
+        no connection is held in between.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        # Registered before the first read, so a job finishing in between
+        # still wakes us
+        with assessment_waiters.waiting(record_id) as ready:
+            while True:
+                ready.clear()
+                assessment, job = await self.lookup(record_id)
+                remaining = deadline - loop.time()
+                finished = job is None or job.status in (
+                    JobStatus.DONE,
+                    JobStatus.FAILED,
+                )
+                settled = final_assessment(assessment, job) is not None
+                if settled or finished or remaining <= 0:
+                    return assessment, job
+
+                # End the read transaction, returning its connection to the pool
+                await self.db.rollback()
+                try:
+                    await asyncio.wait_for(
+                        ready.wait(),
+                        timeout=min(remaining, settings.JOB_POLL_INTERVAL_SECONDS),
+                    )
+                except asyncio.TimeoutError:
+                    pass
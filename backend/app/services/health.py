@@ -1,53 +1,54 @@
-from typing import Any, Dict
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence
 
-import pandas as pd
 from app.core.config import get_settings
-from app.models.diabetes import DataSource, DiabetesRecord
-from app.models.health import HealthAssessment
+from app.core.metrics import ASSESSMENT_STAGE_DURATION
+from app.models.diabetes import FEATURE_COLUMNS, DataSource, DiabetesRecord
+from app.models.health import AssessmentStatus, HealthAssessment
 from app.models.user import User
 from app.services.llm import get_llm_recommendations
 from app.services.notification import NotificationService
-from sklearn.ensemble import RandomForestClassifier
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+if TYPE_CHECKING:
+    # pandas and sklearn take seconds to import; they are loaded on first use
+    from sklearn.ensemble import RandomForestClassifier
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 class HealthService:
     """Service for health assessment and recommendations."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """Initialize the service."""
         self.db = db
-        self.model = self._train_model()
+        self.model: Optional["RandomForestClassifier"] = None
         self.notification_service = NotificationService()
 
-    def _train_model(self) -> RandomForestClassifier:
+    async def _train_model(self) -> "RandomForestClassifier":
         """Train the risk assessment model using existing data."""
-        # Get all dataset records
-        records = (
-            self.db.query(DiabetesRecord)
-            .filter(DiabetesRecord.source == DataSource.DATASET)
-            .all()
+        # Get all dataset records, selecting only the columns the model needs
+        result = await self.db.execute(
+            select(
+                *(getattr(DiabetesRecord, column) for column in FEATURE_COLUMNS),
+                DiabetesRecord.outcome,
+            ).where(DiabetesRecord.source == DataSource.DATASET)
         )
 
+        # Fitting is CPU-bound, keep it off the event loop
+        return await asyncio.to_thread(self._fit_model, result.all())
+
+    def _fit_model(self, rows: Sequence[Row]) -> "RandomForestClassifier":
+        """Fit the risk assessment model on dataset rows."""
+        import pandas as pd
+        from sklearn.ensemble import RandomForestClassifier
+
         # Convert to DataFrame
-        data = pd.DataFrame(
-            [
-                {
-                    "pregnancies": r.pregnancies,
-                    "glucose": r.glucose,
-                    "blood_pressure": r.blood_pressure,
-                    "skin_thickness": r.skin_thickness,
-                    "insulin": r.insulin,
-                    "bmi": r.bmi,
-                    "diabetes_pedigree": r.diabetes_pedigree,
-                    "age": r.age,
-                    "outcome": r.outcome,
-                }
-                for r in records
-            ]
-        )
+        data = pd.DataFrame(rows, columns=FEATURE_COLUMNS + ["outcome"])
 
         # Prepare features and target
         X = data.drop("outcome", axis=1)
@@ -75,19 +76,10 @@ class HealthService:
             float(record.age),
         ]
 
-        features = pd.DataFrame(
-            [feature_values],
-            columns=[
-                "pregnancies",
-                "glucose",
-                "blood_pressure",
-                "skin_thickness",
-                "insulin",
-                "bmi",
-                "diabetes_pedigree",
-                "age",
-            ],
-        )
+        # Already imported to fit the model
+        import pandas as pd
+
+        features = pd.DataFrame([feature_values], columns=FEATURE_COLUMNS)
 
         # Impute missing values with 0 (e.g., for 'pregnancies')
         features = features.fillna(0)
@@ -141,9 +133,9 @@ class HealthService:
             "dashboard_url": dashboard_url,
         }
 
-        # Send notification using our existing notification service
-        await self.notification_service.send_notification(
-            user_id=str(user.id),
+        # Sent to the user already loaded, rather than looking them up again
+        await self.notification_service.send_email(
+            str(user.email),
             subject="Your Diabetes Risk Assessment Results",
             message=(
                 "Your diabetes risk assessment has been completed. "
@@ -152,42 +144,92 @@ class HealthService:
             data=notification_data,
         )
 
-    async def assess_health(self, user_id: int, record_id: int) -> HealthAssessment:
-        """Assess health risk and create assessment record."""
-        # Get user and record
-        user = self.db.query(User).filter(User.id == user_id).first()
-        record = (
-            self.db.query(DiabetesRecord).filter(DiabetesRecord.id == record_id).first()
-        )
+    def score(self, user_id: int, record: DiabetesRecord) -> HealthAssessment:
+        """Score a record with the loaded model.
 
-        if not user or not record:
-            raise ValueError("User or record not found")
-
-        # Calculate risk score and level
+        The assessment is pending enrichment: assess_health adds the
+        recommendations and sends the notification later.
+        """
         risk_score = self._calculate_risk_score(record)
-        risk_level = self._determine_risk_level(risk_score)
-
-        # Generate recommendations
-        recommendations = self._generate_recommendations(record, risk_level)
-
-        # Create assessment record
-        assessment = HealthAssessment(
+        return HealthAssessment(
             user_id=user_id,
-            diabetes_record_id=record_id,
+            diabetes_record_id=record.id,
             risk_score=risk_score,
-            risk_level=risk_level,
-            recommendations=recommendations,
+            risk_level=self._determine_risk_level(risk_score),
+            status=AssessmentStatus.PENDING_ENRICHMENT,
         )
-        self.db.add(assessment)
-        self.db.commit()
-        self.db.refresh(assessment)
+
+    async def assess_health(self, user_id: int, record_id: int) -> HealthAssessment:
+        """Assess health risk, enriching the record's scored assessment if any.
+
+        Each stage's duration is recorded in assessment_stage_duration_seconds.
+        """
+        with ASSESSMENT_STAGE_DURATION.labels("load").time():
+            # Get user and record
+            user = await self.db.get(User, user_id)
+            record = await self.db.get(DiabetesRecord, record_id)
+
+            if not user or not record:
+                raise ValueError("User or record not found")
+
+            # The record may have been scored when it was created
+            assessment = await self.db.scalar(
+                select(HealthAssessment)
+                .where(
+                    HealthAssessment.diabetes_record_id == record_id,
+                    HealthAssessment.status == AssessmentStatus.PENDING_ENRICHMENT,
+                )
+                .order_by(HealthAssessment.created_at.desc())
+                .limit(1)
+            )
+        if assessment is None:
+            with ASSESSMENT_STAGE_DURATION.labels("score").time():
+                if self.model is None:
+                    self.model = await self._train_model()
+                assessment = self.score(user_id, record)
+                self.db.add(assessment)
+
+        # Generate recommendations (the LLM client is blocking)
+        with ASSESSMENT_STAGE_DURATION.labels("llm").time():
+            recommendations = await asyncio.to_thread(
+                self._generate_recommendations, record, assessment.risk_level
+            )
+        with ASSESSMENT_STAGE_DURATION.labels("db_write").time():
+            assessment.recommendations = recommendations
+            assessment.status = AssessmentStatus.COMPLETE
+            await self.db.commit()
+            await self.db.refresh(assessment)
 
         # Ensure assessment.id is an int for MyPy
         assessment_id_for_notification: int = assessment.id
 
         # Send notification with assessment ID
-        await self._send_notification(
-            user, risk_level, recommendations, assessment_id_for_notification
-        )
+        with ASSESSMENT_STAGE_DURATION.labels("notify").time():
+            await self._send_notification(
+                user,
+                assessment.risk_level,
+                recommendations,
+                assessment_id_for_notification,
+            )
 
         return assessment
+
+
+class RiskModelCache:
+    """The risk model this process trained, for scoring within a request."""
+
+    def __init__(self):
+        """Initialize the cache empty; load fills it."""
+        self.model: Optional["RandomForestClassifier"] = None
+        self._lock = asyncio.Lock()
+
+    async def load(self, db: AsyncSession) -> "RandomForestClassifier":
+        """Train the model unless it already is."""
+        async with self._lock:
+            if self.model is None:
+                self.model = await HealthService(db)._train_model()
+        return self.model
+
+
+# Shared by the requests of this process
+risk_model = RiskModelCache()
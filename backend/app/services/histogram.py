@@ -0,0 +1,192 @@
+import logging
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models.diabetes import DiabetesRecord
+from app.models.stats import HISTOGRAM_BINS, HISTOGRAM_OUTCOMES, StatsWatermark
+from app.services.records import settled_watermark
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock held by whichever process is updating the histograms
+HISTOGRAM_LOCK_KEY = 48_203
+HISTOGRAM_WATERMARK = "histograms"
+
+# Bins a range of records for every feature in one scan and adds them to the
+# bucket counts
+FOLD_RECORDS = text(
+    f"""
+    INSERT INTO histogram_buckets (feature, outcome, bucket, count)
+    SELECT f.feature,
+           CASE r.outcome WHEN true THEN 'positive' WHEN false THEN 'negative'
+                ELSE 'unknown' END,
+           width_bucket(f.value, b.low, b.high, b.bins), count(*)
+    FROM diabetes_records r
+    CROSS JOIN LATERAL (VALUES
+        {", ".join(f"('{c}', r.{c}::float8)" for c in HISTOGRAM_BINS)}
+    ) AS f(feature, value)
+    JOIN (VALUES
+        {", ".join(
+            f"('{c}', {low}::float8, {high}::float8, {bins})"
+            for c, (low, high, bins) in HISTOGRAM_BINS.items()
+        )}
+    ) AS b(feature, low, high, bins) USING (feature)
+    WHERE r.id > :after AND r.id <= :upto AND f.value IS NOT NULL
+    GROUP BY 1, 2, 3
+    -- Lock rows in a fixed order so concurrent statements cannot deadlock
+    ORDER BY 1, 2, 3
+    ON CONFLICT (feature, outcome, bucket) DO UPDATE SET
+        count = histogram_buckets.count + excluded.count
+    """
+)
+
+# The watermark and every bucket count from the same snapshot; the join
+# keeps one row (of NULLs) when there are no buckets yet
+DISTRIBUTIONS = text(
+    """
+    SELECT (SELECT watermark FROM stats_watermarks WHERE name = :name) AS watermark,
+           b.feature, b.outcome, b.bucket, b.count
+    FROM (SELECT 1) AS snapshot
+    LEFT JOIN histogram_buckets b ON true
+    """
+)
+
+
+class HistogramService:
+    """Outcome-split histograms of every feature from stored bucket counts."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        lag_seconds: int = settings.ANALYSIS_WATERMARK_LAG_SECONDS,
+    ):
+        """Initialize the service."""
+        self.db = db
+        self.lag_seconds = lag_seconds
+
+    async def watermark(self) -> int:
+        """Highest record id counted in the histograms."""
+        watermark = await self.db.scalar(
+            select(StatsWatermark.watermark).where(
+                StatsWatermark.name == HISTOGRAM_WATERMARK
+            )
+        )
+        return watermark or 0
+
+    async def update(self) -> int:
+        """Add records created since the last update to the bucket counts.
+
+        Counts up to the settled watermark (see settled_watermark), so
+        records a transaction has yet to commit are added next time. Returns
+        the number of records added; the caller commits.
+        """
+        acquired = await self.db.scalar(
+            select(func.pg_try_advisory_xact_lock(HISTOGRAM_LOCK_KEY))
+        )
+        if not acquired:
+            logger.info("Histograms being updated elsewhere, skipping")
+            return 0
+
+        after = await self.watermark()
+        upto = await settled_watermark(self.db, after, self.lag_seconds)
+        if upto == after:
+            return 0
+
+        added = await self.db.scalar(
+            select(func.count()).where(
+                DiabetesRecord.id > after, DiabetesRecord.id <= upto
+            )
+        )
+        await self.db.execute(FOLD_RECORDS, {"after": after, "upto": upto})
+        await self.db.execute(
+            insert(StatsWatermark)
+            .values(name=HISTOGRAM_WATERMARK, watermark=upto)
+            .on_conflict_do_update(
+                index_elements=[StatsWatermark.name],
+                set_={"watermark": upto, "updated_at": func.now()},
+            )
+        )
+        return added
+
+    async def distributions(self) -> Dict[str, Any]:
+        """Every feature's bins, lowest first, with counts per outcome."""
+        # One statement, so the counts are exactly those up to the watermark
+        # even while another process is folding records in
+        rows = (
+            await self.db.execute(DISTRIBUTIONS, {"name": HISTOGRAM_WATERMARK})
+        ).all()
+        watermark = rows[0].watermark or 0
+        counts = {
+            (row.feature, row.outcome, row.bucket): row.count
+            for row in rows
+            if row.feature is not None
+        }
+
+        features = {}
+        for feature, (low, high, bins) in HISTOGRAM_BINS.items():
+            width = (high - low) / bins
+            features[feature] = [
+                {
+                    "low": (
+                        None if bucket == 0 else round(low + (bucket - 1) * width, 6)
+                    ),
+                    "high": None if bucket > bins else round(low + bucket * width, 6),
+                    "counts": {
+                        outcome: counts.get((feature, outcome, bucket), 0)
+                        for outcome in HISTOGRAM_OUTCOMES
+                    },
+                }
+                for bucket in range(bins + 2)
+            ]
+        return {"watermark": watermark, "features": features}
+
+
+class DistributionCache:
+    """The distributions this process last read, versioned by their watermark.
+
+    Bucket counts only change when the watermark moves, so the watermark is
+    the ETag and a request revalidating it needs no database work.
+    """
+
+    def __init__(self):
+        """Initialize the cache empty; the first request fills it."""
+        self.payload: Optional[Dict[str, Any]] = None
+
+    @property
+    def etag(self) -> Optional[str]:
+        """Strong ETag of the cached distributions."""
+        if self.payload is None:
+            return None
+        return f'"histograms-{self.payload["watermark"]}"'
+
+    async def load(self, db: AsyncSession) -> Dict[str, Any]:
+        """Read the distributions from the database."""
+        self.payload = await HistogramService(db).distributions()
+        return self.payload
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Reload if another process (or this one) moved the watermark."""
+        if self.payload is None:
+            return
+        if await HistogramService(db).watermark() != self.payload["watermark"]:
+            await self.load(db)
+
+
+# Shared by the requests of this process
+distribution_cache = DistributionCache()
+
+
+async def refresh_histograms() -> int:
+    """Scheduler entry point: update the counts and this process's cache."""
+    async with AsyncSessionLocal() as db:
+        added = await HistogramService(db).update()
+        await db.commit()
+        await distribution_cache.refresh(db)
+    if added:
+        logger.info("Histograms updated with %d records", added)
+    return added
@@ -0,0 +1,271 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.schemas.diabetes import BulkIngestResult, BulkRowError, DiabetesRecordBulkRow
+from app.services.jobs import ASSESSMENT_JOBS_CHANNEL
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+
+# Columns copied into the staging table, in COPY order
+STAGING_COLUMNS: List[str] = [
+    "row_no",
+    "user_id",
+    "pregnancies",
+    "glucose",
+    "blood_pressure",
+    "skin_thickness",
+    "insulin",
+    "bmi",
+    "diabetes_pedigree",
+    "age",
+    "outcome",
+]
+
+# Accept the original dataset headers as well as our column names
+CSV_COLUMN_MAPPING: Dict[str, str] = {
+    "Pregnancies": "pregnancies",
+    "Glucose": "glucose",
+    "BloodPressure": "blood_pressure",
+    "SkinThickness": "skin_thickness",
+    "Insulin": "insulin",
+    "BMI": "bmi",
+    "DiabetesPedigreeFunction": "diabetes_pedigree",
+    "Age": "age",
+    "Outcome": "outcome",
+}
+
+CREATE_STAGING_TABLE = text(
+    """
+    CREATE TEMP TABLE IF NOT EXISTS _bulk_diabetes_records (
+        row_no integer NOT NULL,
+        user_id integer,
+        pregnancies integer,
+        glucose integer NOT NULL,
+        blood_pressure integer NOT NULL,
+        skin_thickness integer NOT NULL,
+        insulin integer NOT NULL,
+        bmi double precision NOT NULL,
+        diabetes_pedigree double precision NOT NULL,
+        age integer NOT NULL,
+        outcome boolean
+    )
+    """
+)
+
+# Move staged rows with a known (or no) user into diabetes_records and
+# optionally queue an assessment for each inserted row that has a user
+LOAD_STAGED_ROWS = text(
+    """
+    WITH inserted AS (
+        INSERT INTO diabetes_records (
+            user_id, pregnancies, glucose, blood_pressure, skin_thickness,
+            insulin, bmi, diabetes_pedigree, age, outcome, source
+        )
+        SELECT s.user_id, s.pregnancies, s.glucose, s.blood_pressure,
+               s.skin_thickness, s.insulin, s.bmi, s.diabetes_pedigree, s.age,
+               s.outcome, 'USER_ENTRY'
+        FROM _bulk_diabetes_records s
+        WHERE s.user_id IS NULL
+           OR EXISTS (SELECT 1 FROM users u WHERE u.id = s.user_id)
+        ORDER BY s.row_no
+        RETURNING id, user_id
+    ), jobs AS (
+        INSERT INTO assessment_jobs (user_id, diabetes_record_id)
+        SELECT user_id, id FROM inserted
+        WHERE CAST(:enqueue AS boolean) AND user_id IS NOT NULL
+        RETURNING id
+    )
+    SELECT (SELECT count(*) FROM inserted), (SELECT count(*) FROM jobs)
+    """
+)
+
+UNKNOWN_USER_ROWS = text(
+    """
+    SELECT s.row_no FROM _bulk_diabetes_records s
+    WHERE s.user_id IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM users u WHERE u.id = s.user_id)
+    ORDER BY s.row_no
+    """
+)
+
+_ROWS_ADAPTER = TypeAdapter(List[DiabetesRecordBulkRow])
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed UTF-8 body into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class BulkIngestService:
+    """Validates streamed record uploads in chunks and loads them with COPY."""
+
+    def __init__(self, db: AsyncSession, enqueue_assessments: bool = False):
+        """Initialize the service."""
+        self.db = db
+        self.enqueue_assessments = enqueue_assessments
+        self.chunk_size = settings.BULK_INGEST_CHUNK_SIZE
+        self.result = BulkIngestResult()
+
+    async def ingest_csv(self, lines: AsyncIterator[str]) -> BulkIngestResult:
+        """Ingest CSV lines; the first line is the header.
+
+        Each record must be on a single line (quoted newlines are not supported).
+        """
+        header: Optional[List[str]] = None
+        rows: List[Tuple[int, Any]] = []
+        row_no = 0
+        async for line in lines:
+            if not line.strip():
+                continue
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [
+                    CSV_COLUMN_MAPPING.get(name.strip(), name.strip())
+                    for name in values
+                ]
+                continue
+
+            row_no += 1
+            if len(values) != len(header):
+                rows.append(
+                    (row_no, f"Expected {len(header)} columns, got {len(values)}")
+                )
+            else:
+                # Empty cells mean "missing" (e.g. pregnancies)
+                rows.append(
+                    (
+                        row_no,
+                        {k: (v if v.strip() else None) for k, v in zip(header, values)},
+                    )
+                )
+            if len(rows) >= self.chunk_size:
+                await self._load_chunk(rows)
+                rows = []
+
+        await self._load_chunk(rows)
+        return self.result
+
+    async def ingest_ndjson(self, lines: AsyncIterator[str]) -> BulkIngestResult:
+        """Ingest newline-delimited JSON objects."""
+        rows: List[Tuple[int, Any]] = []
+        row_no = 0
+        async for line in lines:
+            if not line.strip():
+                continue
+            row_no += 1
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                data = f"Invalid JSON: {e}"
+            if not isinstance(data, (dict, str)):
+                data = "Expected a JSON object"
+            rows.append((row_no, data))
+            if len(rows) >= self.chunk_size:
+                await self._load_chunk(rows)
+                rows = []
+
+        await self._load_chunk(rows)
+        return self.result
+
+    def _add_error(self, row_no: int, errors: List[str]) -> None:
+        self.result.failed += 1
+        if len(self.result.errors) < settings.BULK_INGEST_MAX_REPORTED_ERRORS:
+            self.result.errors.append(BulkRowError(row=row_no, errors=errors))
+        else:
+            self.result.errors_truncated = True
+
+    def _validate_chunk(
+        self, rows: List[Tuple[int, Any]]
+    ) -> List[Tuple[int, DiabetesRecordBulkRow]]:
+        """Validate a chunk in one TypeAdapter call, recording per-row errors."""
+        # Rows that already failed to parse carry an error message
+        parsed = [(row_no, data) for row_no, data in rows if isinstance(data, dict)]
+        for row_no, data in rows:
+            if isinstance(data, str):
+                self._add_error(row_no, [data])
+
+        try:
+            validated = _ROWS_ADAPTER.validate_python([data for _, data in parsed])
+            return [(row_no, row) for (row_no, _), row in zip(parsed, validated)]
+        except ValidationError as e:
+            failed: Dict[int, List[str]] = {}
+            for error in e.errors():
+                index, *field = error["loc"]
+                location = ".".join(str(part) for part in field) or "row"
+                failed.setdefault(index, []).append(f"{location}: {error['msg']}")
+
+        for index in sorted(failed):
+            self._add_error(parsed[index][0], failed[index])
+        valid = [row for index, row in enumerate(parsed) if index not in failed]
+        validated = _ROWS_ADAPTER.validate_python([data for _, data in valid])
+        return [(row_no, row) for (row_no, _), row in zip(valid, validated)]
+
+    async def _load_chunk(self, rows: List[Tuple[int, Any]]) -> None:
+        """Validate a chunk, COPY it into staging and move it into place."""
+        if not rows:
+            return
+        self.result.received += len(rows)
+        valid = self._validate_chunk(rows)
+        if not valid:
+            return
+
+        records = [
+            (
+                row_no,
+                row.user_id,
+                row.pregnancies,
+                row.glucose,
+                row.blood_pressure,
+                row.skin_thickness,
+                row.insulin,
+                row.bmi,
+                row.diabetes_pedigree,
+                row.age,
+                row.outcome,
+            )
+            for row_no, row in valid
+        ]
+
+        await self.db.execute(CREATE_STAGING_TABLE)
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "_bulk_diabetes_records", records=records, columns=STAGING_COLUMNS
+        )
+
+        unknown: Set[int] = set(
+            (await self.db.execute(UNKNOWN_USER_ROWS)).scalars().all()
+        )
+        inserted, enqueued = (
+            await self.db.execute(
+                LOAD_STAGED_ROWS, {"enqueue": self.enqueue_assessments}
+            )
+        ).one()
+        for row_no in sorted(unknown):
+            self._add_error(row_no, ["user_id: User not found"])
+
+        if enqueued:
+            await self.db.execute(
+                text("SELECT pg_notify(:channel, '')"),
+                {"channel": ASSESSMENT_JOBS_CHANNEL},
+            )
+        await self.db.execute(text("TRUNCATE _bulk_diabetes_records"))
+        await self.db.commit()
+
+        self.result.inserted += inserted
+        self.result.assessments_enqueued += enqueued
@@ -0,0 +1,78 @@
+from typing import Optional, Tuple
+
+from app.models.diabetes import DataSource, DiabetesRecord
+from app.models.health import HealthAssessment
+from app.models.user import User
+from app.schemas.diabetes import DiabetesRecordBase
+from app.schemas.user import UserCreate
+from app.services.anomaly import anomaly_detector
+from app.services.health import HealthService, risk_model
+from app.services.jobs import JobQueue
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class IntakeService:
+    """Creation of users' diabetes records and their assessment jobs."""
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the service."""
+        self.db = db
+
+    async def upsert_user(self, user_in: UserCreate) -> Tuple[User, bool]:
+        """The user with this email, created if new, and whether it was created.
+
+        One statement, safe against concurrent sign-ups with the same email.
+        An existing user is returned unchanged.
+        """
+        upsert = (
+            insert(User).values(
+                name=user_in.name, surname=user_in.surname, email=user_in.email
+            )
+            # A no-op update (rather than DO NOTHING) so the row is returned
+            .on_conflict_do_update(
+                index_elements=[User.email], set_={"email": user_in.email}
+            )
+            # xmax is only zero on a freshly inserted row version
+            .returning(User, (literal_column("xmax") == 0).label("created"))
+        )
+        user, created = (await self.db.execute(upsert)).one()
+        return user, created
+
+    async def create_record(
+        self, user_id: int, record_in: DiabetesRecordBase, score: bool = False
+    ) -> Tuple[DiabetesRecord, Optional[HealthAssessment]]:
+        """Add a user's record and queue its health assessment; the caller commits.
+
+        Features that are anomalous relative to the population are flagged.
+        With score, the record is also scored by the preloaded model (when it
+        is loaded) and the assessment returned pending enrichment.
+        """
+        record = DiabetesRecord(
+            user_id=user_id,
+            pregnancies=record_in.pregnancies,
+            glucose=record_in.glucose,
+            blood_pressure=record_in.blood_pressure,
+            skin_thickness=record_in.skin_thickness,
+            insulin=record_in.insulin,
+            bmi=record_in.bmi,
+            diabetes_pedigree=record_in.diabetes_pedigree,
+            age=record_in.age,
+            outcome=record_in.outcome,
+            source=DataSource.USER_ENTRY,  # Always set as user_entry for API-created records
+        )
+        self.db.add(record)
+        await self.db.flush()
+        await anomaly_detector.inspect(self.db, record)
+
+        assessment = None
+        if score and risk_model.model is not None:
+            health_service = HealthService(self.db)
+            health_service.model = risk_model.model
+            assessment = health_service.score(user_id, record)
+            self.db.add(assessment)
+
+        # Queue the health assessment in the same transaction as the record
+        await JobQueue(self.db).enqueue(user_id=user_id, record_id=record.id)
+        return record, assessment
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.metrics import JOB_OLDEST_PENDING_AGE, JOB_QUEUE_DEPTH
+from app.core.profiling import current_profile_id
+from app.models.job import AssessmentJob, JobStatus
+from sqlalchemy import ColumnElement, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+
+# Postgres channel workers LISTEN on for newly enqueued jobs
+ASSESSMENT_JOBS_CHANNEL = "assessment_jobs"
+# Postgres channel API processes LISTEN on for finished jobs; the payload is
+# the job's diabetes record id
+ASSESSMENT_READY_CHANNEL = "assessment_ready"
+
+
+class JobQueue:
+    """Postgres-backed queue for health assessment jobs."""
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the queue."""
+        self.db = db
+
+    async def enqueue(self, user_id: int, record_id: int) -> AssessmentJob:
+        """Add a job in the caller's transaction and wake the workers on commit.
+
+        A job queued by a profiled request is profiled by the worker too.
+        """
+        job = AssessmentJob(
+            user_id=user_id,
+            diabetes_record_id=record_id,
+            profile_id=current_profile_id.get(),
+        )
+        self.db.add(job)
+        await self.db.flush()
+
+        # NOTIFY is transactional: workers only hear about committed jobs
+        await self.db.execute(
+            select(func.pg_notify(ASSESSMENT_JOBS_CHANNEL, str(job.id)))
+        )
+        return job
+
+    async def claim(self, worker_id: str) -> Optional[AssessmentJob]:
+        """Lock and mark the next runnable job as running."""
+        next_job = (
+            select(AssessmentJob.id)
+            .where(
+                AssessmentJob.status == JobStatus.PENDING,
+                AssessmentJob.run_after <= func.now(),
+            )
+            .order_by(AssessmentJob.run_after, AssessmentJob.id)
+            .limit(1)
+            # Concurrent workers skip rows another worker is claiming
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(AssessmentJob)
+            .where(AssessmentJob.id == next_job)
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=AssessmentJob.attempts + 1,
+                started_at=func.now(),
+                locked_by=worker_id,
+            )
+            .returning(AssessmentJob)
+        )
+        return result.scalar_one_or_none()
+
+    async def _notify_ready(self, record_id: Optional[int]) -> None:
+        """Wake requests waiting on the record's assessment, on commit."""
+        if record_id is not None:
+            await self.db.execute(
+                select(func.pg_notify(ASSESSMENT_READY_CHANNEL, str(record_id)))
+            )
+
+    @staticmethod
+    def _owned(job: AssessmentJob) -> Tuple[ColumnElement[bool], ...]:
+        """Match the job only while it is still this claim's run.
+
+        A job that outran the visibility timeout may have been requeued and
+        claimed again; each claim bumps its attempts, so a late result from
+        the earlier run matches nothing.
+        """
+        return (
+            AssessmentJob.id == job.id,
+            AssessmentJob.status == JobStatus.RUNNING,
+            AssessmentJob.locked_by == job.locked_by,
+            AssessmentJob.attempts == job.attempts,
+        )
+
+    async def complete(self, job: AssessmentJob) -> bool:
+        """Mark a claimed job as done; False if it is no longer this claim's."""
+        result = await self.db.execute(
+            update(AssessmentJob)
+            .where(*self._owned(job))
+            .values(status=JobStatus.DONE, finished_at=func.now(), last_error=None)
+            .returning(AssessmentJob.diabetes_record_id)
+        )
+        record_ids = result.scalars().all()
+        if not record_ids:
+            return False
+        await self._notify_ready(record_ids[0])
+        return True
+
+    async def fail(self, job: AssessmentJob, error: str) -> Optional[JobStatus]:
+        """Retry a failed job with exponential backoff, or give up on it.
+
+        Returns None, changing nothing, if the job is no longer this claim's.
+        """
+        if job.attempts < settings.JOB_MAX_ATTEMPTS:
+            status = JobStatus.PENDING
+            values = {
+                "run_after": func.now() + timedelta(seconds=2**job.attempts),
+                "locked_by": None,
+            }
+        else:
+            status = JobStatus.FAILED
+            values = {"finished_at": func.now()}
+
+        result = await self.db.execute(
+            update(AssessmentJob)
+            .where(*self._owned(job))
+            .values(status=status, last_error=error, **values)
+        )
+        if not result.rowcount:
+            return None
+        if status == JobStatus.FAILED:
+            await self._notify_ready(job.diabetes_record_id)
+        return status
+
+    async def requeue_stale(self) -> int:
+        """Return jobs whose worker died mid-run to the queue.
+
+        Jobs that have used up their attempts are failed instead, so a job
+        that kills its worker is not retried forever.
+        """
+        cutoff = func.now() - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+        stale = (
+            AssessmentJob.status == JobStatus.RUNNING,
+            AssessmentJob.started_at < cutoff,
+        )
+        failed = await self.db.execute(
+            update(AssessmentJob)
+            .where(*stale, AssessmentJob.attempts >= settings.JOB_MAX_ATTEMPTS)
+            .values(
+                status=JobStatus.FAILED,
+                finished_at=func.now(),
+                last_error="Worker stopped responding",
+            )
+            .returning(AssessmentJob.diabetes_record_id)
+        )
+        for record_id in failed.scalars().all():
+            await self._notify_ready(record_id)
+
+        result = await self.db.execute(
+            update(AssessmentJob)
+            .where(*stale)
+            .values(status=JobStatus.PENDING, locked_by=None, run_after=func.now())
+        )
+        return result.rowcount
+
+    async def depth(self) -> Dict[str, int]:
+        """Count jobs per status and publish queue metrics."""
+        result = await self.db.execute(
+            select(AssessmentJob.status, func.count()).group_by(AssessmentJob.status)
+        )
+        counts = {status.value: 0 for status in JobStatus}
+        counts.update({status.value: count for status, count in result.all()})
+        for status, count in counts.items():
+            JOB_QUEUE_DEPTH.labels(status).set(count)
+
+        oldest = await self.db.scalar(
+            select(func.min(AssessmentJob.run_after)).where(
+                AssessmentJob.status == JobStatus.PENDING
+            )
+        )
+        age = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0
+        JOB_OLDEST_PENDING_AGE.set(max(age, 0))
+        return counts
@@ -1,10 +1,12 @@
 import logging
 import time
-from functools import lru_cache
-from typing import Any, Dict, Tuple
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Tuple
 
 from app.core.config import get_settings
-from huggingface_hub import InferenceClient
+
+if TYPE_CHECKING:
+    from huggingface_hub import InferenceClient
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -14,14 +16,24 @@ class LLMService:
     """Service for interacting with Hugging Face's models."""
 
     def __init__(self):
-        self.client = InferenceClient(
-            provider="nebius", api_key=settings.HUGGINGFACE_API_KEY
-        )
-        self.rate_limit = 5  # requests per minute
+        self.rate_limit = settings.LLM_RATE_LIMIT  # requests per minute
         self.last_request_time = 0
 
+    @cached_property
+    def client(self) -> "InferenceClient":
+        """The inference client, built on first use (huggingface_hub is slow to import)."""
+        from huggingface_hub import InferenceClient
+
+        if settings.LLM_BASE_URL:
+            return InferenceClient(
+                base_url=settings.LLM_BASE_URL, api_key=settings.HUGGINGFACE_API_KEY
+            )
+        return InferenceClient(provider="nebius", api_key=settings.HUGGINGFACE_API_KEY)
+
     def _rate_limit(self) -> None:
         """Implement rate limiting."""
+        if not self.rate_limit:
+            return
         current_time = time.time()
         time_since_last = current_time - self.last_request_time
         if time_since_last < (60 / self.rate_limit):
@@ -1,11 +1,13 @@
+import asyncio
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Any, Dict, Optional
 
 from app.core.config import get_settings
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal
 from app.models.user import User
+from sqlalchemy import select
 
 settings = get_settings()
 
@@ -24,17 +26,33 @@ class NotificationService:
         data: Optional[Dict[str, Any]] = None,
     ) -> None:
         """Send a notification to the user."""
-        db = SessionLocal()
         try:
             # Get user email from database
-            user = db.query(User).filter(User.id == user_id).first()
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(User).where(User.id == int(user_id)))
+                user = result.scalar_one_or_none()
             if not user:
                 raise ValueError(f"User {user_id} not found")
 
+            await self.send_email(str(user.email), subject, message, data)
+
+        except Exception as e:
+            # Log error but don't raise to prevent blocking the main flow
+            print(f"Error sending notification: {str(e)}")
+
+    async def send_email(
+        self,
+        to: str,
+        subject: str,
+        message: str,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Send a notification email to an address."""
+        try:
             # Create email message
             msg = MIMEMultipart()
             msg["From"] = self.settings.EMAIL_USER
-            msg["To"] = str(user.email)
+            msg["To"] = to
             msg["Subject"] = subject
 
             # Add text content
@@ -45,20 +63,31 @@ class NotificationService:
                 html_content = self._create_html_content(data)
                 msg.attach(MIMEText(html_content, "html"))
 
-            # Send email
-            with smtplib.SMTP(
-                self.settings.EMAIL_HOST, self.settings.EMAIL_PORT
-            ) as server:
-                server.starttls()
-                server.login(self.settings.EMAIL_USER, self.settings.EMAIL_PASSWORD)
-                server.send_message(msg)
+            # Send email without blocking the event loop
+            await asyncio.to_thread(self._send_email, msg)
 
         except Exception as e:
             # Log error but don't raise to prevent blocking the main flow
             print(f"Error sending notification: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+
+    def _send_email(self, msg: MIMEMultipart) -> None:
+        """Send an email message over SMTP."""
+        with smtplib.SMTP(self.settings.EMAIL_HOST, self.settings.EMAIL_PORT) as server:
+            if self.settings.EMAIL_STARTTLS:
+                server.starttls()
+            server.login(self.settings.EMAIL_USER, self.settings.EMAIL_PASSWORD)
+            server.send_message(msg)
+
+    async def check_connection(self, timeout: float) -> None:
+        """Connect to the SMTP server and greet it; raises if it cannot be reached."""
+        await asyncio.to_thread(self._check_connection, timeout)
+
+    def _check_connection(self, timeout: float) -> None:
+        with smtplib.SMTP(
+            self.settings.EMAIL_HOST, self.settings.EMAIL_PORT, timeout=timeout
+        ) as server:
+            server.ehlo()
+            server.noop()
 
     def _create_html_content(self, data: Dict[str, Any]) -> str:
         """Create HTML content for the email with analysis data."""
@@ -0,0 +1,115 @@
+import logging
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from app.core.config import get_settings
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock held by whichever process is creating partitions
+PARTITION_LOCK_KEY = 48_207
+
+# Tables range-partitioned by month on created_at
+MONTHLY_PARTITIONED_TABLES = ["health_assessments"]
+
+EXISTING_PARTITIONS = text(
+    """
+    SELECT c.relname FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST(:table AS regclass)
+    """
+)
+
+DEFAULT_PARTITION = text(
+    """
+    SELECT c.relname FROM pg_partitioned_table p
+    JOIN pg_class c ON c.oid = p.partdefid
+    WHERE p.partrelid = CAST(:table AS regclass)
+    """
+)
+
+
+def add_months(month: date, months: int) -> date:
+    """Return the first day of the month `months` after `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of the partition holding `month`, e.g. health_assessments_2025_06."""
+    return f"{table}_{month:%Y_%m}"
+
+
+class PartitionService:
+    """Keeps monthly partitions created ahead of the rows that need them."""
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the service."""
+        self.db = db
+
+    async def ensure_monthly_partitions(
+        self, table: str, months_ahead: int = settings.PARTITION_MONTHS_AHEAD
+    ) -> List[str]:
+        """Create any missing partitions from this month on. Returns their names.
+
+        Rows already in the DEFAULT partition for a new month are moved into
+        it. Only one process does this at a time; the others skip. The caller
+        commits.
+        """
+        acquired = await self.db.scalar(
+            select(func.pg_try_advisory_xact_lock(PARTITION_LOCK_KEY))
+        )
+        if not acquired:
+            logger.info("Partitions being created elsewhere, skipping")
+            return []
+
+        existing = set(
+            (await self.db.execute(EXISTING_PARTITIONS, {"table": table}))
+            .scalars()
+            .all()
+        )
+        default = await self.db.scalar(DEFAULT_PARTITION, {"table": table})
+        this_month = datetime.now(timezone.utc).date().replace(day=1)
+
+        created = []
+        for offset in range(months_ahead + 1):
+            start = add_months(this_month, offset)
+            name = partition_name(table, start)
+            if name in existing:
+                continue
+            await self._create_partition(table, name, start, default)
+            created.append(name)
+        return created
+
+    async def _create_partition(
+        self, table: str, name: str, start: date, default: Optional[str]
+    ) -> None:
+        # Identifiers and bounds are generated here, never user input
+        end = add_months(start, 1)
+        in_range = f"created_at >= '{start}' AND created_at < '{end}'"
+        create = text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        strays = default is not None and await self.db.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")
+        )
+        if not strays:
+            await self.db.execute(create)
+            return
+
+        # Postgres refuses a new partition while DEFAULT holds rows in its
+        # range, so take DEFAULT out while they are moved across
+        logger.info("Moving %s rows from %s into %s", table, default, name)
+        await self.db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+        await self.db.execute(create)
+        await self.db.execute(
+            text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}")
+        )
+        await self.db.execute(text(f"DELETE FROM {default} WHERE {in_range}"))
+        await self.db.execute(
+            text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+        )
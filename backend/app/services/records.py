@@ -0,0 +1,175 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+from app.models.diabetes import FEATURE_COLUMNS, DiabetesRecord
+from app.schemas.diabetes import DiabetesRecord as DiabetesRecordSchema
+from app.schemas.diabetes import DiabetesRecordFilter
+from sqlalchemy import Row, Select, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+
+# Columns a listing may project (those of the record schema); id and
+# created_at are always returned because the cursor is built from them
+LISTABLE_COLUMNS: Dict[str, Any] = {
+    name: DiabetesRecord.__table__.c[name] for name in DiabetesRecordSchema.model_fields
+}
+KEY_COLUMNS = ["id", "created_at"]
+
+# Ids are handed out before commit and created_at is the inserting
+# transaction's start, so a later commit can add a record below the highest
+# visible id. The window stops below the first record created after the
+# cutoff, and the cutoff is pulled back to the start of the oldest open
+# transaction, whose records will get ids above every record counted here.
+SETTLED_WATERMARK = text(
+    """
+    WITH cutoff AS (
+        SELECT least(now(), min(xact_start)) - make_interval(secs => :lag) AS at
+        FROM pg_stat_activity
+        WHERE datname = current_database()
+          AND backend_type = 'client backend'
+          AND pid <> pg_backend_pid()
+    )
+    SELECT max(r.id)
+    FROM diabetes_records r, cutoff
+    WHERE r.id > :after
+      AND r.id < coalesce(
+          (SELECT min(n.id) FROM diabetes_records n
+           WHERE n.id > :after AND n.created_at > cutoff.at),
+          r.id + 1
+      )
+    """
+)
+
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    """Encode a keyset position as an opaque cursor."""
+    payload = json.dumps([created_at.isoformat(), record_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(record_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def settled_watermark(db: AsyncSession, after: int, lag_seconds: int) -> int:
+    """The highest record id an incremental reader can safely advance to.
+
+    Every record with an id above after and up to the result has committed,
+    and none still to commit will get an id in that range, as long as a
+    transaction inserts its records within lag_seconds of starting. Returns
+    after when there is nothing new.
+    """
+    watermark = await db.scalar(
+        SETTLED_WATERMARK, {"after": after, "lag": float(lag_seconds)}
+    )
+    return watermark if watermark is not None else after
+
+
+class RecordListService:
+    """Keyset-paginated, filterable listing of diabetes records."""
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the service."""
+        self.db = db
+
+    @staticmethod
+    def resolve_fields(fields: Optional[Sequence[str]]) -> List[str]:
+        """Validate a projection, returning the columns to select."""
+        if not fields:
+            return list(LISTABLE_COLUMNS)
+        unknown = [name for name in fields if name not in LISTABLE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return KEY_COLUMNS + [name for name in fields if name not in KEY_COLUMNS]
+
+    @staticmethod
+    def apply_filters(query: Select, filters: DiabetesRecordFilter) -> Select:
+        """Add WHERE clauses for the given filters."""
+        if filters.source is not None:
+            query = query.where(DiabetesRecord.source == filters.source)
+        if filters.user_id is not None:
+            query = query.where(DiabetesRecord.user_id == filters.user_id)
+        if filters.outcome is not None:
+            query = query.where(DiabetesRecord.outcome == filters.outcome)
+        for feature in FEATURE_COLUMNS:
+            column = getattr(DiabetesRecord, feature)
+            low = getattr(filters, f"{feature}_min")
+            high = getattr(filters, f"{feature}_max")
+            if low is not None:
+                query = query.where(column >= low)
+            if high is not None:
+                query = query.where(column <= high)
+        return query
+
+    async def list_records(
+        self,
+        filters: DiabetesRecordFilter,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return one page of records, newest first, and the next page's cursor."""
+        columns = self.resolve_fields(fields)
+        query = select(*(LISTABLE_COLUMNS[name] for name in columns))
+        query = self.apply_filters(query, filters)
+
+        if cursor:
+            created_at, record_id = decode_cursor(cursor)
+            # Row comparison seeks straight into the (.., created_at, id) index
+            query = query.where(
+                tuple_(DiabetesRecord.created_at, DiabetesRecord.id)
+                < tuple_(created_at, record_id)
+            )
+
+        # Fetch one extra row to know whether another page exists
+        query = query.order_by(
+            DiabetesRecord.created_at.desc(), DiabetesRecord.id.desc()
+        ).limit(limit + 1)
+        rows = [dict(row) for row in (await self.db.execute(query)).mappings()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+
+    async def stream_rows(
+        self,
+        filters: DiabetesRecordFilter,
+        columns: Sequence[str],
+        chunk_size: int = settings.EXPORT_CHUNK_SIZE,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield every matching record, oldest first, in chunks of row tuples.
+
+        Each chunk is a keyset page (ids after the last one yielded) read in
+        a transaction of its own, ended before the chunk is yielded, so a
+        slow download holds neither a pooled connection nor a snapshot.
+        Records committed while the export runs may be included. Columns must
+        come from resolve_fields.
+        """
+        query = select(*(LISTABLE_COLUMNS[name] for name in columns))
+        query = self.apply_filters(query, filters).order_by(DiabetesRecord.id)
+        id_index = list(columns).index("id")
+        last_id = None
+        while True:
+            page = (
+                query if last_id is None else query.where(DiabetesRecord.id > last_id)
+            )
+            rows = (await self.db.execute(page.limit(chunk_size))).all()
+            # Returns the connection to the pool while the chunk is sent
+            await self.db.commit()
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][id_index]
@@ -0,0 +1,305 @@
+import logging
+import math
+import random
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models.diabetes import FEATURE_COLUMNS, DataSource, DiabetesRecord
+from app.models.stats import QuantileSketch
+from app.services.records import settled_watermark
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock held by whichever process is updating the sketches
+SKETCH_LOCK_KEY = 48_202
+# Records read per round trip while folding new records in
+SKETCH_BATCH_SIZE = 10_000
+
+DEFAULT_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+class KllSketch:
+    """Mergeable quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Values are kept in levels of compactors; an item on level h stands for
+    2**h values. When the sketch outgrows its capacity the lowest full
+    level is sorted and every other item (random offset) is promoted, so
+    memory stays O(k log(n/k)) however many values are added. Two sketches
+    merge by concatenating their levels and compacting, which is what lets
+    sketches of different sources, shards or workers be combined.
+    """
+
+    # Each level below the top holds this fraction of the one above
+    CAPACITY_DECAY = 2 / 3
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """Create an empty sketch; larger k means smaller error."""
+        self.k = k
+        self.n = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.levels: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+
+    @staticmethod
+    def rank_error(k: int) -> float:
+        """Normalized rank error bound at 99% confidence for a given k.
+
+        Empirical fit from Apache DataSketches' KLL implementation: a value
+        returned for quantile q has a true rank within q -+ this fraction of
+        n. For k=200 it is about 1.65%.
+        """
+        return 2.446 / k**0.9433
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(math.ceil(self.k * self.CAPACITY_DECAY**depth), 2)
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self) -> None:
+        while self._size() > self._max_size():
+            for level, items in enumerate(self.levels):
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                items.sort()
+                # An odd item out stays behind, so total weight is preserved
+                keep = [items.pop()] if len(items) % 2 else []
+                offset = self._random.randint(0, 1)
+                self.levels[level + 1].extend(items[offset::2])
+                self.levels[level] = keep
+                break
+
+    def update(self, value: float) -> None:
+        """Add one value."""
+        self.update_many([value])
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Add many values, compacting once for the whole batch."""
+        batch = [float(value) for value in values]
+        if not batch:
+            return
+        self.n += len(batch)
+        low, high = min(batch), max(batch)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.levels[0].extend(batch)
+        self._compress()
+
+    def merge(self, other: "KllSketch") -> "KllSketch":
+        """Fold another sketch into this one and return it."""
+        if other.n == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self) -> Tuple[List[float], List[int]]:
+        """Retained values in order with their cumulative weights."""
+        pairs = sorted(
+            (value, 1 << level)
+            for level, items in enumerate(self.levels)
+            for value in items
+        )
+        return [value for value, _ in pairs], list(accumulate(w for _, w in pairs))
+
+    def quantiles(self, fractions: Sequence[float]) -> List[Optional[float]]:
+        """Approximate values at the given fractions (0 = min, 1 = max)."""
+        if self.n == 0:
+            return [None] * len(fractions)
+        values, weights = self._weighted()
+        total = weights[-1]
+        results = []
+        for fraction in fractions:
+            if fraction <= 0:
+                results.append(self.min)
+            elif fraction >= 1:
+                results.append(self.max)
+            else:
+                results.append(values[bisect_left(weights, fraction * total)])
+        return results
+
+    def cdf(self, splits: Sequence[float]) -> List[float]:
+        """Approximate fraction of values below each split point."""
+        if self.n == 0:
+            return [0.0] * len(splits)
+        values, weights = self._weighted()
+        total = weights[-1]
+        fractions = []
+        for split in splits:
+            below = bisect_left(values, split)
+            fractions.append(weights[below - 1] / total if below else 0.0)
+        return fractions
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state."""
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "levels": self.levels,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "KllSketch":
+        """Restore a sketch saved with to_dict."""
+        sketch = cls(state["k"])
+        sketch.n = state["n"]
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        sketch.levels = [list(items) for items in state["levels"]] or [[]]
+        return sketch
+
+
+class QuantileSketchService:
+    """Persisted KLL sketches of every feature, per record source."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        lag_seconds: int = settings.ANALYSIS_WATERMARK_LAG_SECONDS,
+    ):
+        """Initialize the service."""
+        self.db = db
+        self.lag_seconds = lag_seconds
+
+    async def _load(
+        self, source: Optional[DataSource] = None
+    ) -> Dict[tuple, QuantileSketch]:
+        query = select(QuantileSketch)
+        if source is not None:
+            query = query.where(QuantileSketch.source == source)
+        rows = (await self.db.scalars(query)).all()
+        return {(row.source, row.feature): row for row in rows}
+
+    async def update(self) -> int:
+        """Fold records added since the last update into the stored sketches.
+
+        Only records up to the settled watermark are read (see
+        settled_watermark), so records a transaction has yet to commit are
+        picked up next time. Inserts are all the sketches see: rebuild
+        (delete the rows) after large updates or deletes. Returns the number
+        of records added; the caller commits.
+        """
+        acquired = await self.db.scalar(
+            select(func.pg_try_advisory_xact_lock(SKETCH_LOCK_KEY))
+        )
+        if not acquired:
+            logger.info("Quantile sketches being updated elsewhere, skipping")
+            return 0
+
+        stored = await self._load()
+        watermark = min((row.watermark for row in stored.values()), default=0)
+        sketches = {
+            (source, feature): (
+                KllSketch.from_dict(stored[source, feature].sketch)
+                if (source, feature) in stored
+                else KllSketch(settings.QUANTILE_SKETCH_K)
+            )
+            for source in DataSource
+            for feature in FEATURE_COLUMNS
+        }
+
+        upto = await settled_watermark(self.db, watermark, self.lag_seconds)
+        columns = [getattr(DiabetesRecord, feature) for feature in FEATURE_COLUMNS]
+        added = 0
+        while True:
+            rows = (
+                await self.db.execute(
+                    select(DiabetesRecord.id, DiabetesRecord.source, *columns)
+                    .where(
+                        DiabetesRecord.id > watermark,
+                        DiabetesRecord.id <= upto,
+                    )
+                    .order_by(DiabetesRecord.id)
+                    .limit(SKETCH_BATCH_SIZE)
+                )
+            ).all()
+            if not rows:
+                break
+            for source in DataSource:
+                batch = [row for row in rows if row.source == source]
+                if not batch:
+                    continue
+                # Column-wise: one list per feature, in FEATURE_COLUMNS order
+                feature_values = list(zip(*batch))[2:]
+                for feature, values in zip(FEATURE_COLUMNS, feature_values):
+                    sketches[source, feature].update_many(
+                        value for value in values if value is not None
+                    )
+            watermark = rows[-1].id
+            added += len(rows)
+
+        if not added:
+            return 0
+        for (source, feature), sketch in sketches.items():
+            row = stored.get((source, feature))
+            if row is None:
+                row = QuantileSketch(source=source, feature=feature)
+                self.db.add(row)
+            row.count = sketch.n
+            row.sketch = sketch.to_dict()
+            row.watermark = watermark
+        await self.db.flush()
+        return added
+
+    async def quantiles(
+        self,
+        source: Optional[DataSource] = None,
+        fractions: Sequence[float] = DEFAULT_QUANTILES,
+    ) -> Dict[str, Any]:
+        """Approximate quantiles of every feature, merging the sources' sketches."""
+        stored = await self._load(source)
+        features = {}
+        for feature in FEATURE_COLUMNS:
+            merged = KllSketch(settings.QUANTILE_SKETCH_K)
+            for (_, name), row in stored.items():
+                if name == feature:
+                    merged.merge(KllSketch.from_dict(row.sketch))
+            features[feature] = {
+                "count": merged.n,
+                "min": merged.min,
+                "max": merged.max,
+                "quantiles": dict(zip(fractions, merged.quantiles(fractions))),
+            }
+        return {
+            "source": source,
+            "watermark": min((row.watermark for row in stored.values()), default=0),
+            # The least accurate sketch bounds the merged error
+            "rank_error": KllSketch.rank_error(
+                min(
+                    (row.sketch["k"] for row in stored.values()),
+                    default=settings.QUANTILE_SKETCH_K,
+                )
+            ),
+            "features": features,
+        }
+
+
+async def refresh_quantile_sketches() -> int:
+    """Scheduler entry point: fold new records into the sketches and commit."""
+    async with AsyncSessionLocal() as db:
+        added = await QuantileSketchService(db).update()
+        await db.commit()
+    if added:
+        logger.info("Quantile sketches updated with %d records", added)
+    return added
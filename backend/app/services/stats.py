@@ -0,0 +1,146 @@
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+from app.models.diabetes import FEATURE_COLUMNS, DataSource
+from app.models.stats import RECORDS_FEATURE, RecordStats
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock held by whichever process is reconciling record_stats
+RECONCILE_LOCK_KEY = 48_206
+
+# Exact aggregates recomputed from diabetes_records, as the triggers build them
+RECOMPUTE_STATS = text(
+    f"""
+    SELECT r.source::text AS source, f.feature, count(f.value) AS count,
+           coalesce(sum(f.value), 0) AS sum,
+           coalesce(sum(f.value * f.value), 0) AS sum_squares
+    FROM diabetes_records r
+    CROSS JOIN LATERAL (VALUES ('{RECORDS_FEATURE}', 1::numeric),
+        {", ".join(f"('{c}', r.{c}::numeric)" for c in FEATURE_COLUMNS)},
+        ('outcome', r.outcome::int::numeric)) AS f(feature, value)
+    GROUP BY r.source, f.feature
+    """
+)
+
+CURRENT_STATS = text(
+    """
+    SELECT source::text AS source, feature, sum(count) AS count, sum(sum) AS sum,
+           sum(sum_squares) AS sum_squares
+    FROM record_stats GROUP BY source, feature
+    """
+)
+
+
+class RecordStatsService:
+    """O(1) dataset summaries from the trigger-maintained record_stats table."""
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the service."""
+        self.db = db
+
+    async def summary(self, source: Optional[DataSource] = None) -> Dict[str, Any]:
+        """Record counts, positive rate and per-feature mean/variance."""
+        query = select(
+            RecordStats.feature,
+            func.sum(RecordStats.count),
+            func.sum(RecordStats.sum),
+            func.sum(RecordStats.sum_squares),
+        ).group_by(RecordStats.feature)
+        if source is not None:
+            query = query.where(RecordStats.source == source)
+        totals = {
+            feature: (int(count), total, squares)
+            for feature, count, total, squares in await self.db.execute(query)
+        }
+
+        features = {}
+        for feature in FEATURE_COLUMNS:
+            count, total, squares = totals.get(feature, (0, 0, 0))
+            mean = variance = None
+            if count:
+                mean = float(total / count)
+                # Exact numeric sums, so E[x^2] - E[x]^2 does not cancel badly
+                variance = max(float(squares / count - (total / count) ** 2), 0.0)
+            features[feature] = {
+                "count": count,
+                "mean": mean,
+                "variance": variance,
+                "std": None if variance is None else math.sqrt(variance),
+            }
+
+        total_records = totals.get(RECORDS_FEATURE, (0, 0, 0))[0]
+        positive_cases = int(totals.get("outcome", (0, 0, 0))[1])
+        return {
+            "source": source,
+            "total_records": total_records,
+            "positive_cases": positive_cases,
+            "positive_rate": (
+                positive_cases / total_records * 100 if total_records else 0.0
+            ),
+            "features": features,
+        }
+
+    async def reconcile(self) -> List[Dict[str, Any]]:
+        """Recompute record_stats from diabetes_records and fix any drift.
+
+        Blocks writes to diabetes_records until the caller commits, so the
+        recomputed totals cannot miss concurrent inserts. Returns the
+        (source, feature) pairs that had drifted. Only one process
+        reconciles at a time; the others skip and return no drift.
+        """
+        acquired = await self.db.scalar(
+            select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_KEY))
+        )
+        if not acquired:
+            logger.info("record_stats being reconciled elsewhere, skipping")
+            return []
+
+        # Waits for in-flight writers (and their trigger updates) to commit
+        await self.db.execute(text("LOCK TABLE diabetes_records IN SHARE MODE"))
+
+        current = {
+            (row.source, row.feature): row
+            for row in (await self.db.execute(CURRENT_STATS)).all()
+        }
+        expected = {
+            (row.source, row.feature): row
+            for row in (await self.db.execute(RECOMPUTE_STATS)).all()
+        }
+
+        drift = []
+        for key in current.keys() | expected.keys():
+            have, want = current.get(key), expected.get(key)
+            have_values = (have.count, have.sum, have.sum_squares) if have else (0,) * 3
+            want_values = (want.count, want.sum, want.sum_squares) if want else (0,) * 3
+            if have_values != want_values:
+                drift.append(
+                    {
+                        "source": key[0],
+                        "feature": key[1],
+                        "count": have_values[0],
+                        "expected_count": want_values[0],
+                    }
+                )
+
+        if drift:
+            await self.db.execute(delete(RecordStats))
+        if drift and expected:
+            await self.db.execute(
+                insert(RecordStats),
+                [
+                    {
+                        "source": DataSource[row.source],
+                        "feature": row.feature,
+                        "shard": 0,
+                        "count": row.count,
+                        "sum": row.sum,
+                        "sum_squares": row.sum_squares,
+                    }
+                    for row in expected.values()
+                ],
+            )
+        return sorted(drift, key=lambda row: (row["source"], row["feature"]))
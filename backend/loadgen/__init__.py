@@ -0,0 +1,8 @@
+"""Load generator for the backend API.
+
+Drives a weighted mix of the frontend's requests (signing up, submitting
+records, fetching assessments) at a fixed concurrency or at increasing
+arrival rates, with the LLM provider and the SMTP server replaced by
+local stand-ins, and reports latency percentiles, throughput and error
+rates per stage as JSON. See ``python -m loadgen --help``.
+"""
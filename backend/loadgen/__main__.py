@@ -0,0 +1,123 @@
+"""Load test the backend and report each stage as JSON.
+
+Against a local API and worker started for the run, with the LLM and
+SMTP stand-ins (the database comes from the usual settings):
+
+    python -m loadgen --spawn --rates 5,10,20,40 --duration 30
+
+Against a running instance (start ``python -m loadgen.standins`` and
+configure the API and worker with what it prints to keep external
+services out of it):
+
+    python -m loadgen --base-url http://localhost:8000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .instance import LocalInstance
+from .runner import LoadRunner
+from .scenarios import DEFAULT_MIX, parse_mix
+from .standins import StandIns
+
+logger = logging.getLogger("loadgen")
+
+
+def parse_rates(rates: Optional[str]) -> List[Optional[float]]:
+    """Arrival rates per stage; one closed-model stage without any."""
+    if not rates:
+        return [None]
+    return [float(rate) for rate in rates.split(",")]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    async with AsyncExitStack() as stack:
+        standins = None
+        base_url = args.base_url
+        if args.spawn:
+            standins = await stack.enter_async_context(
+                StandIns(args.llm_latency, args.smtp_latency)
+            )
+            instance = await stack.enter_async_context(
+                LocalInstance(
+                    standins.env(),
+                    api_workers=args.api_workers,
+                    worker_concurrency=args.worker_concurrency,
+                )
+            )
+            base_url = instance.base_url
+
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(
+                base_url=base_url,
+                timeout=args.timeout,
+                limits=httpx.Limits(max_connections=args.concurrency),
+            )
+        )
+        runner = LoadRunner(client, mix, args.concurrency, args.duration)
+        await runner.seed(args.seed_users)
+        started = time.time()
+        stages = await runner.run(parse_rates(args.rates))
+
+        return {
+            "base_url": base_url,
+            "started": started,
+            "mix": mix,
+            "stages": [stage.summary() for stage in stages],
+            "standins": standins.counts() if standins else None,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]),
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", default="http://localhost:8000")
+    target.add_argument(
+        "--spawn", action="store_true", help="start a local API and worker"
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,...")
+    parser.add_argument(
+        "--rates", help="arrival rates per second, one stage each (default: closed)"
+    )
+    parser.add_argument("--concurrency", type=int, default=50, help="max in flight")
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="seconds per stage"
+    )
+    parser.add_argument("--seed-users", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    spawned = parser.add_argument_group("with --spawn")
+    spawned.add_argument("--api-workers", type=int, default=1)
+    spawned.add_argument("--worker-concurrency", type=int, default=8)
+    spawned.add_argument("--llm-latency", type=float, default=1.5)
+    spawned.add_argument("--smtp-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(name)s %(message)s", stream=sys.stderr
+    )
+    # One line per request otherwise
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""A local API and worker started for the run, configured for the stand-ins."""
+
+import asyncio
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import IO, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalInstance:
+    """``uvicorn main:app`` and ``worker.py`` as subprocesses.
+
+    The database settings come from the environment, as for any other
+    run; the schema must be migrated already.
+    """
+
+    def __init__(
+        self,
+        env: Dict[str, str],
+        api_workers: int = 1,
+        worker_concurrency: int = 8,
+        log_dir: Optional[Path] = None,
+    ):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.env = {
+            **os.environ,
+            **env,
+            # Each run starts its own scheduler otherwise
+            "ENABLE_SCHEDULER": "false",
+        }
+        self.api_workers = api_workers
+        self.worker_concurrency = worker_concurrency
+        self.log_dir = log_dir or Path("/tmp")
+        self._processes: List[subprocess.Popen] = []
+        self._logs: List[IO] = []
+
+    def _spawn(self, name: str, args: List[str]) -> None:
+        log = open(self.log_dir / f"loadgen-{name}.log", "w")
+        self._logs.append(log)
+        logger.info("Starting %s, logging to %s", name, log.name)
+        self._processes.append(
+            subprocess.Popen(
+                [sys.executable, *args],
+                cwd=BACKEND_DIR,
+                env=self.env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        )
+
+    async def _wait_ready(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient(base_url=self.base_url) as client:
+            while time.monotonic() < deadline:
+                if any(process.poll() is not None for process in self._processes):
+                    raise RuntimeError(f"The API or worker exited, see {self.log_dir}")
+                try:
+                    if (await client.get("/ready")).status_code == 200:
+                        return
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.5)
+        raise RuntimeError(f"The API was not ready within {timeout:.0f}s")
+
+    async def __aenter__(self) -> "LocalInstance":
+        self._spawn(
+            "api",
+            [
+                "-m",
+                "uvicorn",
+                "main:app",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.api_workers),
+                "--no-access-log",
+            ],
+        )
+        self._spawn(
+            "worker",
+            [
+                "worker.py",
+                "--concurrency",
+                str(self.worker_concurrency),
+                "--metrics-port",
+                "0",
+            ],
+        )
+        try:
+            await self._wait_ready(timeout=120)
+        except BaseException:
+            await self.stop()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def stop(self) -> None:
+        """Terminate both, letting in-flight jobs finish against the stand-ins."""
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                await asyncio.to_thread(process.wait, timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for log in self._logs:
+            log.close()
+        self._processes, self._logs = [], []
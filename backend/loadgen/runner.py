@@ -0,0 +1,123 @@
+"""Driving the scenarios at a fixed concurrency or arrival rate.
+
+In the closed model (no rate) ``concurrency`` clients each send their
+next request as soon as the last one is answered; throughput is whatever
+the backend sustains. In the open model requests arrive at ``rate`` per
+second (a Poisson process, as independent users do) whether or not
+earlier ones are answered, at most ``concurrency`` in flight; arrivals
+finding every slot busy are counted as dropped. Latency is measured from
+when a request was due, not when it was sent, so a client falling behind
+does not hide the backend's queueing.
+
+Running increasing rates as stages shows where the backend saturates:
+throughput stops following the rate while p99 and drops climb.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from .scenarios import SCENARIOS, Population, onboard, resolve
+from .stats import StageStats
+
+logger = logging.getLogger(__name__)
+
+
+class LoadRunner:
+    """Runs stages of a scenario mix against one backend."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        mix: Dict[str, float],
+        concurrency: int,
+        duration: float,
+    ):
+        self.client = client
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.concurrency = concurrency
+        self.duration = duration
+        self.population = Population()
+
+    async def seed(self, users: int) -> None:
+        """Onboard users before measuring, so the read scenarios have records."""
+        for _ in range(users):
+            response = await onboard(self.client, self.population)
+            response.raise_for_status()
+
+    async def _request(self, stats: StageStats, due: float) -> None:
+        name = resolve(random.choices(self.names, self.weights)[0], self.population)
+        status: Optional[int] = None
+        try:
+            response = await SCENARIOS[name](self.client, self.population)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            logger.debug("%s failed: %r", name, e)
+        stats.record(name, time.perf_counter() - due, status)
+
+    async def _closed(self, stats: StageStats, deadline: float) -> None:
+        async def client_loop() -> None:
+            while time.perf_counter() < deadline:
+                await self._request(stats, time.perf_counter())
+
+        await asyncio.gather(*(client_loop() for _ in range(self.concurrency)))
+
+    async def _open(self, stats: StageStats, rate: float, deadline: float) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+
+        async def arrival(due: float) -> None:
+            try:
+                await self._request(stats, due)
+            finally:
+                slots.release()
+
+        due = time.perf_counter()
+        while True:
+            due += random.expovariate(rate)
+            if due >= deadline:
+                break
+            await asyncio.sleep(max(due - time.perf_counter(), 0))
+            if slots.locked():
+                stats.dropped += 1
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(arrival(due))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        # Requests started in the stage count in it
+        await asyncio.gather(*in_flight)
+
+    async def stage(self, rate: Optional[float]) -> StageStats:
+        """Run the mix for the duration, open at ``rate`` or closed without."""
+        stats = StageStats(rate, self.concurrency)
+        started = time.perf_counter()
+        deadline = started + self.duration
+        if rate:
+            await self._open(stats, rate, deadline)
+        else:
+            await self._closed(stats, deadline)
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    async def run(self, rates: List[Optional[float]]) -> List[StageStats]:
+        stages = []
+        for rate in rates:
+            stats = await self.stage(rate)
+            summary = stats.summary()
+            logger.info(
+                "rate=%s: %d requests, %.1f ok/s, p99 %.0fms, %.1f%% errors, %d dropped",
+                rate or "closed",
+                summary["requests"],
+                summary["throughput"],
+                summary["latency_ms"]["p99"],
+                summary["error_rate"] * 100,
+                stats.dropped,
+            )
+            stages.append(stats)
+        return stages
@@ -0,0 +1,141 @@
+"""What the simulated clients do.
+
+Each scenario sends one request, as a user of the frontend would, and
+returns the response. The users and records they create are remembered
+in a ``Population`` so later requests (submitting another record,
+fetching an assessment) refer to ones that exist; until there are any,
+``resolve`` runs ``onboard`` in their place.
+"""
+
+import random
+import uuid
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+# Ids kept for the read scenarios; recent ones, as real traffic reads
+POPULATION_SIZE = 5000
+
+
+class Population:
+    """Users and records created so far."""
+
+    def __init__(self):
+        self.user_ids: Deque[int] = deque(maxlen=POPULATION_SIZE)
+        self.record_ids: Deque[int] = deque(maxlen=POPULATION_SIZE)
+
+    def user_id(self) -> Optional[int]:
+        return random.choice(self.user_ids) if self.user_ids else None
+
+    def record_id(self) -> Optional[int]:
+        return random.choice(self.record_ids) if self.record_ids else None
+
+
+def user_payload() -> Dict:
+    """A new user with a unique email."""
+    return {
+        "name": "Load",
+        "surname": "Test",
+        "email": f"load-{uuid.uuid4().hex}@example.com",
+    }
+
+
+def record_payload() -> Dict:
+    """A random but valid diabetes record."""
+    return {
+        "pregnancies": random.randint(0, 10),
+        "glucose": random.randint(70, 200),
+        "blood_pressure": random.randint(50, 100),
+        "skin_thickness": random.randint(10, 50),
+        "insulin": random.randint(0, 300),
+        "bmi": round(random.uniform(18.0, 45.0), 1),
+        "diabetes_pedigree": round(random.uniform(0.1, 2.0), 3),
+        "age": random.randint(21, 80),
+    }
+
+
+async def create_user(
+    client: httpx.AsyncClient, population: Population
+) -> httpx.Response:
+    """Sign up without a record."""
+    response = await client.post("/api/v1/users/", json=user_payload())
+    if response.status_code == 200:
+        population.user_ids.append(response.json()["id"])
+    return response
+
+
+async def onboard(client: httpx.AsyncClient, population: Population) -> httpx.Response:
+    """Sign up with a first record, as the frontend's form does."""
+    response = await client.post(
+        "/api/v1/users/onboard",
+        json={"user": user_payload(), "record": record_payload()},
+    )
+    if response.status_code == 200:
+        body = response.json()
+        population.user_ids.append(body["user"]["id"])
+        population.record_ids.append(body["record"]["id"])
+    return response
+
+
+async def submit_record(
+    client: httpx.AsyncClient, population: Population
+) -> httpx.Response:
+    """Submit another record for an existing user."""
+    user_id = population.user_id()
+    response = await client.post(
+        "/api/v1/diabetes/", json={"user_id": user_id, **record_payload()}
+    )
+    if response.status_code == 200:
+        population.record_ids.append(response.json()["id"])
+    return response
+
+
+async def fetch_assessment(
+    client: httpx.AsyncClient, population: Population
+) -> httpx.Response:
+    """Look a record's assessment up; a 202 means it is still queued."""
+    record_id = population.record_id()
+    return await client.get(f"/api/v1/diabetes/{record_id}/assessment")
+
+
+Scenario = Callable[[httpx.AsyncClient, Population], Awaitable[httpx.Response]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "create_user": create_user,
+    "onboard": onboard,
+    "submit_record": submit_record,
+    "fetch_assessment": fetch_assessment,
+}
+
+
+def resolve(name: str, population: Population) -> str:
+    """The scenario to run for name: onboard until there is a user or record to use.
+
+    Resolved before the request, so its latency is counted under the
+    scenario that actually ran.
+    """
+    if name == "submit_record" and not population.user_ids:
+        return "onboard"
+    if name == "fetch_assessment" and not population.record_ids:
+        return "onboard"
+    return name
+
+
+DEFAULT_MIX = "onboard=4,submit_record=2,fetch_assessment=6,create_user=1"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Weights by scenario from ``name=weight,...``."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(
+                f"Unknown scenario {name!r}, expected one of {list(SCENARIOS)}"
+            )
+        weights[name] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError("The scenario mix has no weight")
+    return weights
@@ -0,0 +1,245 @@
+"""Local stand-ins for the LLM provider and the SMTP server.
+
+Under load the backend would otherwise call Hugging Face for every
+assessment and Gmail for every notification: slow, rate limited, billed,
+and not what is being measured. The stand-ins answer the same protocols
+on localhost after a configurable delay, so the backend's own code paths
+(the client libraries, the threads they run on) stay in the test:
+
+- ``LLMStandIn`` serves ``POST .../chat/completions`` with a canned
+  completion in the format ``LLMService`` parses;
+- ``SMTPStandIn`` accepts EHLO, AUTH, MAIL, RCPT and DATA and discards
+  the message.
+
+``StandIns.env()`` is the backend configuration pointing at them.
+
+    python -m loadgen.standins --llm-latency 1.5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, Optional, Set
+
+COMPLETION = """1. Risk Assessment:
+Your results suggest a moderate risk of developing diabetes. Glucose and BMI \
+are the main factors to keep an eye on.
+
+2. Key Recommendations:
+- Walk for 30 minutes on most days of the week.
+- Replace sugary drinks with water.
+- Book a fasting glucose test within three months.
+
+3. Preventive Measures:
+- Eat vegetables with two meals a day.
+- Keep a regular sleep schedule.
+- Check your weight once a week."""
+
+
+class _StandIn:
+    """A localhost server handling each connection with ``_serve``."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        raise NotImplementedError
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            await self._serve(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Stopped; ending quietly, as asyncio logs cancelled handlers
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Listen, on a free port unless one is given; returns the port."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        # Kept-alive connections outlive the listening socket
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+
+class LLMStandIn(_StandIn):
+    """OpenAI-compatible chat completion endpoint answering after a delay."""
+
+    def __init__(self, latency: float = 1.5):
+        super().__init__(latency)
+        self.requests = 0
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # HTTP/1.1 with keep-alive, as the client's session pools connections
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers.get("content-length", 0)))
+
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            if method == "POST" and path.endswith("/chat/completions"):
+                self.requests += 1
+                await asyncio.sleep(self.latency)
+                status, body = "200 OK", self._completion()
+            else:
+                status, body = "404 Not Found", b'{"error": "not found"}'
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+
+    def _completion(self) -> bytes:
+        return json.dumps(
+            {
+                "id": f"standin-{self.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "standin",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": COMPLETION},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0,
+                },
+            }
+        ).encode()
+
+
+class SMTPStandIn(_StandIn):
+    """SMTP server accepting any login and message after a delay."""
+
+    def __init__(self, latency: float = 0.2):
+        super().__init__(latency)
+        self.messages = 0
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 loadgen ESMTP")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode("latin-1").strip().split(" ", 1)[0].upper()
+            if command == "EHLO":
+                # No STARTTLS: the backend runs with EMAIL_STARTTLS off
+                await reply("250-loadgen\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+            elif command == "AUTH":
+                await reply("235 Authentication successful")
+            elif command == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while await reader.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                await asyncio.sleep(self.latency)
+                self.messages += 1
+                await reply("250 Queued")
+            elif command == "QUIT":
+                await reply("221 Bye")
+                break
+            elif command in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                await reply("250 OK")
+            else:
+                await reply("502 Command not implemented")
+
+
+class StandIns:
+    """Both stand-ins, listening on free localhost ports while in use."""
+
+    def __init__(self, llm_latency: float = 1.5, smtp_latency: float = 0.2):
+        self.llm = LLMStandIn(llm_latency)
+        self.smtp = SMTPStandIn(smtp_latency)
+        self.llm_port = 0
+        self.smtp_port = 0
+
+    async def __aenter__(self) -> "StandIns":
+        self.llm_port = await self.llm.start()
+        self.smtp_port = await self.smtp.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.llm.stop()
+        await self.smtp.stop()
+
+    def env(self) -> Dict[str, str]:
+        """Backend settings sending its LLM and SMTP traffic to the stand-ins."""
+        return {
+            "LLM_BASE_URL": f"http://127.0.0.1:{self.llm_port}/v1",
+            "HUGGINGFACE_API_KEY": "loadgen",
+            # The stand-in has no quota to protect
+            "LLM_RATE_LIMIT": "0",
+            "ENABLE_NOTIFICATIONS": "true",
+            "NOTIFICATION_CHANNEL": "email",
+            "EMAIL_HOST": "127.0.0.1",
+            "EMAIL_PORT": str(self.smtp_port),
+            "EMAIL_STARTTLS": "false",
+            "EMAIL_USER": "loadgen@example.com",
+            "EMAIL_PASSWORD": "loadgen",
+        }
+
+    def counts(self) -> Dict[str, int]:
+        return {"llm_requests": self.llm.requests, "emails": self.smtp.messages}
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    async with StandIns(args.llm_latency, args.smtp_latency) as standins:
+        for name, value in standins.env().items():
+            print(f"export {name}={value}")
+        print(
+            "# Start the API and worker with these settings; Ctrl-C to stop", flush=True
+        )
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the LLM and SMTP stand-ins.")
+    parser.add_argument("--llm-latency", type=float, default=1.5)
+    parser.add_argument("--smtp-latency", type=float, default=0.2)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
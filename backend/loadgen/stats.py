@@ -0,0 +1,79 @@
+"""Latency, throughput and error accounting for a load stage."""
+
+import math
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """The nearest-rank q-th percentile of sorted values."""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class ScenarioStats:
+    """Outcomes of one scenario's requests."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    def record(self, seconds: float, status: Optional[int]) -> None:
+        """Count a request; a status of None is a timeout or connection error."""
+        self.latencies.append(seconds)
+        self.statuses[str(status) if status is not None else "transport_error"] += 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        latency = {f"p{q}": percentile(ordered, q) * 1000 for q in PERCENTILES}
+        latency["mean"] = sum(ordered) / count * 1000 if count else 0.0
+        latency["max"] = ordered[-1] * 1000 if count else 0.0
+        return {
+            "requests": count,
+            "throughput": round((count - self.errors) / elapsed, 3) if elapsed else 0.0,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "statuses": dict(self.statuses),
+            "latency_ms": {name: round(value, 2) for name, value in latency.items()},
+        }
+
+
+class StageStats:
+    """Outcomes of every request started during a stage."""
+
+    def __init__(self, target_rate: Optional[float], concurrency: int):
+        self.target_rate = target_rate
+        self.concurrency = concurrency
+        self.scenarios: Dict[str, ScenarioStats] = defaultdict(ScenarioStats)
+        # Arrivals not sent because all concurrency slots were busy
+        self.dropped = 0
+        self.elapsed = 0.0
+
+    def record(self, scenario: str, seconds: float, status: Optional[int]) -> None:
+        self.scenarios[scenario].record(seconds, status)
+
+    def summary(self) -> Dict[str, Any]:
+        total = ScenarioStats()
+        for stats in self.scenarios.values():
+            total.latencies.extend(stats.latencies)
+            total.statuses.update(stats.statuses)
+            total.errors += stats.errors
+        return {
+            "target_rate": self.target_rate,
+            "concurrency": self.concurrency,
+            "seconds": round(self.elapsed, 3),
+            "dropped": self.dropped,
+            **total.summary(self.elapsed),
+            "scenarios": {
+                name: stats.summary(self.elapsed)
+                for name, stats in sorted(self.scenarios.items())
+            },
+        }
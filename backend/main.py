@@ -1,16 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from app.api.v1.router import api_router
+from app.core.cache import CACHE_INVALIDATION_CHANNEL, response_cache
 from app.core.config import get_settings
-from fastapi import FastAPI
+from app.core.instrumentation import RequestMetricsMiddleware
+from app.core.listener import PgListener
+from app.core.metrics import mark_process_dead, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_tracer import QueryTraceMiddleware
+from app.core.scheduler import create_scheduler
+from app.core.warmup import warm_up, warm_up_steps
+from app.services.assessment_status import assessment_waiters
+from app.services.jobs import ASSESSMENT_READY_CHANNEL
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 
 settings = get_settings()
 
-# Global scheduler instance
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Global scheduler instance
+    scheduler = create_scheduler() if settings.ENABLE_SCHEDULER else None
+    if scheduler:
+        scheduler.start()
+    listener = PgListener()
+    # Cached responses are dropped when the rows they read are written
+    await listener.listen(CACHE_INVALIDATION_CHANNEL, response_cache.on_notify)
+    response_cache.listener = listener
+    # Requests waiting on an assessment are woken when its job finishes
+    await listener.listen(ASSESSMENT_READY_CHANNEL, assessment_waiters.on_notify)
+    await listener.start()
+    app.state.listener = listener
+    # Run in the background; /ready reports when it is done
+    warming = asyncio.create_task(warm_up.run(warm_up_steps()))
+    yield
+    warming.cancel()
+    await listener.stop()
+    if scheduler:
+        scheduler.shutdown(wait=False)
+    mark_process_dead()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -22,6 +60,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latency per route and status, and requests in progress, for /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
+# Profiles requests that send the profiling token, or a configured sample
+app.add_middleware(ProfilingMiddleware)
+
+# Statements per request, checked against endpoint budgets, with QUERY_TRACING
+app.add_middleware(QueryTraceMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -34,3 +81,30 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check(request: Request):
+    """
+    Readiness probe: 503 until start-up warm-up has finished.
+
+    Unlike /health, which only says the process is up, this says it can
+    serve requests without paying cold-start costs.
+    """
+    listener = getattr(request.app.state, "listener", None)
+    listening = listener is not None and listener.connected
+    ready = warm_up.complete and listening
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "warming_up",
+            "steps": warm_up.status,
+            "seconds": warm_up.seconds,
+            "listener": listening,
+        },
+        status_code=200 if ready else 503,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
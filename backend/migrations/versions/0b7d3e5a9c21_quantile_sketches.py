@@ -0,0 +1,36 @@
+"""quantile_sketches
+
+Revision ID: 0b7d3e5a9c21
+Revises: f2a9c4e61b08
+Create Date: 2026-10-19 19:03:26.418735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7d3e5a9c21'
+down_revision: Union[str, None] = 'f2a9c4e61b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The sketches are built by the first scheduled refresh
+    op.create_table('quantile_sketches',
+    sa.Column('source', postgresql.ENUM('DATASET', 'USER_ENTRY', name='datasource', create_type=False), nullable=False),
+    sa.Column('feature', sa.String(), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('sketch', sa.JSON(), nullable=False, comment='KllSketch.to_dict()'),
+    sa.Column('watermark', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('source', 'feature')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('quantile_sketches')
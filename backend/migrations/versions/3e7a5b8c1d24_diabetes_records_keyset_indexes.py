@@ -0,0 +1,32 @@
+"""diabetes_records_keyset_indexes
+
+Revision ID: 3e7a5b8c1d24
+Revises: 9b1f4c2d7e10
+Create Date: 2026-10-19 10:05:41.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7a5b8c1d24'
+down_revision: Union[str, None] = '9b1f4c2d7e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        op.create_index('ix_diabetes_records_created_at_id', 'diabetes_records', ['created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_diabetes_records_source_created_at_id', 'diabetes_records', ['source', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_diabetes_records_user_id_created_at_id', 'diabetes_records', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_diabetes_records_user_id_created_at_id', table_name='diabetes_records', postgresql_concurrently=True)
+        op.drop_index('ix_diabetes_records_source_created_at_id', table_name='diabetes_records', postgresql_concurrently=True)
+        op.drop_index('ix_diabetes_records_created_at_id', table_name='diabetes_records', postgresql_concurrently=True)
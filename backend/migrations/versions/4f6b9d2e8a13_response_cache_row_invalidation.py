@@ -0,0 +1,68 @@
+"""response cache row invalidation
+
+Revision ID: 4f6b9d2e8a13
+Revises: c9e4a7f2b815
+Create Date: 2026-10-19 23:48:31.602184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f6b9d2e8a13'
+down_revision: Union[str, None] = 'c9e4a7f2b815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Row triggers notify 'table:id'; TRUNCATE notifies the table
+NOTIFY_RESPONSE_CACHE_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_response_cache() RETURNS trigger AS $$
+BEGIN
+    IF TG_LEVEL = 'STATEMENT' THEN
+        PERFORM pg_notify('response_cache_invalidation', TG_ARGV[0]);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('response_cache_invalidation', TG_ARGV[0] || ':' || OLD.id);
+    ELSE
+        PERFORM pg_notify('response_cache_invalidation', TG_ARGV[0] || ':' || NEW.id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+PREVIOUS_NOTIFY_RESPONSE_CACHE_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_response_cache() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('response_cache_invalidation', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.execute(NOTIFY_RESPONSE_CACHE_FUNCTION)
+    op.execute('DROP TRIGGER health_assessments_response_cache ON health_assessments')
+    op.execute(
+        'CREATE TRIGGER health_assessments_response_cache '
+        'AFTER INSERT OR UPDATE OR DELETE ON health_assessments '
+        "FOR EACH ROW EXECUTE FUNCTION notify_response_cache('health_assessments')"
+    )
+    op.execute(
+        'CREATE TRIGGER health_assessments_response_cache_truncate '
+        'AFTER TRUNCATE ON health_assessments '
+        "FOR EACH STATEMENT EXECUTE FUNCTION notify_response_cache('health_assessments')"
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER health_assessments_response_cache_truncate ON health_assessments')
+    op.execute('DROP TRIGGER health_assessments_response_cache ON health_assessments')
+    op.execute(PREVIOUS_NOTIFY_RESPONSE_CACHE_FUNCTION)
+    op.execute(
+        'CREATE TRIGGER health_assessments_response_cache '
+        'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON health_assessments '
+        'FOR EACH STATEMENT EXECUTE FUNCTION notify_response_cache()'
+    )
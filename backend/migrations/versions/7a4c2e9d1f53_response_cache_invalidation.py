@@ -0,0 +1,40 @@
+"""response cache invalidation
+
+Revision ID: 7a4c2e9d1f53
+Revises: 5d8e1f3b7a46
+Create Date: 2026-10-19 21:02:44.193620
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4c2e9d1f53'
+down_revision: Union[str, None] = '5d8e1f3b7a46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOTIFY_RESPONSE_CACHE_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_response_cache() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('response_cache_invalidation', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.execute(NOTIFY_RESPONSE_CACHE_FUNCTION)
+    op.execute(
+        'CREATE OR REPLACE TRIGGER health_assessments_response_cache '
+        'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON health_assessments '
+        'FOR EACH STATEMENT EXECUTE FUNCTION notify_response_cache()'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER health_assessments_response_cache ON health_assessments')
+    op.execute('DROP FUNCTION notify_response_cache()')
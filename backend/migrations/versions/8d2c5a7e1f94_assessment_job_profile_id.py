@@ -0,0 +1,26 @@
+"""assessment job profile id
+
+Revision ID: 8d2c5a7e1f94
+Revises: 4f6b9d2e8a13
+Create Date: 2026-10-20 00:21:07.318452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2c5a7e1f94'
+down_revision: Union[str, None] = '4f6b9d2e8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('assessment_jobs', sa.Column('profile_id', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('assessment_jobs', 'profile_id')
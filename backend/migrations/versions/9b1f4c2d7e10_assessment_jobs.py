@@ -0,0 +1,46 @@
+"""assessment_jobs
+
+Revision ID: 9b1f4c2d7e10
+Revises: 2878ebf4ec41
+Create Date: 2026-10-19 09:40:12.418302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1f4c2d7e10'
+down_revision: Union[str, None] = '2878ebf4ec41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('assessment_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('diabetes_record_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', name='jobstatus'), server_default='PENDING', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('locked_by', sa.String(), nullable=True),
+    sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['diabetes_record_id'], ['diabetes_records.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_assessment_jobs_pending', 'assessment_jobs', ['run_after', 'id'], unique=False, postgresql_where=sa.text("status = 'PENDING'"))
+    op.create_index('ix_assessment_jobs_running', 'assessment_jobs', ['started_at'], unique=False, postgresql_where=sa.text("status = 'RUNNING'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_assessment_jobs_running', table_name='assessment_jobs', postgresql_where=sa.text("status = 'RUNNING'"))
+    op.drop_index('ix_assessment_jobs_pending', table_name='assessment_jobs', postgresql_where=sa.text("status = 'PENDING'"))
+    op.drop_table('assessment_jobs')
+    sa.Enum(name='jobstatus').drop(op.get_bind(), checkfirst=False)
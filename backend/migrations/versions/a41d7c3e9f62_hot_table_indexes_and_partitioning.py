@@ -0,0 +1,99 @@
+"""hot_table_indexes_and_partitioning
+
+Revision ID: a41d7c3e9f62
+Revises: 3e7a5b8c1d24
+Create Date: 2026-10-19 13:12:08.416203
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d7c3e9f62'
+down_revision: Union[str, None] = '3e7a5b8c1d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FEATURE_COLUMNS = ['pregnancies', 'glucose', 'blood_pressure', 'skin_thickness', 'insulin', 'bmi', 'diabetes_pedigree', 'age']
+COPY_COLUMNS = 'id, risk_score, risk_level, recommendations, created_at, updated_at, user_id, diabetes_record_id'
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _health_assessments_table(name: str, primary_key: sa.PrimaryKeyConstraint, created_at_nullable: bool = False, **kw) -> None:
+    op.create_table(name,
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('health_assessments_id_seq'::regclass)"), nullable=False),
+    sa.Column('risk_score', sa.Float(), nullable=False),
+    sa.Column('risk_level', sa.String(), nullable=False),
+    sa.Column('recommendations', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=created_at_nullable),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('diabetes_record_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['diabetes_record_id'], ['diabetes_records.id'], name='health_assessments_diabetes_record_id_fkey'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='health_assessments_user_id_fkey'),
+    primary_key,
+    **kw
+    )
+
+
+def upgrade() -> None:
+    # Training reads every dataset row; a covering partial index answers it
+    # with an index-only scan. Built without blocking writes.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_diabetes_records_dataset', 'diabetes_records', ['id'], unique=False, postgresql_include=FEATURE_COLUMNS + ['outcome'], postgresql_where=sa.text("source = 'DATASET'"), postgresql_concurrently=True)
+
+    # Range-partition health_assessments by month. A partitioned table's
+    # unique keys must contain the partition key, so the primary key becomes
+    # (id, created_at) and diabetes_records can no longer reference id alone.
+    op.drop_constraint('diabetes_records_health_assessment_id_fkey', 'diabetes_records', type_='foreignkey')
+    op.drop_index('ix_health_assessments_id', table_name='health_assessments')
+    op.rename_table('health_assessments', 'health_assessments_unpartitioned')
+    op.execute('ALTER TABLE health_assessments_unpartitioned RENAME CONSTRAINT health_assessments_pkey TO health_assessments_unpartitioned_pkey')
+
+    _health_assessments_table('health_assessments',
+        primary_key=sa.PrimaryKeyConstraint('id', 'created_at', name='health_assessments_pkey'),
+        postgresql_partition_by='RANGE (created_at)')
+    op.create_index('ix_health_assessments_user_id_created_at', 'health_assessments', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_health_assessments_diabetes_record_id', 'health_assessments', ['diabetes_record_id'], unique=False)
+
+    # One partition per month from the oldest row to a few months ahead;
+    # app.services.partitions keeps adding them from then on
+    conn = op.get_bind()
+    oldest = conn.execute(sa.text('SELECT min(created_at) FROM health_assessments_unpartitioned')).scalar()
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    month = min(oldest.date(), this_month).replace(day=1) if oldest else this_month
+    last = _add_months(this_month, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(f"CREATE TABLE health_assessments_{month:%Y_%m} PARTITION OF health_assessments FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')")
+        month = _add_months(month, 1)
+    op.execute('CREATE TABLE health_assessments_default PARTITION OF health_assessments DEFAULT')
+
+    op.execute(f'INSERT INTO health_assessments ({COPY_COLUMNS}) SELECT id, risk_score, risk_level, recommendations, coalesce(created_at, now()), updated_at, user_id, diabetes_record_id FROM health_assessments_unpartitioned')
+    # Keep the id sequence when the old table goes
+    op.execute('ALTER SEQUENCE health_assessments_id_seq OWNED BY health_assessments.id')
+    op.drop_table('health_assessments_unpartitioned')
+
+
+def downgrade() -> None:
+    op.rename_table('health_assessments', 'health_assessments_partitioned')
+    op.execute('ALTER TABLE health_assessments_partitioned RENAME CONSTRAINT health_assessments_pkey TO health_assessments_partitioned_pkey')
+    _health_assessments_table('health_assessments',
+        primary_key=sa.PrimaryKeyConstraint('id', name='health_assessments_pkey'),
+        created_at_nullable=True)
+    op.create_index(op.f('ix_health_assessments_id'), 'health_assessments', ['id'], unique=False)
+    op.execute(f'INSERT INTO health_assessments ({COPY_COLUMNS}) SELECT {COPY_COLUMNS} FROM health_assessments_partitioned')
+    op.execute('ALTER SEQUENCE health_assessments_id_seq OWNED BY health_assessments.id')
+    op.drop_table('health_assessments_partitioned')
+    op.create_foreign_key('diabetes_records_health_assessment_id_fkey', 'diabetes_records', 'health_assessments', ['health_assessment_id'], ['id'])
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_diabetes_records_dataset', table_name='diabetes_records', postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""health assessment status
+
+Revision ID: b3f8d1e6c2a9
+Revises: 7a4c2e9d1f53
+Create Date: 2026-10-19 22:14:37.508112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8d1e6c2a9'
+down_revision: Union[str, None] = '7a4c2e9d1f53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    assessmentstatus = sa.Enum('PENDING_ENRICHMENT', 'COMPLETE', name='assessmentstatus')
+    assessmentstatus.create(op.get_bind(), checkfirst=False)
+    # A constant default is stored in the catalog, so existing rows are not rewritten
+    op.add_column('health_assessments', sa.Column('status', assessmentstatus, server_default='COMPLETE', nullable=False))
+    op.alter_column('health_assessments', 'recommendations',
+               existing_type=sa.JSON(),
+               nullable=True)
+
+
+def downgrade() -> None:
+    # Unenriched assessments get empty recommendations to satisfy NOT NULL
+    op.execute(
+        "UPDATE health_assessments SET recommendations = "
+        "'{\"risk_assessment\": \"\", \"recommendations\": [], \"preventive_measures\": []}' "
+        "WHERE recommendations IS NULL"
+    )
+    op.alter_column('health_assessments', 'recommendations',
+               existing_type=sa.JSON(),
+               nullable=False)
+    op.drop_column('health_assessments', 'status')
+    sa.Enum(name='assessmentstatus').drop(op.get_bind(), checkfirst=False)
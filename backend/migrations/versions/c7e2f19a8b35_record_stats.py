@@ -0,0 +1,126 @@
+"""record_stats
+
+Revision ID: c7e2f19a8b35
+Revises: a41d7c3e9f62
+Create Date: 2026-10-19 15:40:12.873902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2f19a8b35'
+down_revision: Union[str, None] = 'a41d7c3e9f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RECORD_STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_stats_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM record_stats;
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO record_stats (source, feature, shard, count, sum, sum_squares)
+        SELECT r.source, f.feature, pg_backend_pid() % 16,
+               -count(f.value), -coalesce(sum(f.value), 0),
+               -coalesce(sum(f.value * f.value), 0)
+        FROM old_rows r
+        CROSS JOIN LATERAL (VALUES ('*', 1::numeric), ('pregnancies', r.pregnancies::numeric), ('glucose', r.glucose::numeric), ('blood_pressure', r.blood_pressure::numeric), ('skin_thickness', r.skin_thickness::numeric), ('insulin', r.insulin::numeric), ('bmi', r.bmi::numeric), ('diabetes_pedigree', r.diabetes_pedigree::numeric), ('age', r.age::numeric), ('outcome', r.outcome::int::numeric)) AS f(feature, value)
+        GROUP BY r.source, f.feature
+        -- Lock rows in a fixed order so concurrent statements cannot deadlock
+        ORDER BY r.source, f.feature
+        ON CONFLICT (source, feature, shard) DO UPDATE SET
+            count = record_stats.count + excluded.count,
+            sum = record_stats.sum + excluded.sum,
+            sum_squares = record_stats.sum_squares + excluded.sum_squares;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO record_stats (source, feature, shard, count, sum, sum_squares)
+        SELECT r.source, f.feature, pg_backend_pid() % 16,
+               count(f.value), coalesce(sum(f.value), 0),
+               coalesce(sum(f.value * f.value), 0)
+        FROM new_rows r
+        CROSS JOIN LATERAL (VALUES ('*', 1::numeric), ('pregnancies', r.pregnancies::numeric), ('glucose', r.glucose::numeric), ('blood_pressure', r.blood_pressure::numeric), ('skin_thickness', r.skin_thickness::numeric), ('insulin', r.insulin::numeric), ('bmi', r.bmi::numeric), ('diabetes_pedigree', r.diabetes_pedigree::numeric), ('age', r.age::numeric), ('outcome', r.outcome::int::numeric)) AS f(feature, value)
+        GROUP BY r.source, f.feature
+        -- Lock rows in a fixed order so concurrent statements cannot deadlock
+        ORDER BY r.source, f.feature
+        ON CONFLICT (source, feature, shard) DO UPDATE SET
+            count = record_stats.count + excluded.count,
+            sum = record_stats.sum + excluded.sum,
+            sum_squares = record_stats.sum_squares + excluded.sum_squares;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+RECORD_STATS_TRIGGERS = [
+    """
+CREATE OR REPLACE TRIGGER record_stats_insert AFTER INSERT ON diabetes_records
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION record_stats_apply()
+    """,
+    """
+CREATE OR REPLACE TRIGGER record_stats_update AFTER UPDATE ON diabetes_records
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION record_stats_apply()
+    """,
+    """
+CREATE OR REPLACE TRIGGER record_stats_delete AFTER DELETE ON diabetes_records
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION record_stats_apply()
+    """,
+    """
+CREATE OR REPLACE TRIGGER record_stats_truncate AFTER TRUNCATE ON diabetes_records
+FOR EACH STATEMENT EXECUTE FUNCTION record_stats_apply()
+    """,
+]
+
+BACKFILL_RECORD_STATS = """
+INSERT INTO record_stats (source, feature, shard, count, sum, sum_squares)
+SELECT CAST(source AS datasource), feature, 0, count, sum, sum_squares FROM (
+SELECT r.source::text AS source, f.feature, count(f.value) AS count,
+       coalesce(sum(f.value), 0) AS sum,
+       coalesce(sum(f.value * f.value), 0) AS sum_squares
+FROM diabetes_records r
+CROSS JOIN LATERAL (VALUES ('*', 1::numeric),
+    ('pregnancies', r.pregnancies::numeric), ('glucose', r.glucose::numeric), ('blood_pressure', r.blood_pressure::numeric), ('skin_thickness', r.skin_thickness::numeric), ('insulin', r.insulin::numeric), ('bmi', r.bmi::numeric), ('diabetes_pedigree', r.diabetes_pedigree::numeric), ('age', r.age::numeric),
+    ('outcome', r.outcome::int::numeric)) AS f(feature, value)
+GROUP BY r.source, f.feature
+) AS recomputed
+"""
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('record_stats',
+    sa.Column('source', postgresql.ENUM('DATASET', 'USER_ENTRY', name='datasource', create_type=False), nullable=False),
+    sa.Column('feature', sa.String(), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('sum', sa.Numeric(), server_default='0', nullable=False),
+    sa.Column('sum_squares', sa.Numeric(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('source', 'feature', 'shard')
+    )
+    # ### end Alembic commands ###
+    op.execute(RECORD_STATS_FUNCTION)
+    for trigger in RECORD_STATS_TRIGGERS:
+        op.execute(trigger)
+    # The triggers hold off writers until commit, so nothing is missed or
+    # counted twice between creating them and the backfill
+    op.execute(BACKFILL_RECORD_STATS)
+
+
+def downgrade() -> None:
+    for trigger in ('record_stats_truncate', 'record_stats_delete', 'record_stats_update', 'record_stats_insert'):
+        op.execute(f'DROP TRIGGER {trigger} ON diabetes_records')
+    op.execute('DROP FUNCTION record_stats_apply()')
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('record_stats')
+    # ### end Alembic commands ###
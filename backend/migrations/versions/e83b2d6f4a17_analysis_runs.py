@@ -0,0 +1,41 @@
+"""analysis_runs
+
+Revision ID: e83b2d6f4a17
+Revises: c7e2f19a8b35
+Create Date: 2026-10-19 17:05:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b2d6f4a17'
+down_revision: Union[str, None] = 'c7e2f19a8b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('analysis_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('watermark', sa.Integer(), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('positive_cases', sa.Integer(), nullable=False),
+    sa.Column('anomalies', sa.JSON(), nullable=False, comment='Outliers per feature'),
+    sa.Column('total_records', sa.Integer(), nullable=False),
+    sa.Column('total_positive_cases', sa.Integer(), nullable=False),
+    sa.Column('total_glucose', sa.Numeric(), nullable=False),
+    sa.Column('total_bmi', sa.Numeric(), nullable=False),
+    sa.Column('total_age', sa.Numeric(), nullable=False),
+    sa.Column('positive_rate', sa.Float(), nullable=False, comment='Fraction, 0-1'),
+    sa.Column('threshold_crossed', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('analysis_runs')
@@ -0,0 +1,39 @@
+"""anomaly_flags
+
+Revision ID: f2a9c4e61b08
+Revises: e83b2d6f4a17
+Create Date: 2026-10-19 18:12:47.630152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c4e61b08'
+down_revision: Union[str, None] = 'e83b2d6f4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('anomaly_flags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('diabetes_record_id', sa.Integer(), nullable=False),
+    sa.Column('feature', sa.String(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('zscore', sa.Float(), nullable=True, comment='Null when the feature is constant'),
+    sa.Column('lower_fence', sa.Float(), nullable=False),
+    sa.Column('upper_fence', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['diabetes_record_id'], ['diabetes_records.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_anomaly_flags_diabetes_record_id', 'anomaly_flags', ['diabetes_record_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_anomaly_flags_diabetes_record_id', table_name='anomaly_flags')
+    op.drop_table('anomaly_flags')
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks of the backend's hot paths, optionally across git revisions.
+
+Times one call of each hot function, repeated until a sample takes
+--min-time, and reports the median of --repeat samples per call:
+
+    risk_score          HealthService._calculate_risk_score (model fitted)
+    risk_level          HealthService._determine_risk_level, over 100 scores
+    make_hashable       LLMService._make_hashable on the assessment's data
+    completion_parser   LLMService.get_analysis_recommendations, the client
+                        stubbed: prompt building and completion parsing
+    html_content        NotificationService._create_html_content
+    record_schema       DiabetesRecord schema validated from a model
+                        instance and dumped to JSON
+    load_dataset        load_dataset_to_db of a 768-row CSV, rolled back
+                        (needs the database)
+
+    python scripts/bench_hot_paths.py
+    python scripts/bench_hot_paths.py risk_score html_content --json
+
+With --compare the suite runs --rounds times against each revision's code
+(checked out in a temporary git worktree; the working tree when no
+target is given), alternating between them, and flags every benchmark
+whose fastest sample is more than --threshold slower, exiting 1 if any
+is, so it can gate CI:
+
+    python scripts/bench_hot_paths.py --compare main
+    python scripts/bench_hot_paths.py --compare v1.2 HEAD --threshold 0.2
+
+The benchmarks come from this file whichever revision is measured.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# A benchmark is a generator: set up, yield the call to time, clean up
+BENCHMARKS: Dict[str, Callable[[], Iterator[Callable[[], Any]]]] = {}
+NEEDS_DATABASE = {"load_dataset"}
+
+# Shaped like the provider's answers the parser has to clean up
+COMPLETION = """1. **Risk Assessment:**
+Your glucose and BMI put you at a **moderate** risk of developing diabetes. \
+Acting on them now can lower it considerably.
+
+2. **Key Recommendations:**
+- **Walk** for 30 minutes on most days of the week.
+- Replace sugary drinks with water or unsweetened tea.
+- Book a fasting glucose test within the next three months.
+* Add a portion of vegetables to lunch and dinner.
+
+3. **Preventive Measures:**
+- Keep a regular sleep schedule of seven to eight hours.
+- Weigh yourself once a week at the same time of day.
+- Take the stairs instead of the lift where you can.
+
+Stay positive: small, steady changes add up."""
+
+
+def benchmark(name: str) -> Callable:
+    def register(setup: Callable[[], Iterator[Callable[[], Any]]]) -> Callable:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def _record(**overrides: Any) -> Any:
+    """A diabetes record model instance with typical values."""
+    from app.models.diabetes import DataSource, DiabetesRecord
+
+    values = {
+        "id": 1,
+        "user_id": 1,
+        "pregnancies": 2,
+        "glucose": 148,
+        "blood_pressure": 72,
+        "skin_thickness": 35,
+        "insulin": 0,
+        "bmi": 33.6,
+        "diabetes_pedigree": 0.627,
+        "age": 50,
+        "outcome": None,
+        "source": DataSource.USER_ENTRY,
+        "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "updated_at": None,
+    }
+    return DiabetesRecord(**{**values, **overrides})
+
+
+def _dataset_rows(count: int) -> List[List[Any]]:
+    """Random rows shaped like the Pima dataset, outcome last."""
+    rng = random.Random(0)
+    return [
+        [
+            rng.randint(0, 10),
+            rng.randint(70, 200),
+            rng.randint(50, 100),
+            rng.randint(10, 50),
+            rng.randint(0, 300),
+            round(rng.uniform(18, 45), 1),
+            round(rng.uniform(0.1, 2.5), 3),
+            rng.randint(21, 80),
+            rng.randint(0, 1),
+        ]
+        for _ in range(count)
+    ]
+
+
+@benchmark("risk_score")
+def bench_risk_score() -> Iterator[Callable[[], Any]]:
+    import pandas as pd
+    from app.services.health import HealthService
+    from sklearn.ensemble import RandomForestClassifier
+
+    columns = [
+        "pregnancies",
+        "glucose",
+        "blood_pressure",
+        "skin_thickness",
+        "insulin",
+        "bmi",
+        "diabetes_pedigree",
+        "age",
+    ]
+    data = pd.DataFrame(_dataset_rows(768), columns=columns + ["outcome"])
+    # As the service trains it
+    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model.fit(data[columns], data["outcome"])
+
+    service = HealthService(None)
+    service.model = model
+    record = _record()
+    yield lambda: service._calculate_risk_score(record)
+
+
+@benchmark("risk_level")
+def bench_risk_level() -> Iterator[Callable[[], Any]]:
+    from app.services.health import HealthService
+
+    service = HealthService(None)
+    scores = [i / 100 for i in range(100)]
+    yield lambda: [service._determine_risk_level(score) for score in scores]
+
+
+def _assessment_data() -> Dict[str, Any]:
+    """What an assessment asks the LLM about."""
+    return {
+        "total_records": 1,
+        "positive_cases": 0,
+        "positive_rate": 0,
+        "avg_glucose": 148.0,
+        "avg_bmi": 33.6,
+        "avg_age": 50.0,
+    }
+
+
+@benchmark("make_hashable")
+def bench_make_hashable() -> Iterator[Callable[[], Any]]:
+    from app.services.llm import LLMService
+
+    service = LLMService()
+    data = _assessment_data()
+    yield lambda: service._make_hashable(data)
+
+
+@benchmark("completion_parser")
+def bench_completion_parser() -> Iterator[Callable[[], Any]]:
+    from app.services.llm import LLMService
+
+    completion = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=COMPLETION))]
+    )
+    service = LLMService()
+    service.client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(create=lambda **kwargs: completion)
+        )
+    )
+    service._rate_limit = lambda: None
+    data = service._make_hashable(_assessment_data())
+    # Past the lru_cache, which would otherwise answer every call after the first
+    generate = LLMService.get_analysis_recommendations.__wrapped__
+    yield lambda: generate(service, data)
+
+
+@benchmark("html_content")
+def bench_html_content() -> Iterator[Callable[[], Any]]:
+    from app.services.notification import NotificationService
+
+    service = NotificationService()
+    data = {
+        "risk_level": "MEDIUM",
+        "risk_assessment": "Your glucose and BMI put you at a moderate risk.",
+        "recommendations": [f"Recommendation number {i}." for i in range(5)],
+        "preventive_measures": [f"Preventive measure number {i}." for i in range(5)],
+        "dashboard_url": "http://localhost:80/dashboard?assessment_id=1",
+    }
+    yield lambda: service._create_html_content(data)
+
+
+@benchmark("record_schema")
+def bench_record_schema() -> Iterator[Callable[[], Any]]:
+    from app.schemas.diabetes import DiabetesRecord as DiabetesRecordSchema
+
+    record = _record()
+    yield lambda: DiabetesRecordSchema.model_validate(record).model_dump_json()
+
+
+@benchmark("load_dataset")
+def bench_load_dataset() -> Iterator[Callable[[], Any]]:
+    from app.core import database, load_data
+    from sqlalchemy.orm import Session
+
+    header = (
+        "Pregnancies,Glucose,BloodPressure,SkinThickness,Insulin,BMI,"
+        "DiabetesPedigreeFunction,Age,Outcome"
+    )
+    rows = "".join(",".join(map(str, row)) + "\n" for row in _dataset_rows(768))
+    cwd = os.getcwd()
+    engine = database.engine
+    session_factory = load_data.SessionLocal
+    with tempfile.TemporaryDirectory() as directory:
+        # DatasetManager reads data/ under the working directory
+        (Path(directory) / "data").mkdir()
+        (Path(directory) / "data" / "diabetes.csv").write_text(f"{header}\n{rows}")
+        os.chdir(directory)
+
+        def load() -> None:
+            with engine.connect() as connection:
+                transaction = connection.begin()
+                # Its commit releases a savepoint; the rollback undoes the load
+                load_data.SessionLocal = lambda: Session(
+                    bind=connection, join_transaction_mode="create_savepoint"
+                )
+                with contextlib.redirect_stdout(io.StringIO()):
+                    load_data.load_dataset_to_db()
+                transaction.rollback()
+
+        try:
+            yield load
+        finally:
+            load_data.SessionLocal = session_factory
+            os.chdir(cwd)
+
+
+def _timed(call: Callable[[], Any], loops: int) -> float:
+    """Seconds for loops calls, with the collector off as timeit does."""
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            call()
+        return time.perf_counter() - started
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def measure(call: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Seconds per call: median and spread of the samples."""
+    # Also warms caches and lazy imports before the samples
+    loops = 1
+    while True:
+        elapsed = _timed(call, loops)
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    samples = [_timed(call, loops) / loops for _ in range(repeat)]
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "stdev": statistics.stdev(samples) if repeat > 1 else 0.0,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def run_suite(names: List[str], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Results by benchmark; a benchmark that fails reports its error."""
+    results: Dict[str, Any] = {}
+    for name in names:
+        try:
+            with contextlib.contextmanager(BENCHMARKS[name])() as call:
+                results[name] = measure(call, repeat, min_time)
+        except Exception as e:
+            # e.g. the revision measured lacks the function, or no database
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"{name}: {results[name]['error']}", file=sys.stderr)
+    return results
+
+
+def _git(*args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+@contextlib.contextmanager
+def checkout(revision: Optional[str]) -> Iterator[Path]:
+    """The backend directory of a revision in a temporary worktree, or this one."""
+    if revision is None:
+        yield BACKEND_DIR
+        return
+    prefix = _git("rev-parse", "--show-prefix")
+    with tempfile.TemporaryDirectory() as directory:
+        worktree = Path(directory) / "tree"
+        _git("worktree", "add", "--detach", str(worktree), revision)
+        try:
+            yield worktree / prefix
+        finally:
+            _git("worktree", "remove", "--force", str(worktree))
+
+
+def run_source(source: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    """The suite's results against the code in a backend directory."""
+    output = subprocess.run(
+        [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            *args.benchmarks,
+            "--json",
+            "--repeat",
+            str(args.repeat),
+            "--min-time",
+            str(args.min_time),
+            "--source",
+            str(source),
+        ],
+        # The same .env and settings whichever code is measured
+        cwd=BACKEND_DIR,
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def best(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Each benchmark's fastest result over the runs, or its error."""
+    results: Dict[str, Any] = {}
+    for run in runs:
+        for name, result in run.items():
+            kept = results.get(name)
+            if kept is None or "error" in result:
+                results[name] = result
+            elif "error" not in kept and result["min"] < kept["min"]:
+                results[name] = result
+    return results
+
+
+def compare(
+    base: Dict[str, Any], target: Dict[str, Any], threshold: float
+) -> Dict[str, Any]:
+    """Change of each benchmark's fastest sample, flagged beyond the threshold.
+
+    The fastest sample is the one least disturbed by the rest of the
+    machine, so it is what the code itself costs.
+    """
+    changes = {}
+    for name in sorted(set(base) | set(target)):
+        before, after = base.get(name, {}), target.get(name, {})
+        if "min" not in before or "min" not in after:
+            changes[name] = {"verdict": "missing", "base": before, "target": after}
+            continue
+        change = after["min"] / before["min"] - 1
+        if change > threshold:
+            verdict = "regression"
+        elif change < -threshold:
+            verdict = "improvement"
+        else:
+            verdict = "unchanged"
+        changes[name] = {
+            "base": before["min"],
+            "target": after["min"],
+            "change": change,
+            "verdict": verdict,
+        }
+    return changes
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return f"{seconds * scale:.2f}{unit}"
+    return f"{seconds * 1e9:.0f}ns"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]),
+    )
+    parser.add_argument(
+        "benchmarks", nargs="*", default=list(BENCHMARKS), metavar="benchmark"
+    )
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds a sample")
+    parser.add_argument("--skip-db", action="store_true", help="skip load_dataset")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument(
+        "--compare", nargs="+", metavar="REVISION", help="base [target] revisions"
+    )
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--rounds", type=int, default=4, help="runs per revision")
+    parser.add_argument(
+        "--source", type=Path, default=BACKEND_DIR, help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(
+            f"unknown benchmarks {sorted(unknown)}, expected {list(BENCHMARKS)}"
+        )
+    if args.skip_db:
+        args.benchmarks = [
+            name for name in args.benchmarks if name not in NEEDS_DATABASE
+        ]
+
+    if args.compare:
+        if len(args.compare) > 2:
+            parser.error("--compare takes a base and at most one target revision")
+        base, target = (args.compare + [None])[:2]
+        runs: Dict[str, List[Dict[str, Any]]] = {"base": [], "target": []}
+        with checkout(base) as base_source, checkout(target) as target_source:
+            for round_ in range(args.rounds):
+                order = [("base", base_source), ("target", target_source)]
+                # Alternating which goes first cancels out the machine's drift
+                if round_ % 2:
+                    order.reverse()
+                for side, source in order:
+                    runs[side].append(run_source(source, args))
+        changes = compare(best(runs["base"]), best(runs["target"]), args.threshold)
+        if args.json:
+            print(json.dumps(changes, indent=2))
+        else:
+            print(
+                f"{'benchmark':<20}{base:>12}{target or 'worktree':>12}{'change':>10}"
+            )
+            for name, change in changes.items():
+                if change["verdict"] == "missing":
+                    print(f"{name:<20}{'missing in one revision':>34}")
+                    continue
+                print(
+                    f"{name:<20}{_format_seconds(change['base']):>12}"
+                    f"{_format_seconds(change['target']):>12}"
+                    f"{change['change']:>+10.1%}  {change['verdict']}"
+                )
+        if any(change["verdict"] == "regression" for change in changes.values()):
+            sys.exit(1)
+        return
+
+    # The code measured: this tree's, or a revision's worktree when comparing
+    sys.path.insert(0, str(args.source))
+    results = run_suite(args.benchmarks, args.repeat, args.min_time)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'benchmark':<20}{'per call':>12}{'stdev':>9}{'loops':>10}")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<20}  {result['error']}")
+            continue
+        spread = result["stdev"] / result["median"]
+        print(
+            f"{name:<20}{_format_seconds(result['median']):>12}"
+            f"{spread:>9.1%}{result['loops']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
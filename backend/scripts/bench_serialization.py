@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Compare the response_model serialization path with the orjson row path.
+
+Builds synthetic diabetes record rows and times turning them into a JSON
+body four ways:
+
+    response_model  validate into the record schema and render, as FastAPI
+                    does for an endpoint declaring response_model
+    jsonable        jsonable_encoder + JSONResponse (the old listing path)
+    orjson          row tuples straight to bytes (encode_rows)
+    orjson_stream   the export's chunked stream (stream_json_array)
+
+No database is needed; only encoding is measured, e.g.:
+
+    python scripts/bench_serialization.py --rows 10000 100000 --repeat 5
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.core.serialization import encode_rows, stream_json_array
+from app.models.diabetes import DataSource
+from app.schemas.diabetes import DiabetesRecord as DiabetesRecordSchema
+from app.services.records import LISTABLE_COLUMNS
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+settings = get_settings()
+
+KEYS = list(LISTABLE_COLUMNS)
+
+
+def _rows(count: int) -> List[Tuple[Any, ...]]:
+    """Random but valid record rows, in LISTABLE_COLUMNS order."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    values = {
+        "id": lambda i: i + 1,
+        "user_id": lambda i: random.choice([None, random.randint(1, 1000)]),
+        "pregnancies": lambda i: random.randint(0, 10),
+        "glucose": lambda i: random.randint(70, 200),
+        "blood_pressure": lambda i: random.randint(50, 100),
+        "skin_thickness": lambda i: random.randint(10, 50),
+        "insulin": lambda i: random.randint(0, 300),
+        "bmi": lambda i: round(random.uniform(18, 45), 1),
+        "diabetes_pedigree": lambda i: round(random.uniform(0.1, 2.5), 3),
+        "age": lambda i: random.randint(21, 80),
+        "outcome": lambda i: random.choice([True, False, None]),
+        "source": lambda i: random.choice(list(DataSource)),
+        "created_at": lambda i: start + timedelta(seconds=i),
+        "updated_at": lambda i: None,
+    }
+    return [tuple(values[key](i) for key in KEYS) for i in range(count)]
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    """Median seconds over the runs, and the body size."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(body)
+
+
+def bench(count: int, repeat: int) -> Dict[str, Tuple[float, int]]:
+    """Time each path over the same rows."""
+    rows = _rows(count)
+    field = create_response_field(
+        name="Response_list", type_=List[DiabetesRecordSchema]
+    )
+
+    def response_model() -> bytes:
+        dicts = [dict(zip(KEYS, row)) for row in rows]
+        content = asyncio.run(serialize_response(field=field, response_content=dicts))
+        return JSONResponse(content).body
+
+    def jsonable() -> bytes:
+        dicts = [dict(zip(KEYS, row)) for row in rows]
+        return JSONResponse(jsonable_encoder(dicts)).body
+
+    def orjson_rows() -> bytes:
+        return encode_rows(KEYS, rows)
+
+    def orjson_stream() -> bytes:
+        async def chunks():
+            size = settings.EXPORT_CHUNK_SIZE
+            for start in range(0, count, size):
+                end = start + size
+                yield rows[start:end]
+
+        async def collect() -> bytes:
+            return b"".join([part async for part in stream_json_array(KEYS, chunks())])
+
+        return asyncio.run(collect())
+
+    return {
+        name: _time(fn, repeat)
+        for name, fn in [
+            ("response_model", response_model),
+            ("jsonable", jsonable),
+            ("orjson", orjson_rows),
+            ("orjson_stream", orjson_stream),
+        ]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    for count in args.rows:
+        results = bench(count, args.repeat)
+        baseline = results["response_model"][0]
+        print(f"\n{count:,} rows (median of {args.repeat})")
+        print(f"{'path':<16}{'seconds':>10}{'rows/s':>14}{'MB':>8}{'speedup':>10}")
+        for name, (seconds, size) in results.items():
+            print(
+                f"{name:<16}{seconds:>10.3f}{count / seconds:>14,.0f}"
+                f"{size / 1e6:>8.1f}{baseline / seconds:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
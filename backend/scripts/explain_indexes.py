@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""EXPLAIN ANALYZE the hot queries with and without their indexes.
+
+Each query is explained as-is, then again inside a transaction that drops
+the index(es) serving it and is rolled back, so the schema is unchanged
+afterwards. DROP INDEX takes an exclusive lock for the duration: run this
+against a scratch database migrated to head, never production.
+
+Seed the database first (10M diabetes records, 10M assessments spread over
+the last year) and compare plans:
+
+    python scripts/explain_indexes.py --seed 10000000
+    python scripts/explain_indexes.py --verbose
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.database import engine
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARTITION = re.compile(r"_(\d{4}_\d{2}|default)(?!\d)")
+
+# name -> (query, indexes dropped for the "without" plan)
+QUERIES: Dict[str, Dict[str, Any]] = {
+    "train_model": {
+        "sql": (
+            "SELECT pregnancies, glucose, blood_pressure, skin_thickness, insulin, "
+            "bmi, diabetes_pedigree, age, outcome FROM diabetes_records "
+            "WHERE source = 'DATASET'"
+        ),
+        "drop": [
+            "ix_diabetes_records_dataset",
+            "ix_diabetes_records_source_created_at_id",
+        ],
+    },
+    "user_by_email": {
+        "sql": "SELECT * FROM users WHERE email = 'bench-4242@example.com'",
+        "drop_constraints": [("users", "users_email_key")],
+    },
+    "user_assessments": {
+        "sql": (
+            "SELECT * FROM health_assessments WHERE user_id = "
+            "(SELECT min(id) + 42 FROM users) ORDER BY created_at DESC LIMIT 20"
+        ),
+        "drop": ["ix_health_assessments_user_id_created_at"],
+    },
+    "record_assessments": {
+        "sql": (
+            "SELECT * FROM health_assessments WHERE diabetes_record_id = "
+            "(SELECT max(id) - 42 FROM diabetes_records)"
+        ),
+        "drop": ["ix_health_assessments_diabetes_record_id"],
+    },
+    # Partition pruning: only the current month's partition should be scanned
+    "recent_assessments": {
+        "sql": (
+            "SELECT risk_level, count(*) FROM health_assessments "
+            "WHERE created_at >= date_trunc('month', now()) GROUP BY risk_level"
+        ),
+    },
+}
+
+
+def seed(connection: Connection, rows: int) -> None:
+    """Generate `rows` records and assessments server-side."""
+    users = max(rows // 100, 1)
+    print(f"Seeding {users} users, {rows} records and {rows} assessments...")
+    start = time.perf_counter()
+
+    connection.execute(
+        text(
+            "INSERT INTO users (name, surname, email) "
+            "SELECT 'Bench', 'User', 'bench-' || g || '@example.com' "
+            "FROM generate_series(1, :users) g"
+        ),
+        {"users": users},
+    )
+    first_user = connection.execute(
+        text("SELECT min(id) FROM users WHERE email LIKE 'bench-%'")
+    ).scalar()
+
+    # ~10% dataset rows, the rest user entries
+    connection.execute(
+        text(
+            "INSERT INTO diabetes_records (user_id, pregnancies, glucose, "
+            "blood_pressure, skin_thickness, insulin, bmi, diabetes_pedigree, "
+            "age, outcome, source, created_at) "
+            "SELECT :first_user + g % :users, g % 10, 70 + g % 130, 50 + g % 50, "
+            "10 + g % 40, g % 300, 18 + (g % 270) / 10.0, (g % 200) / 100.0, "
+            "21 + g % 60, g % 3 = 0, "
+            "CASE WHEN g % 10 = 0 THEN 'DATASET' ELSE 'USER_ENTRY' END::datasource, "
+            "now() - (g % 525600) * interval '1 minute' "
+            "FROM generate_series(1, :rows) g"
+        ),
+        {"first_user": first_user, "users": users, "rows": rows},
+    )
+    first_record = connection.execute(
+        text("SELECT max(id) - :rows + 1 FROM diabetes_records"), {"rows": rows}
+    ).scalar()
+
+    connection.execute(
+        text(
+            "INSERT INTO health_assessments (user_id, diabetes_record_id, "
+            "risk_score, risk_level, recommendations, created_at) "
+            "SELECT :first_user + g % :users, :first_record + g - 1, "
+            "(g % 100) / 100.0, (ARRAY['low', 'medium', 'high'])[1 + g % 3], "
+            "'[]', now() - (g % 525600) * interval '1 minute' "
+            "FROM generate_series(1, :rows) g"
+        ),
+        {
+            "first_user": first_user,
+            "first_record": first_record,
+            "users": users,
+            "rows": rows,
+        },
+    )
+    connection.commit()
+    connection.execute(text("ANALYZE users, diabetes_records, health_assessments"))
+    connection.commit()
+    print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+
+def _nodes(plan: Dict[str, Any]) -> List[str]:
+    """Flatten a JSON plan into 'Node Type on relation (index)' strings."""
+    label = plan["Node Type"]
+    if "Index Name" in plan:
+        label += f" using {plan['Index Name']}"
+    elif "Relation Name" in plan:
+        label += f" on {plan['Relation Name']}"
+    nodes = [label]
+    for child in plan.get("Plans", []):
+        nodes.extend(_nodes(child))
+    return nodes
+
+
+def explain(connection: Connection, sql: str) -> Dict[str, Any]:
+    """Run EXPLAIN ANALYZE and return the top-level JSON plan."""
+    result = connection.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+    ).scalar()
+    return (json.loads(result) if isinstance(result, str) else result)[0]
+
+
+def compare(connection: Connection, name: str, spec: Dict[str, Any]) -> Dict:
+    """Explain a query with its indexes, then without them (rolled back)."""
+    with_indexes = explain(connection, spec["sql"])
+    connection.rollback()
+
+    without: Optional[Dict[str, Any]] = None
+    if spec.get("drop") or spec.get("drop_constraints"):
+        for index in spec.get("drop", []):
+            connection.execute(text(f"DROP INDEX {index}"))
+        for table, constraint in spec.get("drop_constraints", []):
+            connection.execute(
+                text(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}")
+            )
+        without = explain(connection, spec["sql"])
+        connection.rollback()
+
+    return {"name": name, "with": with_indexes, "without": without}
+
+
+def _describe(label: str, explained: Dict[str, Any], verbose: bool) -> None:
+    plan = explained["Plan"]
+    print(
+        f"  {label:<8} {explained['Execution Time']:>10.2f} ms  "
+        f"shared hit/read={plan.get('Shared Hit Blocks', 0)}/"
+        f"{plan.get('Shared Read Blocks', 0)}"
+    )
+    nodes = _nodes(plan)
+    if not verbose:
+        # Scans are where the indexes (and partition pruning) show up;
+        # fold the per-partition scans together
+        scans = [PARTITION.sub("_*", node) for node in nodes if "Scan" in node]
+        nodes = [f"{node} x{scans.count(node)}" for node in dict.fromkeys(scans)]
+    for node in nodes:
+        print(f"             {node}")
+
+
+def main() -> None:
+    """Parse arguments, optionally seed, and print the plan comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0, help="rows to generate first")
+    parser.add_argument("--only", nargs="*", choices=sorted(QUERIES))
+    parser.add_argument("--verbose", action="store_true", help="print every node")
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        # Plans at 10M rows can run longer than the application's timeout
+        connection.execute(text("SET statement_timeout = 0"))
+        connection.commit()
+        if args.seed:
+            seed(connection, args.seed)
+
+        for name in args.only or QUERIES:
+            result = compare(connection, name, QUERIES[name])
+            print(f"\n{name}")
+            _describe("with", result["with"], args.verbose)
+            if result["without"]:
+                _describe("without", result["without"], args.verbose)
+                speedup = result["without"]["Execution Time"] / max(
+                    result["with"]["Execution Time"], 1e-3
+                )
+                print(f"  {speedup:.1f}x faster with indexes")
+
+
+if __name__ == "__main__":
+    main()
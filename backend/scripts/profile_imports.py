@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Profile how long importing the API (or any module) takes.
+
+Imports the module in a fresh interpreter with ``-X importtime`` and lists
+the slowest imports by cumulative time, e.g.:
+
+    python scripts/profile_imports.py --top 20
+    python scripts/profile_imports.py worker --budget 2.5
+
+With ``--budget`` the exit status is 1 when the import takes longer, or
+when it loads any module that should only be imported on first use (see
+LAZY_MODULES), so it can gate CI.
+"""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Slow to import and only needed by some requests, jobs or CLIs
+LAZY_MODULES = ("sklearn", "pandas", "scipy", "huggingface_hub", "kaggle")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def profile(module: str) -> Tuple[float, List[Tuple[str, float, float]], List[str]]:
+    """Import seconds, (name, self, cumulative seconds) per module, lazy ones loaded."""
+    check = (
+        f"import sys; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}; {check}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules: Dict[str, Tuple[float, float]] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            own, cumulative, name = match.groups()
+            modules[name] = (int(own) / 1e6, int(cumulative) / 1e6)
+
+    total = modules[module][1]
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    ranked = sorted(
+        ((name, own, cumulative) for name, (own, cumulative) in modules.items()),
+        key=lambda item: item[2],
+        reverse=True,
+    )
+    return total, ranked, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget", type=float, help="fail above this many seconds")
+    args = parser.parse_args()
+
+    total, ranked, loaded = profile(args.module)
+    print(f"{'module':<48}{'self s':>10}{'cumulative s':>14}")
+    for name, own, cumulative in ranked[: args.top]:
+        print(f"{name:<48}{own:>10.3f}{cumulative:>14.3f}")
+    print(f"\nimport {args.module}: {total:.3f}s")
+
+    if loaded:
+        print(f"Loaded at import, should be lazy: {', '.join(loaded)}")
+    if args.budget is None:
+        return
+    over = total > args.budget
+    if over:
+        print(f"Over the {args.budget:.2f}s budget")
+    if over or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
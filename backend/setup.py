@@ -7,6 +7,7 @@ setup(
     install_requires=[
         "fastapi>=0.109.0",
         "sqlalchemy>=2.0.0",
+        "asyncpg>=0.29.0",
         "pydantic>=2.0.0",
         "pydantic-settings>=2.0.0",
         "python-dotenv>=1.0.0",
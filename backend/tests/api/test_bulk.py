@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from app.models.diabetes import DiabetesRecord
+from app.models.job import AssessmentJob
+from app.models.user import User
+from sqlalchemy import func, select
+
+
+@pytest.fixture
+async def user(db_session):
+    """Create a test user."""
+    user = User(name="Clinic", surname="Partner", email="clinic@example.com")
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def test_bulk_csv(async_client, db_session, user, mocker):
+    """Test CSV upload with dataset headers, bad rows and unknown users."""
+    mocker.patch("app.services.ingest.settings.BULK_INGEST_CHUNK_SIZE", 2)
+    body = "\n".join(
+        [
+            "Pregnancies,Glucose,BloodPressure,SkinThickness,Insulin,BMI,"
+            "DiabetesPedigreeFunction,Age,Outcome,user_id",
+            f"6,148,72,35,0,33.6,0.627,50,1,{user.id}",
+            ",85,66,29,0,26.6,0.351,31,0,",
+            "8,-1,64,0,0,23.3,0.672,32,1,",
+            "1,89,66,23,94,28.1,0.167,21,0,999999",
+            "1,2,3",
+        ]
+    )
+    before = await db_session.scalar(select(func.count(DiabetesRecord.id)))
+
+    response = await async_client.post(
+        "/api/v1/diabetes/bulk",
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["received"] == 5
+    assert result["inserted"] == 2
+    assert result["failed"] == 3
+    assert result["assessments_enqueued"] == 0
+    assert {error["row"] for error in result["errors"]} == {3, 4, 5}
+    assert await db_session.scalar(select(func.count(DiabetesRecord.id))) == before + 2
+
+
+async def test_bulk_ndjson_enqueues_assessments(async_client, db_session, user):
+    """Test NDJSON upload queues assessments for rows with a user."""
+    row = {
+        "glucose": 120,
+        "blood_pressure": 70,
+        "skin_thickness": 20,
+        "insulin": 80,
+        "bmi": 28.5,
+        "diabetes_pedigree": 0.45,
+        "age": 40,
+    }
+    body = "\n".join(
+        [
+            json.dumps({**row, "user_id": user.id}),
+            json.dumps(row),
+            "{not json",
+        ]
+    )
+
+    response = await async_client.post(
+        "/api/v1/diabetes/bulk?enqueue_assessments=true",
+        content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == 2
+    assert result["assessments_enqueued"] == 1
+    assert result["errors"][0]["row"] == 3
+    jobs = await db_session.scalar(
+        select(func.count(AssessmentJob.id)).where(AssessmentJob.user_id == user.id)
+    )
+    assert jobs == 1
+
+
+async def test_bulk_rejects_unknown_content_type(async_client):
+    """Test uploads must be CSV or NDJSON."""
+    response = await async_client.post(
+        "/api/v1/diabetes/bulk",
+        content=b"<xml/>",
+        headers={"Content-Type": "application/xml"},
+    )
+    assert response.status_code == 415
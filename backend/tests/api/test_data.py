@@ -0,0 +1,142 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.models.diabetes import DataSource, DiabetesRecord
+from app.schemas.diabetes import DiabetesRecordFilter
+from app.services.records import RecordListService, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+async def many_records(db_session):
+    """Create records with distinct, increasing created_at values."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    records = [
+        DiabetesRecord(
+            glucose=80 + i * 10,
+            blood_pressure=70,
+            skin_thickness=20,
+            insulin=0,
+            bmi=20.0 + i,
+            diabetes_pedigree=0.5,
+            age=30 + i,
+            outcome=i % 2 == 0,
+            source=DataSource.DATASET if i < 5 else DataSource.USER_ENTRY,
+            created_at=start + timedelta(minutes=i),
+        )
+        for i in range(10)
+    ]
+    db_session.add_all(records)
+    await db_session.commit()
+    return records
+
+
+def test_cursor_round_trip():
+    """Test cursors decode to the position they encode."""
+    created_at = datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+async def test_list_records(async_client, sample_data):
+    """Test listing returns typed records."""
+    response = await async_client.get("/api/v1/data")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) > 0
+    assert all(isinstance(record["glucose"], int) for record in data)
+    assert all(isinstance(record["bmi"], float) for record in data)
+    assert all(isinstance(record["age"], int) for record in data)
+
+
+async def test_keyset_pagination(async_client, many_records):
+    """Test walking every page visits each record once, newest first."""
+    seen = []
+    params = {"limit": 3, "glucose_min": 80}
+    while True:
+        response = await async_client.get("/api/v1/data", params=params)
+        assert response.status_code == 200
+        seen.extend(record["id"] for record in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+    expected = [record.id for record in reversed(many_records)]
+    assert seen == expected
+
+
+async def test_filters_and_projection(async_client, many_records):
+    """Test source, outcome and range filters with a column projection."""
+    response = await async_client.get(
+        "/api/v1/data",
+        params={
+            "source": "dataset",
+            "outcome": True,
+            "glucose_min": 90,
+            "bmi_max": 24.0,
+            "fields": "glucose,bmi",
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [record["glucose"] for record in data] == [120, 100]
+    assert set(data[0]) == {"id", "created_at", "glucose", "bmi"}
+
+
+async def test_invalid_listing_params(async_client):
+    """Test unknown fields and malformed cursors are rejected."""
+    response = await async_client.get("/api/v1/data", params={"fields": "password"})
+    assert response.status_code == 400
+    response = await async_client.get("/api/v1/data", params={"cursor": "garbage"})
+    assert response.status_code == 400
+    response = await async_client.post("/api/v1/data")
+    assert response.status_code == 405
+
+
+async def test_export_matches_listing(async_client, many_records):
+    """Test the streamed export encodes records as the listing does."""
+    listing = await async_client.get("/api/v1/data", params={"glucose_min": 80})
+    response = await async_client.get("/api/v1/data/export", params={"glucose_min": 80})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "diabetes_records.json" in response.headers["content-disposition"]
+    # Oldest first, where the listing is newest first
+    assert response.json() == list(reversed(listing.json()))
+
+
+async def test_export_ndjson(async_client, many_records):
+    """Test NDJSON export with filters and a projection."""
+    response = await async_client.get(
+        "/api/v1/data/export",
+        params={"format": "ndjson", "source": "user_entry", "fields": "age"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["age"] for record in records] == [35, 36, 37, 38, 39]
+    assert set(records[0]) == {"id", "created_at", "age"}
+
+    response = await async_client.get(
+        "/api/v1/data/export", params={"source": "user_entry", "age_min": 100}
+    )
+    assert response.json() == []
+    response = await async_client.get(
+        "/api/v1/data/export", params={"fields": "password"}
+    )
+    assert response.status_code == 400
+
+
+async def test_export_reads_pages_in_short_transactions(db_session, many_records):
+    """Test each exported chunk is read in a transaction ended before it is sent."""
+    service = RecordListService(db_session)
+    columns = service.resolve_fields(["age"])
+    chunks = []
+    async for rows in service.stream_rows(
+        DiabetesRecordFilter(), columns, chunk_size=3
+    ):
+        assert not db_session.in_transaction()
+        chunks.append([row[columns.index("age")] for row in rows])
+    assert chunks == [[30, 31, 32], [33, 34, 35], [36, 37, 38], [39]]
@@ -0,0 +1,303 @@
+import asyncio
+import json
+
+import pytest
+from app.models.health import AssessmentStatus, HealthAssessment
+from app.models.job import AssessmentJob, JobStatus
+from app.models.user import User
+from app.services.assessment_status import assessment_waiters
+from app.services.jobs import JobQueue
+from sqlalchemy import select
+
+
+@pytest.fixture
+def record_payload():
+    """Diabetes record payload without the owning user."""
+    return {
+        "pregnancies": 2,
+        "glucose": 120,
+        "blood_pressure": 70,
+        "skin_thickness": 20,
+        "insulin": 80,
+        "bmi": 28.5,
+        "diabetes_pedigree": 0.45,
+        "age": 40,
+    }
+
+
+@pytest.fixture
+async def user(db_session):
+    """Create a test user."""
+    user = User(name="Grace", surname="Hopper", email="grace@example.com")
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def test_create_diabetes_record(async_client, db_session, user, record_payload):
+    """Test creating a record queues a health assessment job."""
+    response = await async_client.post(
+        "/api/v1/diabetes/", json={**record_payload, "user_id": user.id}
+    )
+
+    assert response.status_code == 200
+    record = response.json()
+    assert record["user_id"] == user.id
+    assert record["source"] == "user_entry"
+
+    jobs = (
+        await db_session.scalars(
+            select(AssessmentJob).where(
+                AssessmentJob.diabetes_record_id == record["id"]
+            )
+        )
+    ).all()
+    assert len(jobs) == 1
+    assert jobs[0].status == JobStatus.PENDING
+    assert jobs[0].user_id == user.id
+
+
+async def test_create_scored_diabetes_record(
+    async_client, db_session, user, record_payload, sample_data, monkeypatch, mocker
+):
+    """Test a record scored on creation is enriched by its job later."""
+    from app.services.health import HealthService, NotificationService, risk_model
+
+    monkeypatch.setattr(risk_model, "model", None)
+    await risk_model.load(db_session)
+    response = await async_client.post(
+        "/api/v1/diabetes/",
+        params={"score": True},
+        json={**record_payload, "user_id": user.id},
+    )
+    assert response.status_code == 200
+    record = response.json()
+    assessment = record["assessment"]
+    assert assessment["status"] == "pending_enrichment"
+    assert 0 <= assessment["risk_score"] <= 1
+    assert assessment["recommendations"] is None
+
+    # Scored but not enriched yet, so waiting callers are told to wait on
+    url = f"/api/v1/diabetes/{record['id']}/assessment"
+    response = await async_client.get(url)
+    assert response.status_code == 202
+
+    # What the worker does
+    recommendations = {
+        "risk_assessment": "Moderate risk",
+        "recommendations": ["Walk daily"],
+        "preventive_measures": ["Limit sugar"],
+    }
+    mocker.patch(
+        "app.services.health.get_llm_recommendations", return_value=recommendations
+    )
+    send = mocker.patch.object(NotificationService, "send_email")
+    enriched = await HealthService(db_session).assess_health(user.id, record["id"])
+    assert enriched.id == assessment["id"]
+    assert enriched.risk_score == assessment["risk_score"]
+    send.assert_awaited_once()
+
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    assert response.json()["status"] == "complete"
+    assert response.json()["recommendations"] == recommendations
+
+    # Unscored records leave the whole assessment to the job
+    response = await async_client.post(
+        "/api/v1/diabetes/", json={**record_payload, "user_id": user.id}
+    )
+    assert response.json()["assessment"] is None
+
+
+async def test_create_diabetes_record_unknown_user(async_client, record_payload):
+    """Test creating a record for a missing user."""
+    response = await async_client.post(
+        "/api/v1/diabetes/", json={**record_payload, "user_id": 999999}
+    )
+    assert response.status_code == 404
+
+
+async def test_get_health_assessment(async_client, db_session, user, sample_data):
+    """Test fetching a stored health assessment."""
+    assessment = HealthAssessment(
+        user_id=user.id,
+        diabetes_record_id=sample_data[0].id,
+        risk_score=0.8,
+        risk_level="high",
+        recommendations={
+            "risk_assessment": "High risk",
+            "recommendations": ["Monitor glucose"],
+            "preventive_measures": ["Exercise"],
+        },
+    )
+    db_session.add(assessment)
+    await db_session.commit()
+
+    response = await async_client.get(f"/api/v1/health/{assessment.id}")
+    assert response.status_code == 200
+    assert response.json()["risk_level"] == "high"
+
+    response = await async_client.get("/api/v1/health/999999")
+    assert response.status_code == 404
+
+
+@pytest.fixture
+async def queued_assessment(db_session, user, sample_data):
+    """Queue an assessment job for a record."""
+    record = sample_data[0]
+    job = await JobQueue(db_session).enqueue(user_id=user.id, record_id=record.id)
+    await db_session.commit()
+    return record, job
+
+
+def _assessment(user_id, record_id):
+    return HealthAssessment(
+        user_id=user_id,
+        diabetes_record_id=record_id,
+        risk_score=0.8,
+        risk_level="high",
+        recommendations={
+            "risk_assessment": "High risk",
+            "recommendations": ["Monitor glucose"],
+            "preventive_measures": ["Exercise"],
+        },
+    )
+
+
+async def test_get_record_assessment_waits(
+    async_client, db_session, user, queued_assessment
+):
+    """Test a waiting request returns as soon as the job is announced done."""
+    record, _ = queued_assessment
+    # Waiting ends the shared session's transaction, expiring these objects
+    user_id, record_id = user.id, record.id
+    url = f"/api/v1/diabetes/{record_id}/assessment"
+
+    response = await async_client.get(url)
+    assert response.status_code == 202
+    assert response.json() == {"status": "pending"}
+
+    request = asyncio.create_task(async_client.get(url, params={"wait": 30}))
+    while record_id not in assessment_waiters._events:
+        await asyncio.sleep(0.01)
+
+    # What the worker does, then the notification its commit would deliver
+    db_session.add(_assessment(user_id, record_id))
+    queue = JobQueue(db_session)
+    await queue.complete(await queue.claim("worker-1"))
+    await db_session.commit()
+    assessment_waiters.on_notify(str(record_id))
+
+    response = await asyncio.wait_for(request, timeout=5)
+    assert response.status_code == 200
+    assert response.json()["risk_level"] == "high"
+    assert not assessment_waiters._events
+
+
+async def test_get_record_assessment_failed_or_missing(
+    async_client, db_session, queued_assessment
+):
+    """Test failed jobs and records without a job are reported at once."""
+    record, job = queued_assessment
+    job.status = JobStatus.FAILED
+    job.attempts = 3
+    await db_session.commit()
+
+    response = await async_client.get(
+        f"/api/v1/diabetes/{record.id}/assessment", params={"wait": 30}
+    )
+    assert response.status_code == 409
+
+    response = await async_client.get(
+        "/api/v1/diabetes/999999/assessment", params={"wait": 30}
+    )
+    assert response.status_code == 404
+
+
+async def test_get_record_assessment_scored_job_failed(
+    async_client, db_session, user, queued_assessment
+):
+    """Test a scored record whose enrichment failed still returns its score."""
+    record, job = queued_assessment
+    assessment = _assessment(user.id, record.id)
+    assessment.status = AssessmentStatus.PENDING_ENRICHMENT
+    assessment.recommendations = None
+    db_session.add(assessment)
+    job.status = JobStatus.FAILED
+    job.attempts = 3
+    await db_session.commit()
+    record_id = record.id
+
+    response = await async_client.get(
+        f"/api/v1/diabetes/{record_id}/assessment", params={"wait": 30}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending_enrichment"
+    assert response.json()["risk_score"] == 0.8
+
+    response = await async_client.get(f"/api/v1/diabetes/{record_id}/assessment/events")
+    event, data = response.text.strip().split("\n")
+    assert event == "event: assessment"
+    assert json.loads(data.removeprefix("data: "))["status"] == "pending_enrichment"
+
+
+async def test_stream_record_assessment(
+    async_client, db_session, user, queued_assessment, monkeypatch
+):
+    """Test the event stream reports progress, then the assessment."""
+    from app.api.v1.endpoints.diabetes import settings
+
+    record, _ = queued_assessment
+    user_id, record_id = user.id, record.id
+    url = f"/api/v1/diabetes/{record_id}/assessment/events"
+
+    # A stream that runs out of time only reports the status
+    monkeypatch.setattr(settings, "ASSESSMENT_EVENTS_MAX_SECONDS", 0)
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == 'event: status\ndata: {"status": "pending"}\n\n'
+
+    db_session.add(_assessment(user_id, record_id))
+    queue = JobQueue(db_session)
+    await queue.complete(await queue.claim("worker-1"))
+    await db_session.commit()
+    response = await async_client.get(url)
+    event, data = response.text.strip().split("\n")
+    assert event == "event: assessment"
+    assert json.loads(data.removeprefix("data: "))["risk_level"] == "high"
+
+    response = await async_client.get("/api/v1/diabetes/999999/assessment/events")
+    assert response.status_code == 404
+
+
+async def test_create_diabetes_record_flags_anomalies(
+    async_client, db_session, user, record_payload, monkeypatch
+):
+    """Test an anomalous record is flagged and listed."""
+    from app.services import intake
+    from app.services.anomaly import AnomalyDetector, settings
+
+    monkeypatch.setattr(settings, "ANOMALY_MIN_OBSERVATIONS", 5)
+    detector = AnomalyDetector()
+    monkeypatch.setattr(intake, "anomaly_detector", detector)
+    for age in range(30, 40):
+        response = await async_client.post(
+            "/api/v1/diabetes/",
+            json={**record_payload, "age": age, "user_id": user.id},
+        )
+        assert response.status_code == 200
+    await detector.seed(db_session)
+
+    response = await async_client.post(
+        "/api/v1/diabetes/", json={**record_payload, "age": 95, "user_id": user.id}
+    )
+    record_id = response.json()["id"]
+
+    response = await async_client.get(
+        "/api/v1/stats/anomalies", params={"record_id": record_id}
+    )
+    assert response.status_code == 200
+    flags = response.json()
+    assert [flag["feature"] for flag in flags] == ["age"]
+    assert flags[0]["value"] == 95
@@ -1,10 +1,6 @@
 from unittest.mock import patch
 
 import pytest
-from fastapi.testclient import TestClient
-from main import app
-
-client = TestClient(app)
 
 
 @pytest.fixture
@@ -25,9 +21,9 @@ def mock_llm_response():
     }
 
 
-def test_get_data(db_session, sample_data):
+async def test_get_data(async_client, db_session, sample_data):
     """Test getting data endpoint."""
-    response = client.get("/api/v1/data")
+    response = await async_client.get("/api/v1/data")
     assert response.status_code == 200
     data = response.json()
     assert len(data) > 0  # Should return all records
@@ -36,12 +32,12 @@ def test_get_data(db_session, sample_data):
     assert all(isinstance(record["age"], int) for record in data)
 
 
-def test_analyze(db_session, sample_data, mock_llm_response):
+async def test_analyze(async_client, db_session, sample_data, mock_llm_response):
     """Test analyze endpoint."""
     with patch("app.services.llm.get_llm_recommendations") as mock_llm:
         mock_llm.return_value = mock_llm_response
 
-        response = client.get("/api/v1/analyze")
+        response = await async_client.get("/api/v1/analyze")
         assert response.status_code == 200
         analysis = response.json()
 
@@ -71,12 +67,12 @@ def test_analyze(db_session, sample_data, mock_llm_response):
         assert all(isinstance(arg, (int, float)) for arg in args)
 
 
-def test_insights(db_session, sample_data, mock_llm_response):
+async def test_insights(async_client, db_session, sample_data, mock_llm_response):
     """Test insights endpoint."""
     with patch("app.services.llm.get_llm_recommendations") as mock_llm:
         mock_llm.return_value = mock_llm_response
 
-        response = client.get("/api/v1/insights")
+        response = await async_client.get("/api/v1/insights")
         assert response.status_code == 200
         insights = response.json()
 
@@ -104,12 +100,12 @@ def test_insights(db_session, sample_data, mock_llm_response):
         assert all(isinstance(arg, (int, float)) for arg in args)
 
 
-def test_error_handling():
+async def test_error_handling(async_client):
     """Test error handling in endpoints."""
     # Test invalid endpoint
-    response = client.get("/api/v1/invalid")
+    response = await async_client.get("/api/v1/invalid")
     assert response.status_code == 404
 
     # Test invalid method
-    response = client.post("/api/v1/data")
+    response = await async_client.post("/api/v1/data")
     assert response.status_code == 405
@@ -0,0 +1,59 @@
+from app.models.job import AssessmentJob
+from sqlalchemy import select
+
+
+async def test_create_user(async_client):
+    """Test creating a new user."""
+    payload = {"name": "Ada", "surname": "Lovelace", "email": "ada@example.com"}
+    response = await async_client.post("/api/v1/users/", json=payload)
+    assert response.status_code == 200
+    user = response.json()
+    assert user["id"] > 0
+    assert user["email"] == payload["email"]
+
+
+async def test_create_existing_user(async_client):
+    """Test creating a user whose email is already registered."""
+    payload = {"name": "Ada", "surname": "Lovelace", "email": "ada@example.com"}
+    first = await async_client.post("/api/v1/users/", json=payload)
+    second = await async_client.post("/api/v1/users/", json=payload)
+    assert second.status_code == 409
+    assert second.json()["id"] == first.json()["id"]
+
+
+async def test_onboard_user(async_client, db_session):
+    """Test onboarding creates the user once and queues each record's assessment."""
+    payload = {
+        "user": {"name": "Ada", "surname": "Lovelace", "email": "ada@example.com"},
+        "record": {
+            "glucose": 120,
+            "blood_pressure": 70,
+            "skin_thickness": 20,
+            "insulin": 80,
+            "bmi": 28.5,
+            "diabetes_pedigree": 0.45,
+            "age": 40,
+        },
+    }
+    first = await async_client.post("/api/v1/users/onboard", json=payload)
+    assert first.status_code == 200
+    body = first.json()
+    assert body["user_created"] is True
+    assert body["record"]["user_id"] == body["user"]["id"]
+    assert body["record"]["source"] == "user_entry"
+    assert body["record"]["created_at"]
+
+    # A returning user keeps their details and gets another record
+    payload["user"]["name"] = "Augusta"
+    second = await async_client.post("/api/v1/users/onboard", json=payload)
+    body = second.json()
+    assert body["user_created"] is False
+    assert body["user"] == first.json()["user"]
+    assert body["record"]["id"] != first.json()["record"]["id"]
+
+    jobs = await db_session.scalars(
+        select(AssessmentJob.diabetes_record_id).where(
+            AssessmentJob.user_id == body["user"]["id"]
+        )
+    )
+    assert sorted(jobs) == [first.json()["record"]["id"], body["record"]["id"]]
@@ -1,6 +1,29 @@
+from contextlib import nullcontext
+
 import pytest
-from app.core.database import Base, SessionLocal, engine
-from app.models.diabetes import DiabetesRecord
+from app.core.cache import response_cache
+from app.core.config import get_settings
+from app.core.database import (
+    ASYNC_DATABASE_URL,
+    Base,
+    engine,
+    get_connection_factory,
+    get_session,
+    get_session_factory,
+)
+from app.core.instrumentation import instrument_queries
+from app.models.diabetes import DataSource, DiabetesRecord
+from fastapi import Request
+from httpx import ASGITransport, AsyncClient
+from main import app
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+# Each test runs in its own event loop, so connections must not be pooled
+test_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+# Traced like the app's engine, so endpoint query budgets hold in the tests
+instrument_queries(test_engine.sync_engine, "test")
 
 
 @pytest.fixture(scope="session")
@@ -11,22 +34,111 @@ def tables():
     Base.metadata.drop_all(engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Start every test with an empty response cache."""
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(monkeypatch):
+    """Fail a test when a request runs more statements than its endpoint's budget."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "QUERY_TRACING", True)
+    monkeypatch.setattr(settings, "QUERY_TRACE_ENFORCE_BUDGETS", True)
+
+
 @pytest.fixture
-def db_session(tables):
+async def db_session(tables):
     """Create test database session."""
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = SessionLocal(bind=connection)
+    async with test_engine.connect() as connection:
+        transaction = await connection.begin()
+        # Commits inside the code under test only release a savepoint
+        session = AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+
+        yield session
+
+        await session.close()
+        await transaction.rollback()
+
+
+@pytest.fixture
+def committing_engine(tables):
+    """The test engine, for work that must commit outside the test transaction."""
+    return test_engine
+
+
+@pytest.fixture
+async def other_connection(committing_engine):
+    """A second database connection, as another process would hold."""
+    async with committing_engine.connect() as connection:
+        yield connection
+
+
+@pytest.fixture
+def held_advisory_lock(other_connection):
+    """Take an advisory lock on the other connection, held until the test ends."""
+
+    async def hold(key: int) -> None:
+        await other_connection.execute(select(func.pg_advisory_lock(key)))
+
+    return hold
+
+
+@pytest.fixture
+async def async_client(db_session):
+    """Create an API client that shares the test database session."""
+
+    async def override_get_session(request: Request):
+        # Keyed idempotent requests run in a session the route joins to the
+        # test transaction
+        db = getattr(request.state, "db", None)
+        yield db if db is not None else db_session
+
+    def override_get_session_factory():
+        # Streamed responses open their own session; give them the test one
+        return lambda: nullcontext(db_session)
+
+    def override_get_connection_factory():
+        return lambda: nullcontext(db_session.bind)
+
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
+    app.dependency_overrides[get_connection_factory] = override_get_connection_factory
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def make_record():
+    """Build a diabetes record with typical values, overridden by keyword."""
 
-    yield session
+    def make(**fields) -> DiabetesRecord:
+        values = {
+            "glucose": 100,
+            "blood_pressure": 70,
+            "skin_thickness": 20,
+            "insulin": 0,
+            "bmi": 25.0,
+            "diabetes_pedigree": 0.5,
+            "age": 40,
+            "outcome": False,
+            "source": DataSource.DATASET,
+        }
+        return DiabetesRecord(**{**values, **fields})
 
-    session.close()
-    transaction.rollback()
-    connection.close()
+    return make
 
 
 @pytest.fixture
-def sample_data(db_session):
+async def sample_data(db_session):
     """Create sample diabetes records."""
     records = [
         DiabetesRecord(
@@ -39,6 +151,7 @@ def sample_data(db_session):
             diabetes_pedigree=0.627,
             age=50,
             outcome=True,
+            source=DataSource.DATASET,
         ),
         DiabetesRecord(
             pregnancies=1,
@@ -50,6 +163,7 @@ def sample_data(db_session):
             diabetes_pedigree=0.351,
             age=31,
             outcome=False,
+            source=DataSource.DATASET,
         ),
         DiabetesRecord(
             pregnancies=8,
@@ -61,11 +175,12 @@ def sample_data(db_session):
             diabetes_pedigree=0.672,
             age=32,
             outcome=True,
+            source=DataSource.DATASET,
         ),
     ]
 
     for record in records:
         db_session.add(record)
-    db_session.commit()
+    await db_session.commit()
 
     return records
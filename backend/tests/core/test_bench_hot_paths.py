@@ -0,0 +1,63 @@
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).parents[2] / "scripts" / "bench_hot_paths.py"
+
+spec = importlib.util.spec_from_file_location("bench_hot_paths", SCRIPT)
+bench_hot_paths = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_hot_paths)
+
+
+def test_benchmarks_run():
+    """Test the benchmarks time each call against the code of this tree."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPT),
+            "risk_level",
+            "make_hashable",
+            "completion_parser",
+            "html_content",
+            "record_schema",
+            "--json",
+            "--repeat",
+            "2",
+            "--min-time",
+            "0.001",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    results = json.loads(result.stdout)
+    assert set(results) == {
+        "risk_level",
+        "make_hashable",
+        "completion_parser",
+        "html_content",
+        "record_schema",
+    }
+    assert all(0 < result["min"] <= result["median"] for result in results.values())
+
+
+def test_compare_flags_regressions():
+    """Test the fastest runs are compared and slowdowns beyond the threshold flagged."""
+
+    def run(**mins):
+        return {
+            name: {"min": value, "median": value * 2} for name, value in mins.items()
+        }
+
+    base = bench_hot_paths.best([run(a=1.0, b=1.0, c=1.0), run(a=0.9, b=1.2, c=1.0)])
+    target = bench_hot_paths.best([run(a=1.2, b=1.05), run(a=1.0, b=0.8)])
+    target["c"] = {"error": "ImportError: gone"}
+
+    changes = bench_hot_paths.compare(base, target, threshold=0.1)
+
+    assert changes["a"]["verdict"] == "regression"
+    assert changes["a"]["base"] == 0.9
+    assert changes["b"]["verdict"] == "improvement"
+    assert changes["c"]["verdict"] == "missing"
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from app.core.cache import (
+    CACHE_INVALIDATION_CHANNEL,
+    CacheEntry,
+    ResponseCache,
+    response_cache,
+)
+from app.core.listener import PgListener
+from app.models.diabetes import DataSource, DiabetesRecord
+from app.models.health import HealthAssessment
+from app.models.user import User
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@pytest.fixture
+async def assessment(db_session, sample_data):
+    """Create a stored health assessment."""
+    user = User(name="Ada", surname="Lovelace", email="ada@example.com")
+    db_session.add(user)
+    await db_session.flush()
+    assessment = HealthAssessment(
+        user_id=user.id,
+        diabetes_record_id=sample_data[0].id,
+        risk_score=0.8,
+        risk_level="high",
+        recommendations={
+            "risk_assessment": "High risk",
+            "recommendations": [],
+            "preventive_measures": [],
+        },
+    )
+    db_session.add(assessment)
+    await db_session.commit()
+    return assessment
+
+
+async def test_cached_until_invalidated(async_client, db_session, assessment):
+    """Test reads are served from the cache until the table is written."""
+    url = f"/api/v1/health/{assessment.id}"
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+
+    # The test transaction never commits, so no invalidation arrives
+    await db_session.execute(
+        update(HealthAssessment)
+        .where(HealthAssessment.id == assessment.id)
+        .values(risk_level="low")
+    )
+    response = await async_client.get(url)
+    assert response.json()["risk_level"] == "high"
+    assert response.headers["etag"] == etag
+
+    # Writes to other assessments leave it cached
+    response_cache.on_notify(f"health_assessments:{assessment.id + 1}")
+    response = await async_client.get(url)
+    assert response.json()["risk_level"] == "high"
+
+    response_cache.on_notify(f"health_assessments:{assessment.id}")
+    response = await async_client.get(url)
+    assert response.json()["risk_level"] == "low"
+    assert response.headers["etag"] != etag
+
+    # A notification naming only the table drops all of its rows
+    await db_session.execute(
+        update(HealthAssessment)
+        .where(HealthAssessment.id == assessment.id)
+        .values(risk_level="medium")
+    )
+    response_cache.on_notify("health_assessments")
+    response = await async_client.get(url)
+    assert response.json()["risk_level"] == "medium"
+
+
+async def test_if_none_match(async_client, assessment):
+    """Test a matching ETag gets a 304 with no body."""
+    url = f"/api/v1/health/{assessment.id}"
+    etag = (await async_client.get(url)).headers["etag"]
+
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # Another process renders the same body, so the ETag still matches
+    response_cache.clear()
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+async def test_errors_not_cached(async_client, db_session, assessment):
+    """Test a 404 is not cached."""
+    response = await async_client.get("/api/v1/health/999999")
+    assert response.status_code == 404
+    assert "etag" not in response.headers
+    assert response_cache.get("/api/v1/health/999999") is None
+
+
+def test_entries_unindexed_when_dropped():
+    """Test evicted and expired entries leave nothing behind in the index."""
+    cache = ResponseCache(max_entries=1)
+    cache.set("/a", CacheEntry(b"a", None, time.monotonic() + 60), {"t:1"})
+    cache.set("/b", CacheEntry(b"b", None, time.monotonic() - 1), {"t:2"})
+    assert cache.get("/a") is None
+    assert set(cache._keys_by_tag) == {"t:2"}
+
+    assert cache.get("/b") is None
+    assert not cache._keys_by_tag
+
+
+def test_nothing_stored_while_disconnected():
+    """Test responses are not cached while invalidations cannot arrive."""
+    cache = ResponseCache()
+    cache.listener = SimpleNamespace(connected=False)
+    cache.set("/a", CacheEntry(b"a", None, time.monotonic() + 60), {"t"})
+    assert cache.get("/a") is None
+
+    cache.listener.connected = True
+    cache.set("/a", CacheEntry(b"a", None, time.monotonic() + 60), {"t"})
+    assert cache.get("/a") is not None
+
+
+async def test_writes_notify_listeners(committing_engine):
+    """Test a committed write to a cached row reaches the listeners."""
+    received = asyncio.Queue()
+    listener = PgListener()
+    await listener.listen(CACHE_INVALIDATION_CHANNEL, received.put_nowait)
+    await listener.start()
+    user = User(name="Notify", surname="Test", email="notify@example.com")
+    try:
+        async with AsyncSession(committing_engine, expire_on_commit=False) as session:
+            session.add(user)
+            await session.flush()
+            record = DiabetesRecord(
+                user_id=user.id,
+                glucose=120,
+                blood_pressure=70,
+                skin_thickness=20,
+                insulin=80,
+                bmi=25.0,
+                diabetes_pedigree=0.5,
+                age=40,
+                source=DataSource.USER_ENTRY,
+            )
+            session.add(record)
+            await session.flush()
+            assessment = HealthAssessment(
+                user_id=user.id,
+                diabetes_record_id=record.id,
+                risk_score=0.5,
+                risk_level="medium",
+            )
+            session.add(assessment)
+            await session.commit()
+        expected = f"health_assessments:{assessment.id}"
+        assert await asyncio.wait_for(received.get(), 5) == expected
+    finally:
+        async with committing_engine.begin() as connection:
+            for table in ["health_assessments", "diabetes_records"]:
+                await connection.execute(
+                    text(f"DELETE FROM {table} WHERE user_id = :user_id"),
+                    {"user_id": user.id},
+                )
+            await connection.execute(
+                text("DELETE FROM users WHERE id = :user_id"), {"user_id": user.id}
+            )
+        await listener.stop()
+
+
+async def test_lost_listener_clears_cache(other_connection):
+    """Test callbacks hear of a lost connection before it is re-established."""
+    received = asyncio.Queue()
+    listener = PgListener(reconnect_delay=60)
+    await listener.listen(CACHE_INVALIDATION_CHANNEL, received.put_nowait)
+    await listener.start()
+    try:
+        pid = listener._connection.get_server_pid()
+        await other_connection.execute(select(func.pg_terminate_backend(pid)))
+        assert await asyncio.wait_for(received.get(), 5) == ""
+    finally:
+        await listener.stop()
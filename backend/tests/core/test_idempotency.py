@@ -0,0 +1,191 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from app.core.database import get_connection_factory
+from app.core.idempotency import REPLAYED_HEADER, settings
+from app.models.anomaly import AnomalyFlag
+from app.models.diabetes import DiabetesRecord
+from app.models.idempotency import IdempotencyKey
+from app.models.job import AssessmentJob
+from app.models.user import User
+from app.services.intake import IntakeService
+from httpx import ASGITransport, AsyncClient
+from main import app
+from sqlalchemy import delete, func, select, update
+
+
+@pytest.fixture
+async def user(db_session):
+    """Create a test user."""
+    user = User(name="Alan", surname="Turing", email="alan@example.com")
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+@pytest.fixture
+def record_payload(user):
+    """Diabetes record payload for the test user."""
+    return {
+        "user_id": user.id,
+        "pregnancies": 1,
+        "glucose": 110,
+        "blood_pressure": 72,
+        "skin_thickness": 25,
+        "insulin": 90,
+        "bmi": 26.1,
+        "diabetes_pedigree": 0.3,
+        "age": 35,
+    }
+
+
+async def _job_count(db_session) -> int:
+    return await db_session.scalar(select(func.count()).select_from(AssessmentJob))
+
+
+async def test_retry_replays_first_response(async_client, db_session, record_payload):
+    """Test a retried create returns the first record without creating another."""
+    headers = {"Idempotency-Key": "create-record-1"}
+    first = await async_client.post(
+        "/api/v1/diabetes/", json=record_payload, headers=headers
+    )
+    assert first.status_code == 200
+    assert REPLAYED_HEADER not in first.headers
+    jobs = await _job_count(db_session)
+
+    retry = await async_client.post(
+        "/api/v1/diabetes/", json=record_payload, headers=headers
+    )
+    assert retry.status_code == 200
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert retry.json() == first.json()
+    assert await _job_count(db_session) == jobs
+
+
+async def test_key_reused_for_other_request(async_client, record_payload):
+    """Test a key sent with a different body is rejected."""
+    headers = {"Idempotency-Key": "create-record-2"}
+    await async_client.post("/api/v1/diabetes/", json=record_payload, headers=headers)
+
+    response = await async_client.post(
+        "/api/v1/diabetes/", json={**record_payload, "age": 36}, headers=headers
+    )
+    assert response.status_code == 422
+
+
+async def test_without_key(async_client, record_payload):
+    """Test requests without a key are each handled."""
+    first = await async_client.post("/api/v1/diabetes/", json=record_payload)
+    second = await async_client.post("/api/v1/diabetes/", json=record_payload)
+    assert first.json()["id"] != second.json()["id"]
+
+
+async def test_errors_release_key(async_client, db_session, record_payload):
+    """Test a request that raised can be retried with its key."""
+    headers = {"Idempotency-Key": "create-record-3"}
+    payload = {**record_payload, "user_id": 999999}
+    response = await async_client.post(
+        "/api/v1/diabetes/", json=payload, headers=headers
+    )
+    assert response.status_code == 404
+    assert await db_session.get(IdempotencyKey, "create-record-3") is None
+
+
+async def test_expired_key_reclaimed(async_client, db_session, record_payload):
+    """Test a key whose response has expired runs the request again."""
+    headers = {"Idempotency-Key": "create-record-4"}
+    first = await async_client.post(
+        "/api/v1/diabetes/", json=record_payload, headers=headers
+    )
+    await db_session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == "create-record-4")
+        .values(created_at=func.now() - timedelta(days=2))
+    )
+
+    retry = await async_client.post(
+        "/api/v1/diabetes/", json=record_payload, headers=headers
+    )
+    assert REPLAYED_HEADER not in retry.headers
+    assert retry.json()["id"] != first.json()["id"]
+
+
+async def test_concurrent_duplicate_conflicts(committing_engine, monkeypatch):
+    """Test a duplicate of a running request gets a 409, then its response."""
+    monkeypatch.setattr(settings, "IDEMPOTENCY_LOCK_TIMEOUT_MS", 200)
+    create_record = IntakeService.create_record
+
+    async def slow_create_record(self, *args, **kwargs):
+        # Holds the first request's transaction open past the duplicate's wait
+        await asyncio.sleep(1)
+        return await create_record(self, *args, **kwargs)
+
+    monkeypatch.setattr(IntakeService, "create_record", slow_create_record)
+    # Each request commits for real, on a connection of its own
+    app.dependency_overrides[get_connection_factory] = lambda: committing_engine.connect
+    email = "concurrent@example.com"
+    payload = {
+        "user": {"name": "Barbara", "surname": "Liskov", "email": email},
+        "record": {
+            "glucose": 110,
+            "blood_pressure": 72,
+            "skin_thickness": 25,
+            "insulin": 90,
+            "bmi": 26.1,
+            "diabetes_pedigree": 0.3,
+            "age": 35,
+        },
+    }
+    headers = {"Idempotency-Key": "onboard-concurrent"}
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+
+            def onboard():
+                return client.post(
+                    "/api/v1/users/onboard", json=payload, headers=headers
+                )
+
+            first = asyncio.create_task(onboard())
+            await asyncio.sleep(0.3)
+            duplicate = await onboard()
+            assert duplicate.status_code == 409
+            first = await first
+            assert first.status_code == 200
+
+            retry = await onboard()
+            assert retry.headers[REPLAYED_HEADER] == "true"
+            assert retry.json() == first.json()
+
+        async with committing_engine.connect() as connection:
+            records = await connection.scalar(
+                select(func.count())
+                .select_from(DiabetesRecord)
+                .join(User, User.id == DiabetesRecord.user_id)
+                .where(User.email == email)
+            )
+        assert records == 1
+    finally:
+        del app.dependency_overrides[get_connection_factory]
+        async with committing_engine.begin() as connection:
+            user_ids = select(User.id).where(User.email == email).scalar_subquery()
+            record_ids = select(DiabetesRecord.id).where(
+                DiabetesRecord.user_id.in_(user_ids)
+            )
+            await connection.execute(
+                delete(AnomalyFlag).where(
+                    AnomalyFlag.diabetes_record_id.in_(record_ids)
+                )
+            )
+            await connection.execute(
+                delete(AssessmentJob).where(AssessmentJob.user_id.in_(user_ids))
+            )
+            await connection.execute(
+                delete(DiabetesRecord).where(DiabetesRecord.user_id.in_(user_ids))
+            )
+            await connection.execute(delete(User).where(User.email == email))
+            await connection.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.key == "onboard-concurrent")
+            )
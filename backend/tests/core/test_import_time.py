@@ -0,0 +1,18 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).parents[2] / "scripts" / "profile_imports.py"
+
+# Importing sklearn and pandas alone takes about 1.5s
+IMPORT_BUDGET_SECONDS = 2.5
+
+
+def test_import_main_within_budget():
+    """Test importing the app is fast and loads no heavy dependency eagerly."""
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "main", "--budget", str(IMPORT_BUDGET_SECONDS)],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,54 @@
+from app.core.database import DATABASE_URL
+from app.core.instrumentation import instrument_queries
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+
+def _sample(name: str, labels: dict) -> float:
+    """Read a metric from the default registry."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def test_request_metrics_per_route(async_client):
+    """Test requests are timed under their route template and status."""
+    route = "/api/v1/health/{assessment_id}"
+    labels = {"method": "GET", "route": route, "status": "404"}
+    before = _sample("http_request_duration_seconds_count", labels)
+
+    for assessment_id in (999998, 999999):
+        response = await async_client.get(f"/api/v1/health/{assessment_id}")
+        assert response.status_code == 404
+
+    assert _sample("http_request_duration_seconds_count", labels) == before + 2
+    assert _sample("http_requests_in_progress", {"method": "GET"}) == 0
+
+
+async def test_unmatched_requests_share_a_series(async_client):
+    """Test unknown URLs do not each get their own series."""
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", labels)
+
+    await async_client.get("/no/such/page")
+    await async_client.get("/nor/this/one")
+
+    assert _sample("http_request_duration_seconds_count", labels) == before + 2
+
+
+def test_query_metrics():
+    """Test statements are timed per statement type."""
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    instrument_queries(engine, "test")
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+            connection.execute(text("SHOW server_version"))
+    finally:
+        engine.dispose()
+
+    selects = {"engine": "test", "statement": "SELECT"}
+    others = {"engine": "test", "statement": "OTHER"}
+    # Connecting may run statements of its own
+    assert _sample("db_query_duration_seconds_count", selects) >= 2
+    assert _sample("db_query_duration_seconds_count", others) >= 1
@@ -0,0 +1,39 @@
+import pytest
+from app.core.database import DATABASE_URL
+from app.core.pool import instrument_pool
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc, text
+
+
+def _sample(name: str) -> float:
+    """Read a pool metric of the test engine from the default registry."""
+    return REGISTRY.get_sample_value(name, {"engine": "pool-test"}) or 0.0
+
+
+def test_pool_metrics():
+    """Test pool checkout, in-use, overflow and timeout metrics."""
+    engine = create_engine(DATABASE_URL, pool_size=1, max_overflow=1, pool_timeout=0.1)
+    instrument_pool(engine, "pool-test")
+    overflow_before = _sample("db_pool_overflow_total")
+    waits_before = _sample("db_pool_checkout_wait_seconds_count")
+    timeouts_before = _sample("db_pool_timeouts_total")
+
+    try:
+        with engine.connect() as first, engine.connect() as second:
+            first.execute(text("SELECT 1"))
+            second.execute(text("SELECT 1"))
+            assert _sample("db_pool_connections_in_use") == 2
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+        assert _sample("db_pool_connections_in_use") == 0
+        assert _sample("db_pool_overflow_total") == overflow_before + 1
+        assert _sample("db_pool_checkout_wait_seconds_count") >= waits_before + 3
+        assert _sample("db_pool_timeouts_total") == timeouts_before + 1
+
+        # The disposed engine's new pool is still instrumented
+        engine.dispose()
+        with engine.connect():
+            assert _sample("db_pool_connections_in_use") == 1
+    finally:
+        engine.dispose()
@@ -0,0 +1,123 @@
+import pytest
+from app.core.profiling import (
+    PROFILE_ID_HEADER,
+    StackSampler,
+    linked_profile_id,
+    profile_store,
+    settings,
+)
+from app.models.job import AssessmentJob
+from app.models.user import User
+from app.services.health import HealthService
+from sqlalchemy import select
+from worker import AssessmentWorker
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    """Enable profiling with a token, saving profiles to a temporary directory."""
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "s3cret")
+    monkeypatch.setattr(profile_store, "directory", tmp_path)
+    return {"X-Profile-Token": "s3cret"}
+
+
+def test_sampler_collapsed_stacks():
+    """Test the sampler records stacks in the collapsed format."""
+    sampler = StackSampler(interval=0.001, max_seconds=5)
+    sampler.start()
+    # Busy, so the main thread is caught in this function
+    while sum(sampler.stacks.values()) < 5:
+        pass
+    sampler.stop()
+
+    lines = sampler.collapsed().splitlines()
+    assert any(
+        line.startswith("MainThread;") and "test_sampler_collapsed_stacks" in line
+        for line in lines
+    )
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+async def test_profiled_request(async_client, profiling):
+    """Test a request with the token is profiled and its profile served."""
+    response = await async_client.get("/health", headers=profiling)
+    profile_id = response.headers[PROFILE_ID_HEADER]
+
+    listed = await async_client.get("/api/v1/admin/profiles", headers=profiling)
+    assert listed.status_code == 200
+    assert listed.json()[0]["id"] == profile_id
+    assert listed.json()[0]["request"].startswith("GET /health ")
+
+    profile = await async_client.get(
+        f"/api/v1/admin/profiles/{profile_id}", headers=profiling
+    )
+    assert profile.status_code == 200
+    assert not profile.text.startswith("#")
+
+
+async def test_admin_requests_not_profiled(async_client, profiling):
+    """Test reading profiles with the token does not save profiles of its own."""
+    await async_client.get("/health", headers=profiling)
+
+    for _ in range(2):
+        listed = await async_client.get("/api/v1/admin/profiles", headers=profiling)
+        assert PROFILE_ID_HEADER not in listed.headers
+        assert len(listed.json()) == 1
+
+
+async def test_unprofiled_without_token(async_client, profiling):
+    """Test requests without the token are neither profiled nor let in."""
+    response = await async_client.get("/health", headers={"X-Profile-Token": "guess"})
+    assert PROFILE_ID_HEADER not in response.headers
+    assert profile_store.list() == []
+
+    response = await async_client.get("/api/v1/admin/profiles")
+    assert response.status_code == 403
+
+
+async def test_admin_closed_when_token_unset(async_client):
+    """Test profiles cannot be read when no token is configured."""
+    response = await async_client.get(
+        "/api/v1/admin/profiles", headers={"X-Profile-Token": ""}
+    )
+    assert response.status_code == 403
+
+
+async def test_queued_job_profiled_under_linked_id(
+    async_client, db_session, profiling, mocker
+):
+    """Test the assessment a profiled request queues is profiled by the worker."""
+    user = User(name="Grace", surname="Hopper", email="grace@example.com")
+    db_session.add(user)
+    await db_session.flush()
+    response = await async_client.post(
+        "/api/v1/diabetes/",
+        json={
+            "user_id": user.id,
+            "glucose": 120,
+            "blood_pressure": 70,
+            "skin_thickness": 20,
+            "insulin": 80,
+            "bmi": 25.0,
+            "diabetes_pedigree": 0.5,
+            "age": 40,
+        },
+        headers=profiling,
+    )
+    profile_id = response.headers[PROFILE_ID_HEADER]
+    job = await db_session.scalar(
+        select(AssessmentJob).where(
+            AssessmentJob.diabetes_record_id == response.json()["id"]
+        )
+    )
+    assert job.profile_id == profile_id
+
+    mocker.patch.object(HealthService, "assess_health")
+    await AssessmentWorker(concurrency=1, poll_interval=1)._assess(job)
+
+    linked = linked_profile_id(profile_id, job.id)
+    profile = await async_client.get(
+        f"/api/v1/admin/profiles/{linked}", headers=profiling
+    )
+    assert profile.status_code == 200
+    assert any(p["request"].startswith("assessment job ") for p in profile_store.list())
@@ -0,0 +1,74 @@
+import pytest
+from app.api.v1.endpoints.health import get_health_assessment
+from app.core.query_tracer import QueryBudgetExceeded, QueryTrace, trace_queries
+from app.models.user import User
+from app.services.health import HealthService
+from app.services.notification import NotificationService
+from sqlalchemy import select
+
+
+def test_repeated_and_n_plus_one():
+    """Test identical statements and per-row loops are flagged."""
+    trace = QueryTrace("job", budget=5)
+    trace.record("SELECT * FROM users WHERE id = $1", (1,), 0.001)
+    trace.record("SELECT * FROM users WHERE id = $1", (1,), 0.001)
+    for record_id in range(5):
+        trace.record("SELECT * FROM records WHERE id = $1", (record_id,), 0.001)
+    trace.record("SAVEPOINT sa_savepoint_1", (), 0.001)
+
+    assert trace.count == 7
+    assert trace.over_budget()
+    assert trace.repeated() == [("SELECT * FROM users WHERE id = $1", 2)]
+    assert trace.n_plus_one(5) == [("SELECT * FROM records WHERE id = $1", 5)]
+    assert len(trace.problems()) == 3
+
+
+async def test_request_traced(db_session):
+    """Test statements run in a traced block are recorded with their parameters."""
+    with trace_queries("block") as trace:
+        await db_session.execute(select(User).where(User.id == 1))
+    await db_session.execute(select(User))
+
+    assert trace.count == 1
+    assert "WHERE users.id" in trace.queries[0].statement
+
+
+async def test_budget_enforced(async_client, monkeypatch):
+    """Test a request over its endpoint's budget fails the test."""
+    monkeypatch.setattr(get_health_assessment, "query_budget", 0)
+    with pytest.raises(QueryBudgetExceeded):
+        await async_client.get("/api/v1/health/999999")
+
+
+async def test_assessment_reads_user_once(
+    async_client, db_session, sample_data, mocker
+):
+    """Test assessing a record does not look its user up again to notify them."""
+    user = User(name="Edsger", surname="Dijkstra", email="edsger@example.com")
+    db_session.add(user)
+    await db_session.flush()
+    user_id = user.id
+    record = sample_data[0]
+    record.user_id = user_id
+    record_id = record.id
+    await db_session.commit()
+    # So the assessment reads the user rather than finding it in the session
+    db_session.expunge_all()
+    mocker.patch(
+        "app.services.health.get_llm_recommendations",
+        return_value={
+            "risk_assessment": "High risk",
+            "recommendations": [],
+            "preventive_measures": [],
+        },
+    )
+    send = mocker.patch.object(NotificationService, "send_email")
+
+    with trace_queries("assessment") as trace:
+        await HealthService(db_session).assess_health(user_id, record_id)
+
+    send.assert_awaited_once()
+    assert send.call_args[0][0] == "edsger@example.com"
+    assert trace.repeated() == []
+    user_reads = [q for q in trace.queries if "FROM users" in q.statement]
+    assert len(user_reads) == 1
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timezone
+
+from app.core.serialization import (
+    encode_ndjson,
+    encode_rows,
+    stream_json_array,
+    stream_ndjson,
+)
+from app.models.diabetes import DataSource
+from fastapi.encoders import jsonable_encoder
+
+KEYS = ["id", "created_at", "source", "bmi", "outcome"]
+ROWS = [
+    (
+        1,
+        datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc),
+        DataSource.DATASET,
+        33.6,
+        True,
+    ),
+    (
+        2,
+        datetime(2025, 1, 2, 8, 0, tzinfo=timezone.utc),
+        DataSource.USER_ENTRY,
+        26.6,
+        None,
+    ),
+]
+
+
+async def _chunks(chunks):
+    for rows in chunks:
+        yield rows
+
+
+def test_encode_rows_matches_jsonable_encoder():
+    """Test the fast path decodes to what the response_model path produces."""
+    expected = jsonable_encoder([dict(zip(KEYS, row)) for row in ROWS])
+    assert json.loads(encode_rows(KEYS, ROWS)) == expected
+    lines = encode_ndjson(KEYS, ROWS).decode().splitlines()
+    assert [json.loads(line) for line in lines] == expected
+
+
+async def test_streams_join_chunks():
+    """Test chunked streams form one document, skipping empty chunks."""
+    expected = jsonable_encoder([dict(zip(KEYS, row)) for row in ROWS])
+    chunks = [[ROWS[0]], [], [ROWS[1]]]
+
+    body = b"".join([part async for part in stream_json_array(KEYS, _chunks(chunks))])
+    assert json.loads(body) == expected
+    body = b"".join([part async for part in stream_ndjson(KEYS, _chunks(chunks))])
+    assert [json.loads(line) for line in body.splitlines()] == expected
+
+    assert (
+        b"".join([part async for part in stream_json_array(KEYS, _chunks([]))]) == b"[]"
+    )
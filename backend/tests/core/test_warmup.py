@@ -0,0 +1,86 @@
+import pytest
+from app.core.warmup import (
+    DONE,
+    FAILED,
+    SMTP_CHECK_TIMEOUT_SECONDS,
+    WarmUp,
+    check_smtp,
+    warm_up,
+)
+from main import app
+
+
+async def _ok():
+    pass
+
+
+async def _broken():
+    raise RuntimeError("no model")
+
+
+class ConnectedListener:
+    connected = True
+
+
+@pytest.fixture(autouse=True)
+def fresh_warm_up(mocker):
+    """Give each test the process's warm-up as if nothing had run."""
+    for attribute in ("status", "required", "seconds"):
+        mocker.patch.object(warm_up, attribute, {})
+
+
+@pytest.fixture
+def listener():
+    """Stand in for the listener the lifespan starts."""
+    app.state.listener = ConnectedListener()
+    yield app.state.listener
+    del app.state.listener
+
+
+async def test_optional_step_failure_still_completes():
+    """Test a failed best-effort step does not hold readiness back."""
+    warmup = WarmUp()
+    assert not warmup.complete
+
+    await warmup.run([("database", _ok, True), ("risk_model", _broken, False)])
+    assert warmup.status == {"database": DONE, "risk_model": FAILED}
+    assert warmup.complete
+
+
+async def test_required_step_failure_never_completes():
+    """Test a failed required step keeps the process unready."""
+    warmup = WarmUp()
+    await warmup.run([("database", _broken, True), ("caches", _ok, False)])
+    assert not warmup.complete
+
+
+async def test_smtp_step_greets_server(mocker):
+    """Test the SMTP step connects to the configured server and says hello."""
+    smtp = mocker.patch("app.services.notification.smtplib.SMTP")
+    await check_smtp()
+
+    assert smtp.call_args.kwargs["timeout"] == SMTP_CHECK_TIMEOUT_SECONDS
+    server = smtp.return_value.__enter__.return_value
+    server.ehlo.assert_called_once()
+    server.noop.assert_called_once()
+
+
+async def test_ready_after_warm_up(async_client, listener):
+    """Test /ready is 503 until warm-up has finished."""
+    response = await async_client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+    await warm_up.run([("database", _ok, True)])
+    response = await async_client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["steps"] == {"database": DONE}
+
+
+async def test_not_ready_without_listener(async_client, listener):
+    """Test /ready is 503 while cache invalidations cannot be received."""
+    await warm_up.run([("database", _ok, True)])
+    listener.connected = False
+    response = await async_client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["listener"] is False
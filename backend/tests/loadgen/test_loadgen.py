@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from app.core.config import get_settings
+from app.services.llm import LLMService
+from app.services.notification import NotificationService
+from loadgen.runner import LoadRunner
+from loadgen.scenarios import parse_mix
+from loadgen.standins import StandIns
+from loadgen.stats import ScenarioStats, StageStats, percentile
+
+settings = get_settings()
+
+
+def test_percentiles_and_error_rate():
+    """Test nearest-rank percentiles and that errors are not counted as throughput."""
+    ordered = [i / 1000 for i in range(1, 101)]
+    assert percentile(ordered, 50) == 0.05
+    assert percentile(ordered, 99) == 0.099
+    assert percentile([], 99) == 0.0
+
+    stats = ScenarioStats()
+    for status in (200, 202, 500, None):
+        stats.record(0.01, status)
+    summary = stats.summary(elapsed=2.0)
+    assert summary["throughput"] == 1.0
+    assert summary["error_rate"] == 0.5
+    assert summary["statuses"]["transport_error"] == 1
+
+
+async def test_backend_clients_use_standins(monkeypatch):
+    """Test the LLM and email clients reach the stand-ins with their settings."""
+    async with StandIns(llm_latency=0, smtp_latency=0) as standins:
+        for name, value in standins.env().items():
+            field_type = type(getattr(settings, name))
+            parsed = value == "true" if field_type is bool else field_type(value)
+            monkeypatch.setattr(settings, name, parsed)
+
+        llm = LLMService()
+        data = llm._make_hashable({"total_records": 1, "avg_glucose": 150.0})
+        recommendations = await asyncio.to_thread(
+            llm.get_analysis_recommendations, data
+        )
+        await NotificationService().send_email("a@example.com", "Subject", "Body")
+
+        assert len(recommendations["recommendations"]) == 3
+        assert standins.counts() == {"llm_requests": 1, "emails": 1}
+
+
+async def test_open_stage(async_client):
+    """Test a short open-model stage onboards users and reads their assessments."""
+    # One in flight, as the test client shares a single session
+    runner = LoadRunner(
+        async_client, parse_mix("onboard=1,fetch_assessment=1"), 1, duration=0.5
+    )
+    await runner.seed(2)
+    (stage,) = await runner.run([20.0])
+
+    summary = stage.summary()
+    assert summary["requests"] > 0
+    assert summary["errors"] == 0
+    assert set(summary["scenarios"]) <= {"onboard", "fetch_assessment"}
+
+
+async def test_fallback_counted_as_onboard(async_client):
+    """Test a read with nothing to read yet is counted as the onboarding it ran."""
+    runner = LoadRunner(async_client, parse_mix("fetch_assessment=1"), 1, duration=0)
+    stats = StageStats(None, 1)
+    await runner._request(stats, time.perf_counter())
+    await runner._request(stats, time.perf_counter())
+
+    assert stats.scenarios["onboard"].statuses == {"200": 1}
+    assert sum(stats.scenarios["fetch_assessment"].statuses.values()) == 1
@@ -1,6 +1,7 @@
 from unittest.mock import patch
 
 import pytest
+from app.models.diabetes import DataSource, DiabetesRecord
 from app.services.analysis import AnalysisService
 
 
@@ -156,3 +157,40 @@ async def test_llm_error_handling(db_session, sample_data):
         assert "average_age" in analysis
         assert "average_bmi" in analysis
         assert "average_glucose" in analysis
+
+
+@pytest.mark.asyncio
+async def test_outliers_counted_and_ranked(db_session, mock_llm_response):
+    """Test IQR and z-score outliers are found and the most extreme listed first."""
+    records = [
+        DiabetesRecord(
+            glucose=100 + i % 5,
+            blood_pressure=70,
+            skin_thickness=20,
+            insulin=0,
+            bmi=25.0,
+            diabetes_pedigree=0.5,
+            age=40,
+            outcome=False,
+            source=DataSource.DATASET,
+        )
+        for i in range(30)
+    ]
+    records[0].glucose = 400
+    records[1].glucose = 250
+    db_session.add_all(records)
+    await db_session.commit()
+
+    with patch("app.services.llm.get_llm_recommendations") as mock_llm:
+        mock_llm.return_value = mock_llm_response
+        analysis = await AnalysisService(db=db_session).run_analysis()
+
+    glucose = analysis["statistics"]["glucose"]
+    assert glucose["iqr_outliers"] == 2
+    assert glucose["zscore_outliers"] == 1
+    assert [a["record_id"] for a in analysis["anomalies"]["glucose"]] == [
+        records[0].id,
+        records[1].id,
+    ]
+    assert analysis["anomalies"]["glucose"][0]["deviation"] > 3
+    assert analysis["anomalies"]["bmi"] == []
@@ -0,0 +1,110 @@
+import pytest
+from app.core.config import get_settings
+from app.models.diabetes import DataSource
+from app.services.analysis_runner import ANALYSIS_LOCK_KEY, AnalysisRunner
+from sqlalchemy import func, select
+
+settings = get_settings()
+
+
+@pytest.fixture
+def add_records(db_session, make_record):
+    """Add one user-entered record per outcome."""
+
+    async def add(outcomes):
+        db_session.add_all(
+            [
+                make_record(outcome=outcome, source=DataSource.USER_ENTRY)
+                for outcome in outcomes
+            ]
+        )
+        await db_session.commit()
+
+    return add
+
+
+async def test_run_is_incremental(db_session, add_records):
+    """Test each run covers only records after the previous watermark."""
+    runner = AnalysisRunner(db_session, lag_seconds=0)
+    await add_records([True, False, False, False])
+
+    first = await runner.run()
+    assert first.records == 4
+    assert first.total_records == 4
+    assert first.positive_rate == 0.25
+    assert await runner.run() is None
+
+    await add_records([True, True])
+    second = await runner.run()
+    assert second.records == 2
+    assert second.watermark > first.watermark
+    assert second.total_records == 6
+    assert second.total_positive_cases == 3
+    assert float(second.total_glucose) == 600
+
+
+async def test_threshold_crossing_alerts_once(
+    db_session, add_records, monkeypatch, mocker
+):
+    """Test an alert fires when the rate crosses the threshold, not after."""
+    monkeypatch.setattr(settings, "ALERT_THRESHOLD", 0.3)
+    runner = AnalysisRunner(db_session, lag_seconds=0)
+
+    await add_records([True, False, False, False])
+    assert not (await runner.run()).threshold_crossed
+
+    await add_records([True, True])
+    crossed = await runner.run()
+    assert crossed.threshold_crossed
+
+    await add_records([True])
+    assert not (await runner.run()).threshold_crossed
+
+    monkeypatch.setattr(settings, "ALERT_EMAILS", ["alerts@example.com"])
+    mocker.patch(
+        "app.services.analysis.llm.get_llm_recommendations",
+        return_value={
+            "risk_assessment": "High",
+            "recommendations": ["Screen more"],
+            "preventive_measures": [],
+        },
+    )
+    send_email = mocker.patch(
+        "app.services.analysis_runner.NotificationService.send_email"
+    )
+    await runner.notify(crossed)
+    send_email.assert_called_once()
+    assert send_email.call_args[0][0] == "alerts@example.com"
+
+
+async def test_run_skipped_without_leadership(
+    db_session, add_records, held_advisory_lock
+):
+    """Test a runner backs off while another process holds the lock."""
+    await add_records([True])
+    await held_advisory_lock(ANALYSIS_LOCK_KEY)
+    assert await AnalysisRunner(db_session, lag_seconds=0).run() is None
+
+
+async def test_open_transaction_holds_window(db_session, add_records, other_connection):
+    """Test records created after another transaction began wait until it ends."""
+    # Could still commit records with lower ids than the ones added below
+    await other_connection.execute(select(1))
+    await add_records([True, False])
+    runner = AnalysisRunner(db_session, lag_seconds=0)
+    assert await runner.run() is None
+
+    await other_connection.rollback()
+    # Activity is read once per transaction, and the test runs in one
+    await db_session.execute(select(func.pg_stat_clear_snapshot()))
+    assert (await runner.run()).records == 2
+
+
+async def test_run_counts_outliers(db_session, add_records, make_record):
+    """Test outliers are counted against the whole dataset's moments."""
+    await add_records([False] * 20)
+    db_session.add(make_record(glucose=400, outcome=True, source=DataSource.USER_ENTRY))
+    await db_session.commit()
+
+    run = await AnalysisRunner(db_session, lag_seconds=0).run()
+    assert run.anomalies == {"glucose": 1}
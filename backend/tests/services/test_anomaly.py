@@ -0,0 +1,86 @@
+import random
+import statistics
+
+import pytest
+from app.models.anomaly import AnomalyFlag
+from app.services.anomaly import AnomalyDetector, P2Quantile, RunningMoments
+from sqlalchemy import select
+
+
+def test_running_moments_match_batch():
+    """Test Welford's update gives the batch mean and variance."""
+    values = [random.Random(1).gauss(120, 30) for _ in range(1000)]
+    moments = RunningMoments()
+    for value in values:
+        moments.update(value)
+
+    assert moments.count == 1000
+    assert moments.mean == pytest.approx(statistics.fmean(values))
+    assert moments.std == pytest.approx(statistics.pstdev(values))
+
+
+@pytest.mark.parametrize("p", [0.25, 0.5, 0.75])
+def test_p2_quantile_tracks_exact_quantile(p):
+    """Test the P-square estimate stays close to the exact quantile."""
+    rng = random.Random(2)
+    values = [rng.gauss(120, 30) for _ in range(10000)]
+    estimator = P2Quantile(p)
+    for value in values:
+        estimator.update(value)
+
+    exact = statistics.quantiles(values, n=100, method="inclusive")[int(p * 100) - 1]
+    assert estimator.value == pytest.approx(exact, abs=1.0)
+
+
+def test_p2_quantile_resumes_from_quantiles():
+    """Test an estimator seeded from known quantiles keeps tracking."""
+    rng = random.Random(3)
+    seen = sorted(rng.uniform(0, 100) for _ in range(5000))
+    levels = [0.0] + P2Quantile.marker_quantiles(0.75) + [1.0]
+    heights = [seen[round(level * (len(seen) - 1))] for level in levels]
+    estimator = P2Quantile.from_quantiles(0.75, heights, len(seen))
+
+    for _ in range(5000):
+        estimator.update(rng.uniform(0, 100))
+    assert estimator.value == pytest.approx(75, abs=2.0)
+
+
+async def test_inspect_flags_and_persists_outliers(
+    db_session, make_record, monkeypatch
+):
+    """Test a new record is judged against the seeded population."""
+    from app.services.anomaly import settings
+
+    monkeypatch.setattr(settings, "ANOMALY_MIN_OBSERVATIONS", 10)
+    db_session.add_all([make_record(glucose=100 + i % 20) for i in range(40)])
+    await db_session.commit()
+    detector = AnomalyDetector()
+    # Nothing is judged before the detector is seeded
+    assert await detector.inspect(db_session, make_record(glucose=400)) == []
+    await detector.seed(db_session)
+
+    typical = make_record(glucose=110)
+    db_session.add(typical)
+    await db_session.flush()
+    assert await detector.inspect(db_session, typical) == []
+    # Learned only once the record is committed
+    assert detector.features["glucose"].moments.count == 40
+    await db_session.commit()
+    assert detector.features["glucose"].moments.count == 41
+
+    outlier = make_record(glucose=400)
+    db_session.add(outlier)
+    await db_session.flush()
+    flags = await detector.inspect(db_session, outlier)
+    await db_session.commit()
+
+    assert [flag.feature for flag in flags] == ["glucose"]
+    stored = (
+        await db_session.scalars(
+            select(AnomalyFlag).where(AnomalyFlag.diabetes_record_id == outlier.id)
+        )
+    ).all()
+    assert len(stored) == 1
+    assert stored[0].value == 400
+    assert stored[0].zscore > 3
+    assert stored[0].upper_fence < 400
@@ -0,0 +1,110 @@
+import pytest
+from app.api.v1.endpoints import stats
+from app.core.cache import etag_matches
+from app.services.histogram import DistributionCache, HistogramService
+
+
+def glucose_bin(distributions, low):
+    """The glucose bin starting at low."""
+    return next(b for b in distributions["features"]["glucose"] if b["low"] == low)
+
+
+async def test_histograms_updated_incrementally(db_session, make_record):
+    """Test updates bin only the new records, split by outcome."""
+    service = HistogramService(db_session, lag_seconds=0)
+    db_session.add_all(
+        [make_record(glucose=glucose, outcome=True) for glucose in (100, 105, 150)]
+    )
+    db_session.add_all(
+        [make_record(glucose=glucose, outcome=False) for glucose in (100, 400)]
+    )
+    unknown = make_record(outcome=None)
+    db_session.add(unknown)
+    await db_session.commit()
+    # Inserting None falls back to the column default
+    unknown.outcome = None
+    await db_session.commit()
+
+    assert await service.update() == 6
+    assert await service.update() == 0
+    db_session.add(make_record(glucose=101, outcome=True))
+    await db_session.commit()
+    assert await service.update() == 1
+
+    distributions = await service.distributions()
+    assert distributions["watermark"] == await service.watermark()
+    assert glucose_bin(distributions, 100)["counts"] == {
+        "positive": 3,
+        "negative": 1,
+        "unknown": 1,
+    }
+    assert glucose_bin(distributions, 100)["high"] == 110
+    overflow = distributions["features"]["glucose"][-1]
+    assert overflow["high"] is None
+    assert overflow["counts"]["negative"] == 1
+    assert distributions["features"]["diabetes_pedigree"][1]["high"] == 0.1
+
+
+async def test_distributions_empty(db_session):
+    """Test distributions read before any update have no counts."""
+    distributions = await HistogramService(db_session).distributions()
+    assert distributions["watermark"] == 0
+    assert glucose_bin(distributions, 100)["counts"] == {
+        "positive": 0,
+        "negative": 0,
+        "unknown": 0,
+    }
+
+
+async def test_distributions_etag(async_client, db_session, make_record, monkeypatch):
+    """Test an unchanged version is revalidated without database work."""
+    cache = DistributionCache()
+    monkeypatch.setattr(stats, "distribution_cache", cache)
+    db_session.add(make_record(outcome=True))
+    await db_session.commit()
+    await HistogramService(db_session, lag_seconds=0).update()
+
+    response = await async_client.get("/api/v1/stats/distributions")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert glucose_bin(response.json(), 100)["counts"]["positive"] == 1
+
+    async def no_database(*args):
+        raise AssertionError("database read for an unchanged version")
+
+    monkeypatch.setattr(HistogramService, "distributions", no_database)
+    response = await async_client.get(
+        "/api/v1/stats/distributions", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    monkeypatch.undo()
+    monkeypatch.setattr(stats, "distribution_cache", cache)
+
+    # New records move the watermark, so the refreshed cache gets a new ETag
+    db_session.add(make_record(outcome=True))
+    await db_session.commit()
+    await HistogramService(db_session, lag_seconds=0).update()
+    await cache.refresh(db_session)
+    response = await async_client.get(
+        "/api/v1/stats/distributions", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert glucose_bin(response.json(), 100)["counts"]["positive"] == 2
+
+
+@pytest.mark.parametrize(
+    "header,matches",
+    [
+        (None, False),
+        ('"histograms-3"', True),
+        ('W/"histograms-3"', True),
+        ('"histograms-2", "histograms-3"', True),
+        ("*", True),
+        ('"histograms-2"', False),
+    ],
+)
+def test_etag_matches(header, matches):
+    """Test If-None-Match parsing."""
+    assert etag_matches(header, '"histograms-3"') is matches
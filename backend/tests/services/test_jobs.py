@@ -0,0 +1,112 @@
+import pytest
+from app.models.diabetes import DataSource, DiabetesRecord
+from app.models.job import AssessmentJob, JobStatus
+from app.models.user import User
+from app.services.jobs import JobQueue
+from sqlalchemy import func, update
+
+
+@pytest.fixture
+async def queued_record(db_session):
+    """Create a user with one record."""
+    user = User(name="Alan", surname="Turing", email="alan@example.com")
+    db_session.add(user)
+    await db_session.flush()
+    record = DiabetesRecord(
+        user_id=user.id,
+        glucose=140,
+        blood_pressure=80,
+        skin_thickness=20,
+        insulin=90,
+        bmi=31.0,
+        diabetes_pedigree=0.5,
+        age=45,
+        source=DataSource.USER_ENTRY,
+    )
+    db_session.add(record)
+    await db_session.flush()
+    return user, record
+
+
+async def test_enqueue_and_claim(db_session, queued_record):
+    """Test a queued job is claimed exactly once."""
+    user, record = queued_record
+    queue = JobQueue(db_session)
+    job = await queue.enqueue(user.id, record.id)
+
+    claimed = await queue.claim("worker-1")
+    assert claimed.id == job.id
+    assert claimed.status == JobStatus.RUNNING
+    assert claimed.attempts == 1
+    assert claimed.locked_by == "worker-1"
+
+    assert await queue.claim("worker-2") is None
+
+    assert await queue.complete(claimed)
+    depth = await queue.depth()
+    assert depth["done"] >= 1
+    assert depth["running"] == 0
+
+
+async def test_failed_job_is_retried_then_failed(db_session, queued_record, mocker):
+    """Test failures back off and give up after the maximum attempts."""
+    mocker.patch("app.services.jobs.settings.JOB_MAX_ATTEMPTS", 2)
+    user, record = queued_record
+    queue = JobQueue(db_session)
+    await queue.enqueue(user.id, record.id)
+
+    claimed = await queue.claim("worker-1")
+    assert await queue.fail(claimed, "boom") == JobStatus.PENDING
+    # Backoff pushes run_after into the future
+    assert await queue.claim("worker-1") is None
+
+    await db_session.execute(update(AssessmentJob).values(run_after=func.now()))
+    claimed = await queue.claim("worker-1")
+    assert claimed.attempts == 2
+    assert await queue.fail(claimed, "boom again") == JobStatus.FAILED
+
+
+async def test_stale_job_requeued_until_out_of_attempts(
+    db_session, queued_record, mocker
+):
+    """Test stale running jobs are requeued, and failed once out of attempts."""
+    mocker.patch("app.services.jobs.settings.JOB_MAX_ATTEMPTS", 2)
+    mocker.patch("app.services.jobs.settings.JOB_VISIBILITY_TIMEOUT_SECONDS", -60)
+    user, record = queued_record
+    queue = JobQueue(db_session)
+    job = await queue.enqueue(user.id, record.id)
+
+    await queue.claim("worker-1")
+    assert await queue.requeue_stale() == 1
+    await db_session.refresh(job)
+    assert job.status == JobStatus.PENDING
+
+    await queue.claim("worker-1")
+    assert await queue.requeue_stale() == 0
+    await db_session.refresh(job)
+    assert job.status == JobStatus.FAILED
+    assert job.finished_at is not None
+
+
+async def test_reclaimed_job_result_dropped(db_session, queued_record, mocker):
+    """Test a run that outlived its claim cannot finish the job's next run."""
+    mocker.patch("app.services.jobs.settings.JOB_VISIBILITY_TIMEOUT_SECONDS", -60)
+    user, record = queued_record
+    queue = JobQueue(db_session)
+    await queue.enqueue(user.id, record.id)
+
+    first = await queue.claim("worker-1")
+    # As in the worker, the first run keeps its own copy of the claimed row
+    db_session.expunge(first)
+    assert await queue.requeue_stale() == 1
+    second = await queue.claim("worker-2")
+
+    assert not await queue.complete(first)
+    assert await queue.fail(first, "late") is None
+    await db_session.refresh(second)
+    assert second.status == JobStatus.RUNNING
+    assert second.locked_by == "worker-2"
+
+    assert await queue.complete(second)
+    await db_session.refresh(second)
+    assert second.status == JobStatus.DONE
@@ -0,0 +1,60 @@
+from datetime import date, datetime, timezone
+
+from app.models.health import HealthAssessment
+from app.models.user import User
+from app.services.partitions import PartitionService, add_months, partition_name
+from sqlalchemy import text
+
+
+def test_add_months():
+    """Test month arithmetic across year boundaries."""
+    assert add_months(date(2025, 11, 1), 1) == date(2025, 12, 1)
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert partition_name("health_assessments", date(2026, 2, 1)) == (
+        "health_assessments_2026_02"
+    )
+
+
+async def test_ensure_monthly_partitions(db_session):
+    """Test missing partitions are created once, ahead of time."""
+    service = PartitionService(db_session)
+    created = await service.ensure_monthly_partitions(
+        "health_assessments", months_ahead=2
+    )
+    assert len(created) == 3
+    assert created == sorted(created)
+
+    again = await service.ensure_monthly_partitions(
+        "health_assessments", months_ahead=2
+    )
+    assert again == []
+
+
+async def test_rows_in_default_moved_to_new_partition(db_session, sample_data):
+    """Test rows that landed in DEFAULT are moved into the month's new partition."""
+    user = User(name="Grace", surname="Hopper", email="grace@example.com")
+    db_session.add(user)
+    await db_session.flush()
+    record = sample_data[0]
+    db_session.add(
+        HealthAssessment(
+            user_id=user.id,
+            diabetes_record_id=record.id,
+            risk_score=0.5,
+            risk_level="medium",
+        )
+    )
+    await db_session.flush()
+
+    service = PartitionService(db_session)
+    created = await service.ensure_monthly_partitions(
+        "health_assessments", months_ahead=0
+    )
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    name = partition_name("health_assessments", this_month)
+    assert created == [name]
+    assert await db_session.scalar(text(f"SELECT count(*) FROM {name}")) == 1
+    assert (
+        await db_session.scalar(text("SELECT count(*) FROM health_assessments_default"))
+        == 0
+    )
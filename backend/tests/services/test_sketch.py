@@ -0,0 +1,94 @@
+import random
+
+import pytest
+from app.models.diabetes import DataSource
+from app.services.sketch import KllSketch, QuantileSketchService
+
+FRACTIONS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def rank_errors(sketch, values):
+    """Normalized rank error of the sketch's answer at each fraction."""
+    ordered = sorted(values)
+    errors = []
+    for fraction, estimate in zip(FRACTIONS, sketch.quantiles(FRACTIONS)):
+        rank = sum(1 for value in ordered if value <= estimate) / len(ordered)
+        errors.append(abs(rank - fraction))
+    return errors
+
+
+def test_kll_sketch_within_error_bound():
+    """Test quantiles stay within the documented rank error."""
+    rng = random.Random(4)
+    values = [rng.lognormvariate(4, 0.5) for _ in range(50000)]
+    sketch = KllSketch(k=200, seed=4)
+    sketch.update_many(values)
+
+    assert sketch.n == 50000
+    assert sum(len(items) for items in sketch.levels) < 1000
+    assert sketch.quantiles([0, 1]) == [min(values), max(values)]
+    assert max(rank_errors(sketch, values)) <= KllSketch.rank_error(200)
+
+
+def test_kll_sketch_merge_and_round_trip():
+    """Test merged and restored sketches answer for the union."""
+    rng = random.Random(5)
+    left = [rng.gauss(100, 20) for _ in range(20000)]
+    right = [rng.gauss(160, 20) for _ in range(20000)]
+    first, second = KllSketch(seed=1), KllSketch(seed=2)
+    first.update_many(left)
+    second.update_many(right)
+
+    merged = KllSketch.from_dict(first.to_dict()).merge(
+        KllSketch.from_dict(second.to_dict())
+    )
+    assert merged.n == 40000
+    assert max(rank_errors(merged, left + right)) <= KllSketch.rank_error(200)
+    assert merged.cdf([130])[0] == pytest.approx(0.5, abs=0.02)
+
+
+async def test_sketches_updated_incrementally(db_session, make_record):
+    """Test updates only fold in new records and sources merge on read."""
+    service = QuantileSketchService(db_session, lag_seconds=0)
+    db_session.add_all([make_record(glucose=glucose) for glucose in range(1, 101)])
+    await db_session.commit()
+
+    assert await service.update() == 100
+    assert await service.update() == 0
+
+    db_session.add_all(
+        [
+            make_record(glucose=glucose, source=DataSource.USER_ENTRY)
+            for glucose in range(101, 201)
+        ]
+    )
+    await db_session.commit()
+    assert await service.update() == 100
+
+    dataset = await service.quantiles(DataSource.DATASET, [0.5])
+    assert dataset["features"]["glucose"]["count"] == 100
+    assert dataset["features"]["glucose"]["quantiles"][0.5] == 50
+    assert dataset["features"]["pregnancies"]["count"] == 0
+
+    overall = await service.quantiles(fractions=[0, 0.5, 1])
+    glucose = overall["features"]["glucose"]
+    assert glucose["count"] == 200
+    assert glucose["quantiles"] == {0: 1, 0.5: 100, 1: 200}
+
+
+async def test_quantiles_endpoint(async_client, db_session, make_record):
+    """Test the quantiles endpoint reports values and the error bound."""
+    db_session.add_all([make_record(glucose=glucose) for glucose in range(1, 11)])
+    await db_session.commit()
+    await QuantileSketchService(db_session, lag_seconds=0).update()
+
+    response = await async_client.get(
+        "/api/v1/stats/quantiles", params=[("q", 0.5), ("q", 1)]
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rank_error"] == pytest.approx(0.0165, abs=0.0005)
+    assert body["features"]["glucose"]["quantiles"] == {"0.5": 5, "1.0": 10}
+
+    response = await async_client.get("/api/v1/stats/quantiles", params={"q": 2})
+    assert response.status_code == 422
@@ -0,0 +1,82 @@
+import pytest
+from app.models.diabetes import DataSource
+from app.services.stats import RECONCILE_LOCK_KEY, RecordStatsService
+from sqlalchemy import text
+
+
+@pytest.fixture
+async def records(db_session, make_record):
+    """Create records from both sources."""
+    rows = [
+        make_record(glucose=glucose, bmi=bmi, outcome=outcome, source=source)
+        for glucose, bmi, outcome, source in [
+            (100, 20.0, True, DataSource.DATASET),
+            (120, 30.0, False, DataSource.DATASET),
+            (140, 40.0, None, DataSource.DATASET),
+            (200, 35.5, True, DataSource.USER_ENTRY),
+        ]
+    ]
+    db_session.add_all(rows)
+    await db_session.commit()
+    return rows
+
+
+async def test_summary_maintained_on_insert(db_session, records):
+    """Test inserts are reflected in the running totals."""
+    summary = await RecordStatsService(db_session).summary(DataSource.DATASET)
+    assert summary["total_records"] == 3
+    assert summary["positive_cases"] == 1
+    glucose = summary["features"]["glucose"]
+    assert glucose["count"] == 3
+    assert glucose["mean"] == pytest.approx(120.0)
+    assert glucose["variance"] == pytest.approx(800 / 3)
+    assert summary["features"]["pregnancies"]["count"] == 0
+    assert summary["features"]["pregnancies"]["mean"] is None
+
+    overall = await RecordStatsService(db_session).summary()
+    assert overall["total_records"] == 4
+    assert overall["features"]["glucose"]["mean"] == pytest.approx(140.0)
+
+
+async def test_summary_maintained_on_update_and_delete(db_session, records):
+    """Test updates and deletes adjust the totals."""
+    records[0].glucose = 160
+    await db_session.delete(records[3])
+    await db_session.commit()
+
+    summary = await RecordStatsService(db_session).summary()
+    assert summary["total_records"] == 3
+    assert summary["features"]["glucose"]["mean"] == pytest.approx(140.0)
+
+
+async def test_reconcile_fixes_drift(db_session, records):
+    """Test reconciliation restores totals after trigger-bypassing changes."""
+    service = RecordStatsService(db_session)
+    assert await service.reconcile() == []
+
+    await db_session.execute(text("UPDATE record_stats SET count = count + 5"))
+    drift = await service.reconcile()
+    assert {row["feature"] for row in drift} >= {"*", "glucose"}
+
+    summary = await service.summary()
+    assert summary["total_records"] == 4
+    assert await service.reconcile() == []
+
+
+async def test_reconcile_skipped_while_locked(db_session, records, held_advisory_lock):
+    """Test reconciliation backs off while another process holds the lock."""
+    await db_session.execute(text("UPDATE record_stats SET count = count + 5"))
+    await held_advisory_lock(RECONCILE_LOCK_KEY)
+    assert await RecordStatsService(db_session).reconcile() == []
+
+
+async def test_stats_summary_endpoint(async_client, records):
+    """Test the summary endpoint."""
+    response = await async_client.get(
+        "/api/v1/stats/summary", params={"source": "user_entry"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_records"] == 1
+    assert data["positive_rate"] == 100.0
+    assert data["features"]["bmi"]["mean"] == 35.5
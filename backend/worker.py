@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Assessment job worker.
+
+Runs queued health assessments outside the web process. Any number of
+workers can run on any number of nodes: jobs are claimed with
+``FOR UPDATE SKIP LOCKED`` so each job runs once, and workers are woken by
+``LISTEN/NOTIFY`` with a polling fallback.
+
+    python worker.py --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import socket
+import time
+import uuid
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.listener import PgListener
+from app.core.metrics import JOB_LATENCY, JOB_RUN_DURATION
+from app.core.profiling import linked_profile_id, sampling
+from app.core.query_tracer import trace_queries
+from app.models.job import AssessmentJob, JobStatus
+from app.services.health import HealthService
+from app.services.jobs import ASSESSMENT_JOBS_CHANNEL, JobQueue
+from app.services.partitions import MONTHLY_PARTITIONED_TABLES, PartitionService
+from app.services.stats import RecordStatsService
+from prometheus_client import start_http_server
+
+if TYPE_CHECKING:
+    # Loaded when the model is first trained
+    from sklearn.ensemble import RandomForestClassifier
+
+settings = get_settings()
+logger = logging.getLogger("worker")
+
+PARTITION_CHECK_INTERVAL_SECONDS = 3600
+
+
+class AssessmentWorker:
+    """Claims and runs assessment jobs with a fixed number of concurrent slots."""
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.model: Optional["RandomForestClassifier"] = None
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._listener = PgListener()
+        self._profiling = False
+
+    def stop(self) -> None:
+        """Finish in-flight jobs and exit."""
+        logger.info("Stopping worker %s", self.worker_id)
+        self._stopping.set()
+        self._wake.set()
+
+    async def run(self) -> None:
+        """Run job slots and queue maintenance until stopped."""
+        await self._listener.listen(ASSESSMENT_JOBS_CHANNEL, self._on_notify)
+        await self._listener.start()
+        logger.info("Worker %s started with %d slots", self.worker_id, self.concurrency)
+        try:
+            await asyncio.gather(
+                self._maintain(),
+                *(self._slot() for _ in range(self.concurrency)),
+            )
+        finally:
+            await self._listener.stop()
+
+    def _on_notify(self, payload: str) -> None:
+        self._wake.set()
+
+    async def _wait_for_work(self) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _slot(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                ran = await self._run_one()
+            except Exception:
+                logger.exception("Job slot error")
+                ran = False
+            if not ran:
+                await self._wait_for_work()
+
+    async def _run_one(self) -> bool:
+        """Claim and run a single job. Returns False when the queue is empty."""
+        async with AsyncSessionLocal() as db:
+            job = await JobQueue(db).claim(self.worker_id)
+            await db.commit()
+        if job is None:
+            return False
+
+        start = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            # Given up on before the job could be requeued as stale
+            await asyncio.wait_for(
+                self._assess(job), timeout=settings.JOB_RUN_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.error("Assessment job %s timed out", job.id)
+            error = f"Timed out after {settings.JOB_RUN_TIMEOUT_SECONDS}s"
+        except Exception as e:
+            logger.exception("Assessment job %s failed", job.id)
+            error = str(e)
+
+        async with AsyncSessionLocal() as db:
+            queue = JobQueue(db)
+            if error is None:
+                status = JobStatus.DONE if await queue.complete(job) else None
+            else:
+                status = await queue.fail(job, error)
+            await db.commit()
+        if status is None:
+            logger.warning(
+                "Assessment job %s was reclaimed, dropping its result", job.id
+            )
+            return True
+
+        JOB_RUN_DURATION.labels(status.value).observe(time.perf_counter() - start)
+        if status != JobStatus.PENDING:
+            JOB_LATENCY.labels(status.value).observe(
+                time.time() - job.created_at.timestamp()
+            )
+        return True
+
+    async def _assess(self, job: AssessmentJob) -> None:
+        """Run the health assessment in a session owned by this job."""
+        # Statements are only collected while tracing is on
+        tracing = (
+            trace_queries(f"assessment job {job.id}")
+            if settings.QUERY_TRACING
+            else nullcontext()
+        )
+        # A job queued by a profiled request is profiled under a linked id;
+        # one at a time, as the sampler sees every slot's threads anyway
+        profiled = bool(job.profile_id) and not self._profiling
+        profiling = (
+            sampling(
+                linked_profile_id(job.profile_id, job.id), f"assessment job {job.id}"
+            )
+            if profiled
+            else nullcontext()
+        )
+        self._profiling = self._profiling or profiled
+        try:
+            with tracing as trace:
+                async with profiling, AsyncSessionLocal() as db:
+                    health_service = HealthService(db)
+                    # Train once per worker rather than once per job
+                    health_service.model = self.model
+                    await health_service.assess_health(
+                        job.user_id, job.diabetes_record_id
+                    )
+                    self.model = health_service.model
+        finally:
+            if profiled:
+                self._profiling = False
+        if trace is not None:
+            trace.report()
+
+    async def _maintain(self) -> None:
+        """Requeue stale jobs, refresh queue metrics and run periodic upkeep."""
+        next_partition_check = time.monotonic()
+        reconcile_interval = settings.RECORD_STATS_RECONCILE_INTERVAL_SECONDS
+        next_reconcile = time.monotonic() + reconcile_interval
+        while not self._stopping.is_set():
+            if time.monotonic() >= next_partition_check:
+                next_partition_check += PARTITION_CHECK_INTERVAL_SECONDS
+                await self._ensure_partitions()
+            if reconcile_interval and time.monotonic() >= next_reconcile:
+                next_reconcile += reconcile_interval
+                await self._reconcile_stats()
+            try:
+                async with AsyncSessionLocal() as db:
+                    queue = JobQueue(db)
+                    requeued = await queue.requeue_stale()
+                    await db.commit()
+                    await queue.depth()
+                if requeued:
+                    logger.warning("Requeued %d stale jobs", requeued)
+                    self._wake.set()
+            except Exception:
+                logger.exception("Queue maintenance failed")
+            try:
+                await asyncio.wait_for(
+                    self._stopping.wait(), timeout=self.poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _ensure_partitions(self) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                service = PartitionService(db)
+                for table in MONTHLY_PARTITIONED_TABLES:
+                    for name in await service.ensure_monthly_partitions(table):
+                        logger.info("Created partition %s", name)
+                await db.commit()
+        except Exception:
+            logger.exception("Partition maintenance failed")
+
+    async def _reconcile_stats(self) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                drift = await RecordStatsService(db).reconcile()
+                await db.commit()
+            for row in drift:
+                logger.warning("Corrected record_stats drift: %s", row)
+        except Exception:
+            logger.exception("record_stats reconciliation failed")
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Start the worker and stop it cleanly on SIGINT/SIGTERM."""
+    worker = AssessmentWorker(args.concurrency, args.poll_interval)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the assessment job worker.")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL_SECONDS
+    )
+    parser.add_argument("--metrics-port", type=int, default=settings.JOB_METRICS_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    asyncio.run(main(args))
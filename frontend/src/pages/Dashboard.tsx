@@ -88,6 +88,7 @@ const Dashboard = () => {
   }
 
   if (!assessmentData) return null;
+  const { recommendations } = assessmentData;
 
   return (
     <Container maxWidth="lg">
@@ -112,7 +113,9 @@ const Dashboard = () => {
                   Risk Assessment
                 </Typography>
                 <Typography variant="body1" paragraph>
-                  {assessmentData.recommendations.risk_assessment}
+                  {recommendations
+                    ? recommendations.risk_assessment
+                    : "Your personalized recommendations are being prepared."}
                 </Typography>
                 <Typography variant="subtitle1" color="primary">
                   Risk Level: {assessmentData.risk_level.toUpperCase()}
@@ -124,45 +127,49 @@ const Dashboard = () => {
             </Card>
           </Grid>
 
-          {/* Recommendations */}
-          <Grid item xs={12} md={6}>
-            <Card>
-              <CardContent>
-                <Typography variant="h6" gutterBottom>
-                  Recommendations
-                </Typography>
-                <List>
-                  {assessmentData.recommendations.recommendations.map(
-                    (rec: string, index: number) => (
-                      <ListItem key={index}>
-                        <ListItemText primary={rec} />
-                      </ListItem>
-                    )
-                  )}
-                </List>
-              </CardContent>
-            </Card>
-          </Grid>
+          {recommendations && (
+            <>
+              {/* Recommendations */}
+              <Grid item xs={12} md={6}>
+                <Card>
+                  <CardContent>
+                    <Typography variant="h6" gutterBottom>
+                      Recommendations
+                    </Typography>
+                    <List>
+                      {recommendations.recommendations.map(
+                        (rec: string, index: number) => (
+                          <ListItem key={index}>
+                            <ListItemText primary={rec} />
+                          </ListItem>
+                        )
+                      )}
+                    </List>
+                  </CardContent>
+                </Card>
+              </Grid>
 
-          {/* Preventive Measures */}
-          <Grid item xs={12} md={6}>
-            <Card>
-              <CardContent>
-                <Typography variant="h6" gutterBottom>
-                  Preventive Measures
-                </Typography>
-                <List>
-                  {assessmentData.recommendations.preventive_measures.map(
-                    (measure: string, index: number) => (
-                      <ListItem key={index}>
-                        <ListItemText primary={measure} />
-                      </ListItem>
-                    )
-                  )}
-                </List>
-              </CardContent>
-            </Card>
-          </Grid>
+              {/* Preventive Measures */}
+              <Grid item xs={12} md={6}>
+                <Card>
+                  <CardContent>
+                    <Typography variant="h6" gutterBottom>
+                      Preventive Measures
+                    </Typography>
+                    <List>
+                      {recommendations.preventive_measures.map(
+                        (measure: string, index: number) => (
+                          <ListItem key={index}>
+                            <ListItemText primary={measure} />
+                          </ListItem>
+                        )
+                      )}
+                    </List>
+                  </CardContent>
+                </Card>
+              </Grid>
+            </>
+          )}
         </Grid>
       </Box>
     </Container>
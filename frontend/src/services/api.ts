@@ -53,6 +53,8 @@ export interface DiabetesRecordResponse {
   source: string;
   created_at: string;
   updated_at: string | null;
+  // Present when the record was created with score=true
+  assessment?: HealthAssessmentResponse | null;
 }
 
 export interface HealthAssessmentResponse {
@@ -61,15 +63,55 @@ export interface HealthAssessmentResponse {
   diabetes_record_id: number;
   risk_score: number;
   risk_level: string;
+  status: "pending_enrichment" | "complete";
+  // Null until the assessment is enriched
   recommendations: {
     risk_assessment: string;
     recommendations: string[];
     preventive_measures: string[];
-  };
+  } | null;
   created_at: string;
   updated_at: string | null;
 }
 
+export interface HistogramBin {
+  low: number | null;
+  high: number | null;
+  counts: {
+    positive: number;
+    negative: number;
+    unknown: number;
+  };
+}
+
+export interface DistributionsResponse {
+  watermark: number;
+  features: Record<string, HistogramBin[]>;
+}
+
+/**
+ * Fetches population histograms of every feature, split by outcome.
+ * The response carries an ETag, so the browser revalidates it and an
+ * unchanged distribution costs a 304.
+ * @returns Histogram bins per feature
+ * @throws Error if request fails
+ */
+export const getDistributions = async (): Promise<DistributionsResponse> => {
+  try {
+    const response = await api.get<DistributionsResponse>(
+      "/api/v1/stats/distributions"
+    );
+    return response.data;
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      throw new Error(
+        error.response?.data?.detail || "Failed to fetch distributions"
+      );
+    }
+    throw new Error("An unexpected error occurred");
+  }
+};
+
 /**
  * Fetches a specific health assessment by ID
  * @param assessmentId The ID of the health assessment to fetch
@@ -94,6 +136,38 @@ export const getHealthAssessment = async (
   }
 };
 
+/**
+ * Waits for the health assessment of a diabetes record to finish
+ * @param recordId The ID of the diabetes record
+ * @param waitSeconds How long the server holds each request (at most 60)
+ * @returns Health assessment data, once it exists
+ * @throws Error if the assessment failed or the request fails
+ */
+export const waitForRecordAssessment = async (
+  recordId: number,
+  waitSeconds = 30
+): Promise<HealthAssessmentResponse> => {
+  try {
+    for (;;) {
+      const response = await api.get<HealthAssessmentResponse>(
+        `/api/v1/diabetes/${recordId}/assessment`,
+        { params: { wait: waitSeconds } }
+      );
+      // 202: still queued or running, so ask again
+      if (response.status !== 202) {
+        return response.data;
+      }
+    }
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      throw new Error(
+        error.response?.data?.detail || "Failed to fetch health assessment"
+      );
+    }
+    throw new Error("An unexpected error occurred");
+  }
+};
+
 /**
  * Creates a new user in the system
  * @param userData User information
@@ -133,8 +207,16 @@ export const createDiabetesRecord = async (
   }
 };
 
+export interface OnboardingResponse {
+  user: UserResponse;
+  // False when a user with this email already existed
+  user_created: boolean;
+  record: DiabetesRecordResponse;
+}
+
 /**
- * Creates a new user and their initial diabetes record and health assessment
+ * Creates a new user and their initial diabetes record and health assessment.
+ * One request: an existing user (matched by email) gets the new record.
  * @param userData User information
  * @param recordData Diabetes record information
  * @returns Created user, diabetes record, and health assessment
@@ -148,28 +230,13 @@ export const createInitialUserWithRecord = async (
   record: DiabetesRecordResponse;
 }> => {
   try {
-    let user: UserResponse;
-    try {
-      // Try to create user first
-      user = await createUser(userData);
-    } catch (error) {
-      // If user already exists (409), extract user data from error response
-      if (axios.isAxiosError(error) && error.response?.status === 409) {
-        user = error.response.data as UserResponse;
-      } else {
-        throw new Error("Failed to create user!");
-      }
-    }
-
-    // Create diabetes record with the user's ID
-    const record = await createDiabetesRecord({
-      ...recordData,
-      user_id: user.id,
-    });
-
+    const response = await api.post<OnboardingResponse>(
+      "/api/v1/users/onboard",
+      { user: userData, record: recordData }
+    );
     return {
-      user,
-      record,
+      user: response.data.user,
+      record: response.data.record,
     };
   } catch (error) {
     if (axios.isAxiosError(error)) {